@@ -0,0 +1,253 @@
+"""
+Almacén incremental de velas OHLCV por (par, timeframe).
+Mantiene un buffer circular acotado en memoria, descarga solo las velas nuevas
+usando `since` y persiste las velas cerradas en SQLite para no volver a
+descargar el histórico tras un reinicio.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Persistencia opcional en SQLite (bot_data.db)
+try:
+    from engine.storage import save_candles, load_candles, prune_candles
+    HAS_CANDLE_STORAGE = True
+except Exception as e:
+    HAS_CANDLE_STORAGE = False
+    logger.debug(f"Persistencia de velas no disponible: {e}")
+
+# Duración de cada timeframe en segundos (fallback si el exchange no la expone)
+TIMEFRAME_SECONDS = {
+    '1m': 60, '3m': 180, '5m': 300, '15m': 900, '30m': 1800,
+    '1h': 3600, '2h': 7200, '4h': 14400, '6h': 21600, '8h': 28800, '12h': 43200,
+    '1d': 86400, '3d': 259200, '1w': 604800
+}
+
+
+class CandleStore:
+    """Buffer de velas por (par, timeframe) con descarga incremental y persistencia."""
+
+    def __init__(self, max_candles: int = 500, persist: bool = True):
+        """
+        Inicializa el almacén.
+
+        Args:
+            max_candles: Velas cerradas máximas por (par, timeframe) en memoria y en disco
+            persist: Si True, guarda/carga velas cerradas en SQLite
+        """
+        self.max_candles = max_candles
+        self.persist = persist and HAS_CANDLE_STORAGE
+        # (pair, timeframe) -> deque de velas cerradas [ts, o, h, l, c, v]
+        self._closed: Dict[Tuple[str, str], deque] = {}
+        # (pair, timeframe) -> vela en curso (aún no cerrada)
+        self._live: Dict[Tuple[str, str], Optional[List[float]]] = {}
+        # Claves ya cargadas desde SQLite (para no consultar la BD en cada llamada)
+        self._loaded: set = set()
+        # Mayor profundidad pedida en una descarga completa por clave: si el exchange
+        # devolvió menos velas (par reciente) no se vuelve a pedir la historia completa
+        self._depth: Dict[Tuple[str, str], int] = {}
+        # Protege buffers y velas en curso: get_ohlcv corre en hilos del executor y
+        # apply_live_price en el event loop
+        self._lock = threading.RLock()
+
+    def timeframe_ms(self, exchange, timeframe: str) -> int:
+        """Duración del timeframe en milisegundos."""
+        try:
+            if exchange is not None and hasattr(exchange, 'parse_timeframe'):
+                return int(exchange.parse_timeframe(timeframe) * 1000)
+        except Exception:
+            pass
+        return TIMEFRAME_SECONDS.get(timeframe, 3600) * 1000
+
+    def _load_persisted(self, key: Tuple[str, str]):
+        """Carga desde SQLite las velas cerradas de una clave (una sola vez)."""
+        if key in self._loaded:
+            return
+        self._loaded.add(key)
+        buffer = self._closed.setdefault(key, deque(maxlen=self.max_candles))
+        if not self.persist:
+            return
+        try:
+            rows = load_candles(key[0], key[1], limit=self.max_candles)
+            buffer.extend(rows)
+            self._depth[key] = len(rows)
+            if rows:
+                logger.debug(f"Velas {key[0]} {key[1]}: {len(rows)} recuperadas de SQLite")
+        except Exception as e:
+            logger.debug(f"No se pudieron cargar velas de {key[0]} {key[1]}: {e}")
+
+    def _ingest(self, key: Tuple[str, str], candles: List[List[float]], tf_ms: int,
+                merge: bool = False) -> List[List[float]]:
+        """
+        Incorpora velas descargadas: las cerradas van al buffer, la última abierta
+        queda como vela en curso.
+
+        Args:
+            merge: Si True (descarga completa), las velas anteriores a las del
+                   buffer también se incorporan, en orden cronológico
+
+        Returns:
+            Lista de velas cerradas nuevas (para persistir)
+        """
+        with self._lock:
+            return self._ingest_locked(key, candles, tf_ms, merge)
+
+    def _ingest_locked(self, key: Tuple[str, str], candles: List[List[float]], tf_ms: int,
+                       merge: bool) -> List[List[float]]:
+        buffer = self._closed[key]
+        now_ms = int(time.time() * 1000)
+        last_ts = buffer[-1][0] if buffer else None
+        known = {row[0] for row in buffer} if merge else None
+        new_closed = []
+        live = None
+        for candle in candles:
+            ts = candle[0]
+            if ts + tf_ms <= now_ms:
+                if merge:
+                    if ts not in known:
+                        row = list(candle[:6])
+                        new_closed.append(row)
+                        known.add(ts)
+                elif last_ts is None or ts > last_ts:
+                    row = list(candle[:6])
+                    buffer.append(row)
+                    new_closed.append(row)
+                    last_ts = ts
+            else:
+                live = list(candle[:6])
+        if merge and new_closed:
+            merged = sorted(list(buffer) + new_closed, key=lambda row: row[0])
+            buffer.clear()
+            buffer.extend(merged)
+        self._live[key] = live
+        return new_closed
+
+    def get_ohlcv(self, exchange, pair: str, timeframe: str = '1h', limit: int = 200) -> List[List[float]]:
+        """
+        Devuelve las últimas `limit` velas (cerradas + la vela en curso) como fetch_ohlcv.
+
+        Solo descarga las velas posteriores a la última vela cerrada almacenada.
+        Si el buffer está vacío, no alcanza `limit` o el hueco es mayor que el buffer,
+        hace una descarga completa.
+
+        Args:
+            exchange: Instancia de exchange (ccxt)
+            pair: Par de trading (ej: "BTC/EUR")
+            timeframe: Timeframe de las velas
+            limit: Número de velas a devolver
+
+        Returns:
+            Lista de velas [timestamp, open, high, low, close, volume]
+        """
+        key = (pair, timeframe)
+        self._load_persisted(key)
+        buffer = self._closed[key]
+        tf_ms = self.timeframe_ms(exchange, timeframe)
+        now_ms = int(time.time() * 1000)
+
+        last_ts = buffer[-1][0] if buffer else None
+        missing = ((now_ms - last_ts) // tf_ms) if last_ts is not None else None
+        wanted = min(max(limit, 1), self.max_candles)
+        needs_full = (
+            last_ts is None
+            or missing >= self.max_candles
+            or (len(buffer) + 1 < wanted and self._depth.get(key, 0) < wanted)
+        )
+
+        if needs_full:
+            candles = exchange.fetch_ohlcv(pair, timeframe, limit=wanted) or []
+            if last_ts is not None and candles and candles[0][0] > last_ts + tf_ms:
+                # Hueco imposible de rellenar: descartar el histórico viejo
+                with self._lock:
+                    buffer.clear()
+            # Fusionar: las velas anteriores al buffer también se guardan
+            new_closed = self._ingest(key, candles, tf_ms, merge=True)
+            # Profundidad realmente disponible: si el exchange devolvió menos velas
+            # de las pedidas (par reciente) no hay más historia que pedir
+            stored = len(buffer) + (1 if self._live.get(key) is not None else 0)
+            depth = wanted if len(candles) < wanted else stored
+            self._depth[key] = max(self._depth.get(key, 0), depth)
+        else:
+            # Incremental: solo velas desde la siguiente a la última cerrada
+            candles = exchange.fetch_ohlcv(pair, timeframe, since=last_ts + tf_ms, limit=int(missing) + 1)
+            new_closed = self._ingest(key, candles or [], tf_ms)
+
+        if new_closed and self.persist:
+            try:
+                save_candles(pair, timeframe, new_closed)
+                prune_candles(pair, timeframe, buffer[0][0])
+            except Exception as e:
+                logger.debug(f"No se pudieron persistir velas de {pair} {timeframe}: {e}")
+
+        with self._lock:
+            result = list(buffer)
+            live = self._live.get(key)
+            if live is not None:
+                result.append(live)
+            return [list(c) for c in result[-limit:]]
+
+    def get_cached(self, pair: str, timeframe: str = '1h') -> List[List[float]]:
+        """Devuelve las velas en memoria (cerradas + en curso) sin tocar la red."""
+        key = (pair, timeframe)
+        with self._lock:
+            result = list(self._closed.get(key, ()))
+            live = self._live.get(key)
+            if live is not None:
+                result.append(live)
+            return [list(c) for c in result]
+
+    def get_live(self, pair: str, timeframe: str = '1h') -> Optional[List[float]]:
+        """Copia de la vela en curso (None si no hay)."""
+        with self._lock:
+            live = self._live.get((pair, timeframe))
+            return list(live) if live is not None else None
+
+    def apply_live_price(self, pair: str, timeframe: str, price: float,
+                         now: Optional[float] = None) -> Optional[List[float]]:
+        """
+        Aplica un precio a la vela en curso (máximo, mínimo y cierre) sin tocar la red.
+
+        Args:
+            pair: Par de trading
+            timeframe: Timeframe de la vela
+            price: Último precio
+            now: Instante de referencia (default: ahora)
+
+        Returns:
+            Copia de la vela actualizada, o None si no hay vela en curso o ya se cerró
+        """
+        tf_ms = self.timeframe_ms(None, timeframe)
+        now_ms = int((time.time() if now is None else now) * 1000)
+        candle_ts = now_ms // tf_ms * tf_ms
+        key = (pair, timeframe)
+        with self._lock:
+            live = self._live.get(key)
+            if live is None or live[0] < candle_ts:
+                return None
+            live = [live[0], live[1], max(live[2], price), min(live[3], price), price, live[5]]
+            self._live[key] = live
+            return list(live)
+
+    def stats(self) -> Dict[str, Any]:
+        """Resumen del contenido del almacén."""
+        return {
+            'series': len(self._closed),
+            'candles': sum(len(b) for b in self._closed.values()),
+            'persist': self.persist
+        }
+
+
+# Instancia compartida por signals y el motor
+_default_store: Optional[CandleStore] = None
+
+
+def get_candle_store() -> CandleStore:
+    """Devuelve el almacén de velas compartido (lo crea en el primer uso)."""
+    global _default_store
+    if _default_store is None:
+        _default_store = CandleStore()
+    return _default_store
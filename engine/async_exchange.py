@@ -0,0 +1,267 @@
+"""
+Adaptador asíncrono del exchange para el motor.
+
+ccxt síncrono bloquea el event loop en cada llamada: los `asyncio.wait_for` no
+pueden interrumpir nada y las tareas del radar no avanzan en paralelo.
+AsyncExchangeAdapter ejecuta las llamadas en un ThreadPoolExecutor dedicado,
+limita la concurrencia con un semáforo y aplica un timeout por llamada.
+
+Con `enabled=False` las llamadas se ejecutan en línea (comportamiento anterior).
+Las órdenes no llevan timeout por defecto: abandonar una orden en curso no la
+cancela en el exchange.
+
+Las lecturas de mercado se agrupan (single-flight): peticiones concurrentes con
+la misma clave (endpoint, símbolo, parámetros) comparten una única llamada en
+vuelo, y durante `coalesce_window` segundos se reutiliza el resultado recién
+obtenido. Los resultados compartidos no deben modificarse.
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from engine.rate_limit import LANE_EXECUTION, RateLimitScheduler, request_weight, run_prepaid
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_COALESCE_WINDOW = 0.5
+
+
+class AsyncExchangeAdapter:
+    """Versiones awaitable de las llamadas ccxt que usa el motor."""
+
+    def __init__(self, exchange, enabled: bool = True, max_workers: int = DEFAULT_MAX_WORKERS,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, timeout: Optional[float] = DEFAULT_TIMEOUT,
+                 order_timeout: Optional[float] = None, coalesce_window: float = DEFAULT_COALESCE_WINDOW,
+                 scheduler: Optional[RateLimitScheduler] = None):
+        """
+        Args:
+            exchange: Instancia de exchange (ccxt síncrono)
+            enabled: Si False, las llamadas se ejecutan en línea sin executor
+            max_workers: Hilos del executor dedicado
+            max_concurrency: Llamadas simultáneas máximas al exchange
+            timeout: Timeout por llamada de lectura en segundos (None = sin límite)
+            order_timeout: Timeout para órdenes (None = esperar siempre el resultado)
+            coalesce_window: Segundos que se reutiliza un resultado de lectura (0 = solo en vuelo)
+            scheduler: Planificador de peso; si existe, el peso se cobra en el event loop
+                antes de ocupar un hilo del executor
+        """
+        self.exchange = exchange
+        self.enabled = enabled
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.timeout = timeout
+        self.order_timeout = order_timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, int(max_workers)),
+            thread_name_prefix="exchange"
+        ) if enabled else None
+        # El semáforo se crea en el primer uso para asociarlo al loop en curso
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+        self.stats = {'calls': 0, 'timeouts': 0, 'errors': 0}
+        # Single-flight: clave -> futuro en vuelo / (timestamp, resultado) reciente
+        self.coalesce_window = max(0.0, float(coalesce_window or 0))
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+        self._recent: Dict[Tuple, Tuple[float, Any]] = {}
+        self.coalesce_stats = {'hits': 0, 'misses': 0, 'coalesced': 0}
+        self.scheduler = scheduler
+
+    @classmethod
+    def from_config(cls, exchange, config: Optional[Dict[str, Any]] = None,
+                    scheduler: Optional[RateLimitScheduler] = None) -> 'AsyncExchangeAdapter':
+        """Crea el adaptador desde la sección `exchange_adapter` de strategy.json."""
+        config = config or {}
+        return cls(
+            exchange,
+            enabled=config.get("enabled", True),
+            max_workers=config.get("max_workers", DEFAULT_MAX_WORKERS),
+            max_concurrency=config.get("max_concurrency", DEFAULT_MAX_CONCURRENCY),
+            timeout=config.get("timeout", DEFAULT_TIMEOUT),
+            order_timeout=config.get("order_timeout"),
+            coalesce_window=config.get("coalesce_window", DEFAULT_COALESCE_WINDOW),
+            scheduler=scheduler
+        )
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None,
+                  use_default_timeout: bool = True, weight: Optional[int] = None,
+                  lane: Optional[int] = None, **kwargs) -> Any:
+        """
+        Ejecuta una función síncrona (llamada ccxt o helper que la usa) sin
+        bloquear el event loop.
+
+        Args:
+            fn: Función síncrona
+            timeout: Timeout en segundos (None = el del adaptador si use_default_timeout)
+            use_default_timeout: Si False y timeout es None, espera sin límite
+            weight: Peso de Binance de la llamada (None = lo cobra el exchange al ejecutarse)
+            lane: Carril de prioridad (None = el del contexto actual)
+
+        Raises:
+            asyncio.TimeoutError: si la llamada supera el timeout (el hilo sigue
+            ejecutándose en segundo plano hasta que ccxt responda)
+            RequestShed: si el planificador descarta la petición
+        """
+        self.stats['calls'] += 1
+        prepaid = False
+        if self.scheduler is not None and weight:
+            # Esperar presupuesto en el loop, no ocupando un hilo del executor
+            await self.scheduler.acquire(weight, lane)
+            prepaid = True
+
+        call = functools.partial(run_prepaid, fn, *args, **kwargs) if prepaid else functools.partial(fn, *args, **kwargs)
+        if not self.enabled:
+            return call()
+
+        if timeout is None and use_default_timeout:
+            timeout = self.timeout
+        loop = asyncio.get_running_loop()
+        # Propagar el contexto (carril) al hilo del executor
+        context = contextvars.copy_context()
+        async with self._get_semaphore():
+            future = loop.run_in_executor(self._executor, context.run, call)
+            try:
+                if timeout:
+                    return await asyncio.wait_for(future, timeout)
+                return await future
+            except asyncio.TimeoutError:
+                self.stats['timeouts'] += 1
+                logger.debug(f"Timeout ({timeout}s) en {getattr(fn, '__name__', fn)}")
+                raise
+            except Exception:
+                self.stats['errors'] += 1
+                raise
+
+    async def call(self, method: str, *args, **kwargs) -> Any:
+        """Ejecuta cualquier método del exchange por nombre (lectura, con timeout)."""
+        return await self.run(getattr(self.exchange, method), *args, **kwargs)
+
+    def _purge_recent(self, now: float):
+        """Elimina resultados recientes fuera de la ventana."""
+        expired = [key for key, (ts, _) in self._recent.items() if now - ts >= self.coalesce_window]
+        for key in expired:
+            del self._recent[key]
+
+    async def run_coalesced(self, key: Tuple, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Como run(), pero las peticiones con la misma clave comparten la llamada
+        en vuelo y el resultado reciente.
+
+        Args:
+            key: Clave hashable (endpoint, símbolo, parámetros)
+            fn: Función síncrona a ejecutar si no hay llamada compartible
+        """
+        try:
+            hash(key)
+        except TypeError:
+            return await self.run(fn, *args, **kwargs)
+
+        now = time.time()
+        recent = self._recent.get(key)
+        if recent is not None:
+            if now - recent[0] < self.coalesce_window:
+                self.coalesce_stats['hits'] += 1
+                return recent[1]
+            del self._recent[key]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesce_stats['coalesced'] += 1
+            # shield: cancelar a un llamador no cancela la llamada compartida
+            return await asyncio.shield(inflight)
+
+        self.coalesce_stats['misses'] += 1
+        # La llamada compartida vive en su propia tarea: si se cancela al llamador
+        # que la inició (p. ej. por su timeout), los demás siguen esperando el resultado
+        task = asyncio.get_running_loop().create_task(self.run(fn, *args, **kwargs))
+        self._inflight[key] = task
+        task.add_done_callback(functools.partial(self._finish_inflight, key))
+        return await asyncio.shield(task)
+
+    def _finish_inflight(self, key: Tuple, task: asyncio.Task):
+        """Cierra una llamada compartida: la retira de las en vuelo y guarda el resultado reciente."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # exception() marca el error como recuperado aunque nadie esperase ya
+        if task.cancelled() or task.exception() is not None:
+            return
+        if self.coalesce_window > 0:
+            now = time.time()
+            if len(self._recent) > 1000:
+                self._purge_recent(now)
+            self._recent[key] = (now, task.result())
+
+    # --- Lecturas ---
+
+    async def fetch_ticker(self, symbol: str) -> Dict[str, Any]:
+        return await self.run_coalesced(
+            ('fetch_ticker', symbol), self.exchange.fetch_ticker, symbol,
+            weight=request_weight('fetch_ticker')
+        )
+
+    async def fetch_tickers(self, symbols: Optional[List[str]] = None) -> Dict[str, Any]:
+        key = ('fetch_tickers', tuple(symbols) if symbols else None)
+        return await self.run_coalesced(
+            key, self.exchange.fetch_tickers, symbols,
+            weight=request_weight('fetch_tickers', symbols)
+        )
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', since: Optional[int] = None,
+                          limit: Optional[int] = None) -> List[List[float]]:
+        return await self.run_coalesced(
+            ('fetch_ohlcv', symbol, timeframe, since, limit),
+            self.exchange.fetch_ohlcv, symbol, timeframe, since=since, limit=limit,
+            weight=request_weight('fetch_ohlcv')
+        )
+
+    async def fetch_order_book(self, symbol: str, limit: Optional[int] = None) -> Dict[str, Any]:
+        return await self.run_coalesced(
+            ('fetch_order_book', symbol, limit), self.exchange.fetch_order_book, symbol, limit,
+            weight=request_weight('fetch_order_book', symbol, limit)
+        )
+
+    async def fetch_balance(self) -> Dict[str, Any]:
+        # El peso lo cobra el exchange solo si el snapshot del tick no sirve la llamada
+        return await self.run(self.exchange.fetch_balance)
+
+    async def load_markets(self, reload: bool = False) -> Dict[str, Any]:
+        # Sin recarga ccxt sirve los mercados de memoria: el peso lo cobra el exchange si descarga
+        return await self.run(self.exchange.load_markets, reload)
+
+    # --- Órdenes (carril de ejecución; timeout propio, por defecto sin límite) ---
+
+    async def create_market_buy_order(self, symbol: str, amount: float, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return await self.run(self.exchange.create_market_buy_order, symbol, amount, params or {},
+                              timeout=self.order_timeout, use_default_timeout=False,
+                              weight=request_weight('create_market_buy_order'), lane=LANE_EXECUTION)
+
+    async def create_market_sell_order(self, symbol: str, amount: float, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return await self.run(self.exchange.create_market_sell_order, symbol, amount, params or {},
+                              timeout=self.order_timeout, use_default_timeout=False,
+                              weight=request_weight('create_market_sell_order'), lane=LANE_EXECUTION)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores de llamadas y de agrupación (hits/misses/coalesced) para ajuste."""
+        stats = dict(self.stats)
+        stats.update(self.coalesce_stats)
+        stats['inflight'] = len(self._inflight)
+        if self.scheduler is not None:
+            stats['rate_limit'] = self.scheduler.get_stats()
+        return stats
+
+    def shutdown(self):
+        """Libera el executor (no espera a las llamadas en curso)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
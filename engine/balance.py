@@ -0,0 +1,154 @@
+"""
+Snapshot de balances compartido durante un tick del motor.
+
+`fetch_balance()` es una llamada privada (peso alto en Binance) y el motor la
+hace desde muchos cálculos de cartera en el mismo tick. BalanceCachingExchange
+envuelve la instancia ccxt: dentro de `tick()` la primera llamada descarga el
+balance y las siguientes reutilizan el mismo BalanceSnapshot. Cualquier orden
+(`create_market_*_order`, `create_order`) invalida el snapshot para que la
+siguiente lectura refleje el nuevo saldo.
+
+El ámbito del tick es por tarea (ContextVar): las tareas del motor (monitor,
+oportunidades...) se solapan y cada una tiene su propio snapshot, que termina
+con su tick. Además el snapshot caduca a los `max_age` segundos.
+"""
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Métodos del exchange que modifican balances
+ORDER_METHODS = ('create_market_buy_order', 'create_market_sell_order', 'create_order')
+DEFAULT_MAX_AGE = 30.0
+
+
+class _TickScope:
+    """Estado del tick de una tarea (mutable: lo comparten los hilos del executor que heredan el contexto)."""
+
+    __slots__ = ('owner', 'active', 'snapshot', 'generation')
+
+    def __init__(self, owner: 'BalanceCachingExchange'):
+        self.owner = owner
+        self.active = True
+        self.snapshot: Optional['BalanceSnapshot'] = None
+        self.generation = -1
+
+
+_tick_scope: contextvars.ContextVar = contextvars.ContextVar('balance_tick_scope', default=None)
+
+
+class BalanceSnapshot:
+    """Balance descargado una vez (inmutable por convención)."""
+
+    def __init__(self, balances: Dict[str, Any]):
+        self.balances = balances or {}
+        self.fetched_at = time.time()
+
+    @property
+    def age(self) -> float:
+        """Segundos desde la descarga."""
+        return time.time() - self.fetched_at
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Copia del balance con el formato de ccxt.fetch_balance().
+        Se copian los dicts de primer nivel para que un llamador no altere el snapshot.
+        """
+        return {k: (dict(v) if isinstance(v, dict) else v) for k, v in self.balances.items()}
+
+
+class BalanceCachingExchange:
+    """Proxy de un exchange ccxt que comparte fetch_balance() dentro de un tick."""
+
+    def __init__(self, exchange, max_age: float = DEFAULT_MAX_AGE):
+        """
+        Args:
+            exchange: Instancia de exchange (ccxt)
+            max_age: Segundos máximos que se reutiliza un snapshot dentro de un tick
+        """
+        self._exchange = exchange
+        self.max_age = max_age
+        # Se incrementa con cada orden: invalida los snapshots de todas las tareas
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.balance_stats = {'fetches': 0, 'hits': 0, 'invalidations': 0}
+
+    def __getattr__(self, name: str):
+        # Solo se llama para atributos que no existen en el proxy
+        attr = getattr(self._exchange, name)
+        if name in ORDER_METHODS and callable(attr):
+            def _order(*args, **kwargs):
+                try:
+                    return attr(*args, **kwargs)
+                finally:
+                    self.invalidate_balance()
+            return _order
+        return attr
+
+    @property
+    def wrapped(self):
+        """Instancia ccxt original."""
+        return self._exchange
+
+    def _scope(self) -> Optional[_TickScope]:
+        """Tick activo de la tarea actual en este exchange."""
+        scope = _tick_scope.get()
+        if scope is not None and scope.active and scope.owner is self:
+            return scope
+        return None
+
+    @contextmanager
+    def tick(self):
+        """
+        Ámbito en el que fetch_balance() se descarga como máximo una vez por tarea
+        (reentrante). Las tareas creadas dentro heredan el ámbito solo mientras dure.
+        """
+        if self._scope() is not None:
+            yield self
+            return
+        scope = _TickScope(self)
+        token = _tick_scope.set(scope)
+        try:
+            yield self
+        finally:
+            scope.active = False
+            scope.snapshot = None
+            _tick_scope.reset(token)
+
+    def invalidate_balance(self):
+        """Descarta los snapshots actuales (tras una orden)."""
+        with self._lock:
+            self._generation += 1
+            self.balance_stats['invalidations'] += 1
+
+    def get_balance_snapshot(self) -> BalanceSnapshot:
+        """Devuelve el snapshot del tick de la tarea, descargándolo si no existe o caducó."""
+        scope = self._scope()
+        with self._lock:
+            generation = self._generation
+            snapshot = None
+            if scope is not None and scope.snapshot is not None and scope.generation == generation:
+                snapshot = scope.snapshot
+        if snapshot is not None and snapshot.age < self.max_age:
+            self.balance_stats['hits'] += 1
+            return snapshot
+        snapshot = BalanceSnapshot(self._exchange.fetch_balance())
+        self.balance_stats['fetches'] += 1
+        with self._lock:
+            if scope is not None and scope.active and generation == self._generation:
+                scope.snapshot = snapshot
+                scope.generation = generation
+        return snapshot
+
+    def fetch_balance(self, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Igual que ccxt.fetch_balance(); dentro de tick() reutiliza el snapshot.
+        Con `params` (consultas especiales) siempre va al exchange.
+        """
+        if params:
+            return self._exchange.fetch_balance(params)
+        return self.get_balance_snapshot().as_dict()
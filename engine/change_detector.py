@@ -0,0 +1,120 @@
+"""
+Detección de cambios en los datos de mercado (dirty set).
+
+Recalcular indicadores y heat_score de un par cuyo precio, volumen y velas no
+han cambiado desde la última pasada produce el mismo resultado. ChangeDetector
+guarda, por par, los datos con los que se hizo el último cálculo (línea base) y
+marca el par como sucio solo si:
+
+- el precio se movió más de `price_epsilon` (relativo) respecto a la línea base,
+- el volumen 24h se movió más de `volume_epsilon` (relativo),
+- se cerró una vela nueva del timeframe de los indicadores, o
+- la línea base tiene más de `max_age` segundos (refresco de seguridad).
+
+Se compara contra la línea base (no contra la lectura anterior), así que muchos
+movimientos pequeños acumulados acaban marcando el par.
+"""
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_PRICE_EPSILON = 0.001    # 0.1%
+DEFAULT_VOLUME_EPSILON = 0.02    # 2%
+DEFAULT_MAX_AGE = 300.0          # segundos
+DEFAULT_TIMEFRAME_SECONDS = 3600
+
+
+class ChangeDetector:
+    """Decide qué pares necesitan recalcularse según sus datos de entrada."""
+
+    def __init__(self, price_epsilon: float = DEFAULT_PRICE_EPSILON,
+                 volume_epsilon: float = DEFAULT_VOLUME_EPSILON,
+                 timeframe_seconds: int = DEFAULT_TIMEFRAME_SECONDS,
+                 max_age: Optional[float] = DEFAULT_MAX_AGE):
+        """
+        Args:
+            price_epsilon: Variación relativa de precio que marca el par como sucio
+            volume_epsilon: Variación relativa de volumen 24h que marca el par como sucio
+            timeframe_seconds: Duración de la vela de los indicadores
+            max_age: Antigüedad máxima de la línea base (None = sin límite)
+        """
+        self.price_epsilon = price_epsilon
+        self.volume_epsilon = volume_epsilon
+        self.timeframe_seconds = max(1, int(timeframe_seconds))
+        self.max_age = max_age
+        # par -> (precio, volumen, apertura de vela, instante)
+        self._baselines: Dict[str, Tuple[Optional[float], Optional[float], int, float]] = {}
+        self._lock = threading.Lock()
+        self.stats = {'checked': 0, 'dirty': 0, 'skipped': 0}
+
+    @classmethod
+    def from_config(cls, timeframe_seconds: int, config: Optional[Dict[str, Any]] = None) -> 'ChangeDetector':
+        """Crea el detector desde la sección `change_detection` de strategy.json."""
+        config = config or {}
+        return cls(
+            price_epsilon=config.get("price_epsilon", DEFAULT_PRICE_EPSILON),
+            volume_epsilon=config.get("volume_epsilon", DEFAULT_VOLUME_EPSILON),
+            timeframe_seconds=timeframe_seconds,
+            max_age=config.get("max_age", DEFAULT_MAX_AGE)
+        )
+
+    def _candle_open(self, now: float) -> int:
+        return int(now // self.timeframe_seconds) * self.timeframe_seconds
+
+    @staticmethod
+    def _moved(current: Optional[float], baseline: Optional[float], epsilon: float) -> bool:
+        if current is None or baseline is None:
+            # Sin dato comparable: solo cuenta como cambio si aparece o desaparece
+            return (current is None) != (baseline is None)
+        if baseline == 0:
+            return current != 0
+        return abs(current - baseline) / abs(baseline) > epsilon
+
+    def is_dirty(self, pair: str, price: Optional[float], volume: Optional[float] = None,
+                 now: Optional[float] = None) -> bool:
+        """
+        True si el par debe recalcularse con los datos actuales.
+
+        Args:
+            pair: Par (o clave) a comprobar
+            price: Precio actual
+            volume: Volumen 24h actual
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            baseline = self._baselines.get(pair)
+            if baseline is None:
+                dirty = True
+            else:
+                base_price, base_volume, base_candle, computed_at = baseline
+                dirty = (
+                    self._moved(price, base_price, self.price_epsilon)
+                    or self._moved(volume, base_volume, self.volume_epsilon)
+                    or self._candle_open(now) > base_candle
+                    or (self.max_age is not None and now - computed_at >= self.max_age)
+                )
+            self.stats['checked'] += 1
+            self.stats['dirty' if dirty else 'skipped'] += 1
+        return dirty
+
+    def mark_clean(self, pair: str, price: Optional[float], volume: Optional[float] = None,
+                   now: Optional[float] = None):
+        """Guarda los datos con los que se acaba de recalcular el par como nueva línea base."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._baselines[pair] = (price, volume, self._candle_open(now), now)
+
+    def forget(self, pair: str):
+        """Descarta la línea base (el próximo is_dirty() devolverá True)."""
+        with self._lock:
+            self._baselines.pop(pair, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores y proporción de recálculos evitados."""
+        with self._lock:
+            checked = self.stats['checked']
+            return {
+                **self.stats,
+                'skip_ratio': round(self.stats['skipped'] / checked, 3) if checked else 0.0,
+                'tracked': len(self._baselines)
+            }
@@ -0,0 +1,220 @@
+"""
+Cálculo vectorizado del heat_score.
+
+Recibe columnas de RSI, distancia a EMA200, puntuación de volumen y flag de
+activo de reserva y devuelve el heat_score y su desglose para todos los pares
+en una sola llamada. TradingEngine._calculate_heat_score es un envoltorio
+sobre score_signals para una sola señal. Sin numpy se calcula señal a señal
+con la misma fórmula.
+"""
+import logging
+import math
+from typing import Dict, Any, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# NumPy opcional: sin él, el heat_score se calcula señal a señal
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+    logger.debug("numpy no disponible. El heat_score se calculará señal a señal.")
+
+# Componentes y pesos
+HEAT_WEIGHTS = {
+    'rsi': 0.55,   # Dar más peso al momentum inmediato (RSI)
+    'ema': 0.25,
+    'vol': 0.15,
+    'bonus': 0.05
+}
+
+# Offset para evitar que todos los activos se queden anclados en valores bajos
+BASE_SCORE = 5.0
+
+
+def volume_status_score(volume_status: Any) -> float:
+    """Puntuación de volumen según la etiqueta: high=100, normal/medium=50, resto=0."""
+    if volume_status is True or (isinstance(volume_status, str) and volume_status.lower() == 'high'):
+        return 100.0
+    if isinstance(volume_status, str) and volume_status.lower() in ('normal', 'medium'):
+        return 50.0
+    return 0.0
+
+
+def _score_heat_one(rsi: float, ema_dist: float, vol_raw: float, reserve: bool) -> Dict[str, float]:
+    """Heat_score y componentes de una señal (misma fórmula que score_heat_batch, sin numpy)."""
+    bonus_raw = 100.0 if reserve else 0.0
+
+    has_rsi = not math.isnan(rsi)
+    distance = abs(rsi - 50.0) if has_rsi else 0.0
+    if not has_rsi:
+        rsi_raw = 0.0
+    elif 45.0 <= rsi <= 65.0:
+        rsi_raw = 100.0
+    else:
+        rsi_raw = max(0.0, 100.0 - distance * 3.0)
+    rsi_boost = max(0.0, 20.0 - distance * 1.5) if has_rsi else 0.0
+
+    if math.isnan(ema_dist):
+        ema_raw = 0.0
+    elif 0 < ema_dist <= 2.0:
+        ema_raw = 100.0
+    elif ema_dist > 2.0:
+        ema_raw = max(0.0, 100.0 - ((ema_dist - 2.0) / 8.0) * 100.0)
+    else:
+        ema_raw = max(0.0, 100.0 - (abs(ema_dist) / 5.0) * 100.0)
+
+    contrib_rsi = rsi_raw * HEAT_WEIGHTS['rsi']
+    contrib_ema = ema_raw * HEAT_WEIGHTS['ema']
+    contrib_vol = vol_raw * HEAT_WEIGHTS['vol']
+    contrib_bonus = bonus_raw * HEAT_WEIGHTS['bonus']
+
+    raw_total = BASE_SCORE + contrib_rsi + contrib_ema + contrib_vol + contrib_bonus + rsi_boost
+
+    return {
+        'rsi_raw': rsi_raw,
+        'ema_raw': ema_raw,
+        'vol_raw': vol_raw,
+        'bonus_raw': bonus_raw,
+        'rsi': contrib_rsi,
+        'ema': contrib_ema,
+        'vol': contrib_vol,
+        'bonus': contrib_bonus,
+        'rsi_boost': rsi_boost,
+        'total': min(100.0, max(0.0, raw_total))
+    }
+
+
+def score_heat_batch(rsi, ema_dist, vol_score, reserve_flag) -> Dict[str, Any]:
+    """
+    Calcula heat_score y componentes para N pares.
+
+    Args:
+        rsi: Vector (N,) de RSI (NaN si no hay dato)
+        ema_dist: Vector (N,) de distancia a EMA200 en % (NaN si no hay dato)
+        vol_score: Vector (N,) de puntuación de volumen (0, 50 o 100)
+        reserve_flag: Vector (N,) booleano, True si el activo está en RESERVE_ASSETS
+
+    Returns:
+        Dict de vectores (N,): rsi_raw, ema_raw, vol_raw, bonus_raw, rsi, ema, vol,
+        bonus, rsi_boost y total (sin redondear). Sin numpy, listas de floats.
+    """
+    if not HAS_NUMPY:
+        rows = [
+            _score_heat_one(float(r), float(e), float(v), bool(f))
+            for r, e, v, f in zip(rsi, ema_dist, vol_score, reserve_flag)
+        ]
+        keys = ('rsi_raw', 'ema_raw', 'vol_raw', 'bonus_raw', 'rsi', 'ema', 'vol', 'bonus', 'rsi_boost', 'total')
+        return {key: [row[key] for row in rows] for key in keys}
+
+    rsi = np.asarray(rsi, dtype=float)
+    ema_dist = np.asarray(ema_dist, dtype=float)
+    vol_raw = np.asarray(vol_score, dtype=float)
+    bonus_raw = np.where(np.asarray(reserve_flag, dtype=bool), 100.0, 0.0)
+
+    # 1) RSI: máximo si RSI entre 45-65; boost cerca del neutro para romper empates
+    has_rsi = ~np.isnan(rsi)
+    distance = np.abs(np.nan_to_num(rsi, nan=50.0) - 50.0)
+    rsi_raw = np.where(
+        (rsi >= 45.0) & (rsi <= 65.0),
+        100.0,
+        np.maximum(0.0, 100.0 - distance * 3.0)
+    )
+    rsi_raw = np.where(has_rsi, rsi_raw, 0.0)
+    rsi_boost = np.where(has_rsi, np.maximum(0.0, 20.0 - distance * 1.5), 0.0)
+
+    # 2) EMA: máximo si por encima de EMA y < 2%; 0 en +10% o en -5%
+    ema = np.nan_to_num(ema_dist, nan=0.0)
+    ema_raw = np.where(
+        (ema > 0) & (ema <= 2.0),
+        100.0,
+        np.where(
+            ema > 2.0,
+            np.maximum(0.0, 100.0 - ((ema - 2.0) / 8.0) * 100.0),
+            np.maximum(0.0, 100.0 - (np.abs(ema) / 5.0) * 100.0)
+        )
+    )
+    ema_raw = np.where(np.isnan(ema_dist), 0.0, ema_raw)
+
+    # Contribuciones (puntos reales sobre 100)
+    contrib_rsi = rsi_raw * HEAT_WEIGHTS['rsi']
+    contrib_ema = ema_raw * HEAT_WEIGHTS['ema']
+    contrib_vol = vol_raw * HEAT_WEIGHTS['vol']
+    contrib_bonus = bonus_raw * HEAT_WEIGHTS['bonus']
+
+    raw_total = BASE_SCORE + contrib_rsi + contrib_ema + contrib_vol + contrib_bonus + rsi_boost
+
+    return {
+        'rsi_raw': rsi_raw,
+        'ema_raw': ema_raw,
+        'vol_raw': vol_raw,
+        'bonus_raw': bonus_raw,
+        'rsi': contrib_rsi,
+        'ema': contrib_ema,
+        'vol': contrib_vol,
+        'bonus': contrib_bonus,
+        'rsi_boost': rsi_boost,
+        'total': np.clip(raw_total, 0.0, 100.0)
+    }
+
+
+def _to_float(value: Any) -> float:
+    """Convierte a float; None o valores no numéricos pasan a NaN."""
+    try:
+        return float(value) if value is not None else math.nan
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def score_signals(signals: List[Optional[Dict[str, Any]]], reserve_assets: Iterable[str]) -> List[int]:
+    """
+    Puntúa una lista de señales y escribe `heat_components` en cada una.
+
+    Args:
+        signals: Dicts de señal (rsi, ema200_distance, volume_status, currency/pair)
+        reserve_assets: Activos que reciben el bonus de reserva
+
+    Returns:
+        Lista de heat_scores enteros (0 para señales vacías)
+    """
+    if not signals:
+        return []
+
+    reserve = set(reserve_assets)
+    rsi, ema_dist, vol_score, reserve_flag = [], [], [], []
+    for signal in signals:
+        signal = signal or {}
+        rsi.append(_to_float(signal.get('rsi')))
+        ema_dist.append(_to_float(signal.get('ema200_distance')))
+        vol_score.append(volume_status_score(signal.get('volume_status')))
+        # currency puede ser 'BTC' o 'BTC/EUR' dependiendo del origen
+        currency = signal.get('currency') or signal.get('pair')
+        reserve_flag.append(isinstance(currency, str) and currency.split('/')[0] in reserve)
+
+    scores = score_heat_batch(rsi, ema_dist, vol_score, reserve_flag)
+    totals = scores['total']
+
+    results = []
+    for i, signal in enumerate(signals):
+        if not signal:
+            results.append(0)
+            continue
+        total = int(round(float(totals[i])))
+        # Guardar desglose en el resultado para que el radar lo exponga
+        signal['heat_components'] = {
+            'rsi_raw': round(float(scores['rsi_raw'][i]), 2),
+            'ema_raw': round(float(scores['ema_raw'][i]), 2),
+            'vol_raw': round(float(scores['vol_raw'][i]), 2),
+            'bonus_raw': round(float(scores['bonus_raw'][i]), 2),
+            'rsi': round(float(scores['rsi'][i])),
+            'ema': round(float(scores['ema'][i])),
+            'vol': round(float(scores['vol'][i])),
+            'bonus': round(float(scores['bonus'][i])),
+            'rsi_boost': round(float(scores['rsi_boost'][i]), 2),
+            'base': BASE_SCORE,
+            'total': total
+        }
+        results.append(total)
+    return results
@@ -0,0 +1,213 @@
+"""
+Profundidad de mercado: cache de libros de órdenes y estimación de fills por VWAP.
+
+Valorar una orden al mejor bid/ask solo es fiable si la cantidad cabe en el
+primer nivel del libro. En pares con poca liquidez una orden de mercado barre
+varios niveles y el precio medio (VWAP) es peor que el top-of-book.
+
+- OrderBookCache guarda libros con profundidad limitada (`depth` niveles) y un
+  TTL corto, compartidos por valoración de rutas y dimensionado de órdenes.
+- estimate_fill() recorre el libro y devuelve la cantidad recibida, el precio
+  medio y el impacto de precio respecto al mejor nivel.
+- estimate_input() resuelve el problema inverso (cuánto hay que entregar para
+  recibir una cantidad) y max_input_within_impact() la cantidad máxima que se
+  puede ejecutar sin superar un impacto dado.
+
+Lados: 'sell' entrega BASE y recibe QUOTE contra los bids; 'buy' entrega QUOTE
+y recibe BASE contra los asks.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEPTH = 20
+DEFAULT_TTL = 2.0
+DEFAULT_TAKER_FEE = 0.001
+DEFAULT_MAX_PRICE_IMPACT_PCT = 1.0
+
+
+def _levels(book: Optional[Dict[str, Any]], side: str) -> List[Tuple[float, float]]:
+    """Niveles (precio, cantidad base) contra los que se ejecuta el lado."""
+    if not book:
+        return []
+    levels = book.get('bids' if side == 'sell' else 'asks') or []
+    return [(float(level[0]), float(level[1])) for level in levels if level[0] and level[1]]
+
+
+def estimate_fill(book: Optional[Dict[str, Any]], side: str, amount: float,
+                  fee: float = DEFAULT_TAKER_FEE) -> Optional[Dict[str, Any]]:
+    """
+    Estima una orden de mercado recorriendo el libro.
+
+    Args:
+        book: Libro de órdenes (formato ccxt)
+        side: 'sell' (amount en BASE) o 'buy' (amount en QUOTE)
+        amount: Cantidad entregada
+        fee: Comisión taker
+
+    Returns:
+        Dict con output (recibido tras comisión), filled (entregado que cabe en
+        el libro), avg_price, best_price, price_impact_pct y complete, o None si
+        el libro está vacío. Si la profundidad cargada no alcanza (complete=False)
+        el resto se valora al peor nivel cargado.
+    """
+    levels = _levels(book, side)
+    if not levels or amount <= 0:
+        return None
+    remaining = amount
+    base_total = 0.0
+    quote_total = 0.0
+    for price, quantity in levels:
+        if side == 'sell':
+            take = min(remaining, quantity)
+            base_total += take
+            quote_total += take * price
+        else:
+            take = min(remaining, quantity * price)
+            quote_total += take
+            base_total += take / price
+        remaining -= take
+        if remaining <= 1e-12:
+            break
+    if base_total <= 0:
+        return None
+    filled = amount - max(0.0, remaining)
+    if remaining > 1e-12:
+        worst_price = levels[-1][0]
+        if side == 'sell':
+            base_total += remaining
+            quote_total += remaining * worst_price
+        else:
+            quote_total += remaining
+            base_total += remaining / worst_price
+    best_price = levels[0][0]
+    avg_price = quote_total / base_total
+    received = quote_total if side == 'sell' else base_total
+    return {
+        'output': received * (1 - fee),
+        'filled': filled,
+        'avg_price': avg_price,
+        'best_price': best_price,
+        'price_impact_pct': abs(avg_price - best_price) / best_price * 100,
+        'complete': filled >= amount - 1e-12
+    }
+
+
+def estimate_input(book: Optional[Dict[str, Any]], side: str, desired_output: float,
+                   fee: float = DEFAULT_TAKER_FEE) -> Optional[float]:
+    """
+    Cantidad a entregar para recibir `desired_output` tras comisión.
+
+    Returns:
+        Cantidad de entrada (BASE si 'sell', QUOTE si 'buy') o None si la
+        profundidad cargada no alcanza
+    """
+    levels = _levels(book, side)
+    if not levels or desired_output <= 0:
+        return None
+    remaining = desired_output / (1 - fee)
+    spent = 0.0
+    for price, quantity in levels:
+        # Lo que ofrece el nivel en la moneda recibida
+        available = quantity * price if side == 'sell' else quantity
+        take = min(remaining, available)
+        spent += take / price if side == 'sell' else take * price
+        remaining -= take
+        if remaining <= 1e-12:
+            return spent
+    return None
+
+
+def max_input_within_impact(book: Optional[Dict[str, Any]], side: str,
+                            max_impact_pct: float) -> Optional[float]:
+    """
+    Entrada máxima que solo toca niveles a menos de `max_impact_pct` del mejor
+    precio (el impacto medio queda por debajo del umbral).
+
+    Returns:
+        Cantidad máxima (BASE si 'sell', QUOTE si 'buy') o None si el libro está vacío
+    """
+    levels = _levels(book, side)
+    if not levels:
+        return None
+    best_price = levels[0][0]
+    total = 0.0
+    for price, quantity in levels:
+        if abs(price - best_price) / best_price * 100 > max_impact_pct:
+            break
+        total += quantity if side == 'sell' else quantity * price
+    return total
+
+
+class OrderBookCache:
+    """Libros de órdenes por par con profundidad limitada y TTL corto."""
+
+    def __init__(self, fetch: Callable[[str, int], Awaitable[Dict[str, Any]]],
+                 depth: int = DEFAULT_DEPTH, ttl: float = DEFAULT_TTL,
+                 max_price_impact_pct: float = DEFAULT_MAX_PRICE_IMPACT_PCT):
+        """
+        Args:
+            fetch: Corrutina (pair, limit) -> libro, p. ej. AsyncExchangeAdapter.fetch_order_book
+            depth: Niveles por lado que se piden
+            ttl: Segundos de validez de un libro
+            max_price_impact_pct: Impacto máximo aceptado al dimensionar órdenes
+        """
+        self._fetch = fetch
+        self.depth = max(1, int(depth))
+        self.ttl = float(ttl)
+        self.max_price_impact_pct = float(max_price_impact_pct)
+        self._books: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'errors': 0}
+
+    @classmethod
+    def from_config(cls, fetch: Callable[[str, int], Awaitable[Dict[str, Any]]],
+                    config: Optional[Dict[str, Any]] = None) -> 'OrderBookCache':
+        """Crea la cache desde la sección `order_book` de strategy.json."""
+        config = config or {}
+        return cls(
+            fetch,
+            depth=config.get("depth", DEFAULT_DEPTH),
+            ttl=config.get("ttl", DEFAULT_TTL),
+            max_price_impact_pct=config.get("max_price_impact_pct", DEFAULT_MAX_PRICE_IMPACT_PCT)
+        )
+
+    def peek(self, pair: str) -> Optional[Dict[str, Any]]:
+        """Libro cacheado si sigue vigente (sin red)."""
+        cached = self._books.get(pair)
+        if cached and time.time() - cached[0] < self.ttl:
+            return cached[1]
+        return None
+
+    async def get(self, pair: str) -> Optional[Dict[str, Any]]:
+        """Libro del par (de cache o descargado). None si falla la descarga."""
+        book = self.peek(pair)
+        if book is not None:
+            self.stats['hits'] += 1
+            return book
+        self.stats['misses'] += 1
+        try:
+            book = await self._fetch(pair, self.depth)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.debug(f"Error descargando libro de órdenes de {pair}: {e}")
+            return None
+        if book:
+            self._books[pair] = (time.time(), book)
+            if len(self._books) > 500:
+                now = time.time()
+                self._books = {p: v for p, v in self._books.items() if now - v[0] < self.ttl}
+        return book
+
+    async def estimate(self, pair: str, side: str, amount: float,
+                       fee: float = DEFAULT_TAKER_FEE) -> Optional[Dict[str, Any]]:
+        """estimate_fill() sobre el libro del par."""
+        return estimate_fill(await self.get(pair), side, amount, fee)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores de cache."""
+        return {**self.stats, 'cached': len(self._books)}
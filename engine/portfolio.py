@@ -0,0 +1,162 @@
+"""
+Snapshot de cartera valorado una vez por tick.
+
+Capital real de inversión, porcentaje de gas, valor de la hucha y
+sobreexposición salen de los mismos datos: el balance del exchange, las
+cantidades guardadas en hucha_diversificada.json y el precio en EUR de cada
+activo. Antes cada cálculo volvía a pedir el balance, releer la hucha y valorar
+todos los activos por su cuenta, y se encadenaban entre sí varias veces por tick.
+
+PortfolioSnapshot.build() valora la unión de activos (balance + hucha) con una
+sola llamada por lotes (Vault.get_asset_values), deriva el precio unitario de
+cada activo y calcula todo a partir de ahí. El resultado es inmutable: el motor
+lo reutiliza mientras no cambien el balance (orden ejecutada o tick nuevo) ni
+el fichero de la hucha.
+"""
+import time
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+GAS_ASSET = 'BNB'
+# Activos que no cuentan para la sobreexposición (FIAT y BNB de gas)
+EXPOSURE_EXCLUDED = frozenset({'EUR', 'USDC', 'BNB'})
+DEFAULT_MAX_POSITION_PCT = 0.25
+DEFAULT_TARGET_GAS_PERCENT = 5.0
+# Saldo mínimo que cuenta para el valor total del portfolio (incluye polvo de BTC/BNB)
+DUST_AMOUNT = 0.00000001
+
+
+class PortfolioSnapshot:
+    """Cartera valorada (inmutable)."""
+
+    __slots__ = (
+        'amounts', 'hucha_amounts', 'operable_amounts', 'prices_eur', 'values_eur', 'hucha_values_eur',
+        'total_portfolio_eur', 'total_investment_eur', 'hucha_total_eur', 'gas_value_eur',
+        'gas_percentage', 'gas_reserve_eur', 'real_investment_balance_eur', 'overexposed', 'created_at'
+    )
+
+    def __init__(self, amounts: Mapping[str, float], hucha_amounts: Mapping[str, float],
+                 prices_eur: Mapping[str, float], max_position_pct: float = DEFAULT_MAX_POSITION_PCT,
+                 target_gas_percent: float = DEFAULT_TARGET_GAS_PERCENT):
+        """
+        Args:
+            amounts: Saldo total por activo (balance['total'])
+            hucha_amounts: Cantidad guardada en hucha por activo
+            prices_eur: Precio unitario en EUR por activo
+            max_position_pct: Fracción máxima del capital real por activo
+            target_gas_percent: Reserva de gas (% del portfolio total)
+        """
+        set_field = object.__setattr__
+        amounts = {c: float(a) for c, a in amounts.items() if a and a > 0}
+        hucha = {c: float(a) for c, a in hucha_amounts.items() if a and a > 0}
+        prices = {c: float(prices_eur.get(c) or 0.0) for c in set(amounts) | set(hucha)}
+        operable = {c: max(0.0, a - hucha.get(c, 0.0)) for c, a in amounts.items()}
+        values = {c: a * prices[c] for c, a in amounts.items()}
+        hucha_values = {c: a * prices[c] for c, a in hucha.items()}
+
+        total_portfolio = sum((v for c, v in values.items() if amounts[c] > DUST_AMOUNT), 0.0)
+        hucha_total = sum(hucha_values.values(), 0.0)
+        # Valor total de inversión: operable (sin BNB de gas) + hucha
+        total_investment = sum(
+            a * prices[c] for c, a in operable.items() if c != GAS_ASSET
+        ) + hucha_total
+        gas_value = values.get(GAS_ASSET, 0.0)
+        gas_percentage = gas_value / total_investment * 100.0 if total_investment > 0 else 0.0
+        gas_reserve = total_portfolio * (target_gas_percent / 100.0)
+        real_investment = max(0.0, total_portfolio - gas_reserve - hucha_total)
+
+        overexposed: List[Dict[str, Any]] = []
+        if real_investment > 0:
+            max_position_value = real_investment * max_position_pct
+            for currency, value in values.items():
+                if currency in EXPOSURE_EXCLUDED or value <= 0:
+                    continue
+                percent = value / real_investment * 100.0
+                if percent > max_position_pct * 100:
+                    excess = value - max_position_value
+                    overexposed.append({
+                        'currency': currency,
+                        'current_value_eur': value,
+                        'current_percent': percent,
+                        'excess_value_eur': excess,
+                        'excess_percent': excess / value * 100.0
+                    })
+
+        set_field(self, 'amounts', MappingProxyType(amounts))
+        set_field(self, 'hucha_amounts', MappingProxyType(hucha))
+        set_field(self, 'operable_amounts', MappingProxyType(operable))
+        set_field(self, 'prices_eur', MappingProxyType(prices))
+        set_field(self, 'values_eur', MappingProxyType(values))
+        set_field(self, 'hucha_values_eur', MappingProxyType(hucha_values))
+        set_field(self, 'total_portfolio_eur', total_portfolio)
+        set_field(self, 'total_investment_eur', total_investment)
+        set_field(self, 'hucha_total_eur', hucha_total)
+        set_field(self, 'gas_value_eur', gas_value)
+        set_field(self, 'gas_percentage', gas_percentage)
+        set_field(self, 'gas_reserve_eur', gas_reserve)
+        set_field(self, 'real_investment_balance_eur', real_investment)
+        set_field(self, 'overexposed', tuple(MappingProxyType(entry) for entry in overexposed))
+        set_field(self, 'created_at', time.time())
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"PortfolioSnapshot es inmutable ({name})")
+
+    @classmethod
+    def build(cls, balances: Optional[Dict[str, Any]], hucha_amounts: Optional[Dict[str, float]],
+              value_assets: Callable[[Dict[str, float]], Dict[str, float]],
+              **kwargs) -> 'PortfolioSnapshot':
+        """
+        Valora la cartera con una sola llamada por lotes.
+
+        Args:
+            balances: Balance con el formato de ccxt.fetch_balance()
+            hucha_amounts: Cantidad guardada en hucha por activo
+            value_assets: {activo: cantidad} -> {activo: valor EUR}, p. ej. Vault.get_asset_values
+
+        Returns:
+            PortfolioSnapshot
+        """
+        amounts = (balances or {}).get('total') or {}
+        hucha_amounts = hucha_amounts or {}
+        # Cantidad de referencia por activo: el precio unitario se deriva de su valor
+        quantities = {
+            c: max(float(amounts.get(c) or 0.0), float(hucha_amounts.get(c) or 0.0))
+            for c in set(amounts) | set(hucha_amounts)
+        }
+        quantities = {c: q for c, q in quantities.items() if q > 0}
+        values = value_assets(quantities) if quantities else {}
+        prices = {c: (values.get(c) or 0.0) / q for c, q in quantities.items()}
+        return cls(amounts, hucha_amounts, prices, **kwargs)
+
+    @classmethod
+    def empty(cls) -> 'PortfolioSnapshot':
+        """Snapshot sin activos (valores a cero)."""
+        return cls({}, {}, {})
+
+    def capital_info(self) -> Dict[str, float]:
+        """Desglose de capital con el formato de _calculate_real_investment_balance()."""
+        if self.total_portfolio_eur <= 0:
+            return {
+                'total_portfolio_eur': 0.0,
+                'gas_reserve_eur': 0.0,
+                'hucha_total_eur': 0.0,
+                'real_investment_balance_eur': 0.0,
+                'gas_percentage': 0.0
+            }
+        return {
+            'total_portfolio_eur': self.total_portfolio_eur,
+            'gas_reserve_eur': self.gas_reserve_eur,
+            'hucha_total_eur': self.hucha_total_eur,
+            'real_investment_balance_eur': self.real_investment_balance_eur,
+            'gas_percentage': self.gas_percentage
+        }
+
+    def overexposure(self) -> List[Dict[str, Any]]:
+        """Activos que superan el máximo por posición (copias mutables)."""
+        return [dict(entry) for entry in self.overexposed]
+
+    def value_of(self, currency: str, amount: Optional[float] = None) -> float:
+        """Valor en EUR del saldo del activo (o de `amount` al mismo precio)."""
+        if amount is None:
+            return self.values_eur.get(currency, 0.0)
+        return amount * self.prices_eur.get(currency, 0.0)
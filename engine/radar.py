@@ -0,0 +1,377 @@
+"""
+Tabla columnar del radar.
+
+Sustituye el antiguo `radar_data_cache` (un dict grande por par, con campos
+duplicados como `24h`/`change_24h`/`price_change_24h`/`priceChangePercent` o
+`vol`/`quote_volume`) por una tabla con una columna tipada por campo y un índice
+clave→fila. Cada dato se guarda una sola vez; los alias que espera el dashboard
+se generan solo al serializar una fila (rows(), __getitem__).
+
+Además se mantiene un índice ordenado por heat_score (lista de (-heat, clave)
+actualizada con bisect en cada escritura): top-k, umbral mínimo, rango y zona se
+resuelven con búsqueda binaria y solo se serializan las filas devueltas, sin
+copiar ni reordenar la cache en cada lector.
+"""
+import bisect
+import math
+import threading
+import time
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Columnas numéricas (array de doubles; NaN = sin dato)
+NUMERIC_FIELDS = (
+    'heat_score', 'rsi', 'ema200_distance', 'price_change_24h', 'volume_change_24h',
+    'quote_volume', 'current_price', 'profit_potential', 'origin_heat_score',
+    'improvement_score', 'improvement_percent', 'conditions_met'
+)
+# Columnas de texto / booleanas (lista; None = sin dato)
+OBJECT_FIELDS = (
+    'currency', 'pair', 'origin', 'destination', 'swap_label', 'volume_status',
+    'missing_condition', 'note', 'triple_green', 'buy_the_dip'
+)
+# Alias de entrada y salida -> campo canónico
+FIELD_ALIASES = {
+    '24h': 'price_change_24h',
+    'change_24h': 'price_change_24h',
+    'priceChangePercent': 'price_change_24h',
+    'vol': 'quote_volume',
+    'vol_pct': 'volume_change_24h',
+    'volume_change': 'volume_change_24h'
+}
+# Campos enteros cuando el valor no tiene decimales
+INTEGER_FIELDS = ('heat_score', 'conditions_met')
+# Campos que se serializan aunque no tengan dato (los lectores esperan la clave)
+ALWAYS_SERIALIZED = ('heat_score', 'rsi', 'ema200_distance')
+
+# Zonas del radar: (nombre, heat mínimo) de mayor a menor; muy_caliente es heat > 85
+RADAR_ZONES = (
+    ('muy_caliente', 85.0),
+    ('caliente', 70.0),
+    ('fria', 40.0),
+    ('muy_fria', None)
+)
+
+_NAN = float('nan')
+# Mayor que cualquier clave: cota superior para búsquedas por heat
+_MAX_KEY = '\U0010ffff'
+
+
+def radar_zone(heat_score: float) -> str:
+    """Zona del radar según el heat_score (>85, 70-85, 40-69, <40)."""
+    if heat_score > 85:
+        return 'muy_caliente'
+    elif heat_score >= 70:
+        return 'caliente'
+    elif heat_score >= 40:
+        return 'fria'
+    return 'muy_fria'
+
+
+def _to_number(value: Any) -> float:
+    try:
+        return float(value) if value is not None else _NAN
+    except (TypeError, ValueError):
+        return _NAN
+
+
+def _from_number(value: float, name: str) -> Optional[Any]:
+    if math.isnan(value):
+        return None
+    if name in INTEGER_FIELDS and value.is_integer():
+        return int(value)
+    return value
+
+
+class RadarTable:
+    """Datos del radar por clave (moneda o 'ORIGEN/DESTINO') en columnas."""
+
+    def __init__(self):
+        self._index: Dict[str, int] = {}
+        self._keys: List[str] = []
+        self._numeric: Dict[str, array] = {name: array('d') for name in NUMERIC_FIELDS}
+        self._objects: Dict[str, List[Any]] = {name: [] for name in OBJECT_FIELDS}
+        # Campos no tabulados (heat_components, historiales...) solo en las filas que los tienen
+        self._extra: List[Optional[Dict[str, Any]]] = []
+        self._updated = array('d')
+        # Índice ordenado por heat descendente: (-heat, clave)
+        self._order: List[Tuple[float, str]] = []
+        self._lock = threading.RLock()
+
+    def _heat(self, row: int) -> float:
+        heat = self._numeric['heat_score'][row]
+        return 0.0 if math.isnan(heat) else heat
+
+    def _unindex(self, key: str, row: int):
+        entry = (-self._heat(row), key)
+        pos = bisect.bisect_left(self._order, entry)
+        if pos < len(self._order) and self._order[pos] == entry:
+            del self._order[pos]
+
+    # --- Escritura ---
+
+    def upsert(self, key: str, data: Dict[str, Any], ts: Optional[float] = None):
+        """
+        Inserta o reemplaza la fila de `key` con los campos de `data`.
+        Los alias (24h, vol, ...) se guardan en su campo canónico.
+
+        Args:
+            key: Moneda o par 'ORIGEN/DESTINO'
+            data: Entrada del radar (formato dict de las versiones anteriores)
+            ts: Instante de actualización (default: ahora)
+        """
+        values: Dict[str, Any] = {}
+        extra: Dict[str, Any] = {}
+        for name, value in data.items():
+            canonical = FIELD_ALIASES.get(name, name)
+            if canonical in self._numeric or canonical in self._objects:
+                # El campo canónico prevalece sobre sus alias
+                if canonical not in values or name == canonical:
+                    values[canonical] = value
+            else:
+                extra[name] = value
+
+        with self._lock:
+            row = self._index.get(key)
+            if row is None:
+                row = len(self._keys)
+                self._index[key] = row
+                self._keys.append(key)
+                for name, column in self._numeric.items():
+                    column.append(_to_number(values.get(name)))
+                for name, column in self._objects.items():
+                    column.append(values.get(name))
+                self._extra.append(extra or None)
+                self._updated.append(time.time() if ts is None else ts)
+                bisect.insort(self._order, (-self._heat(row), key))
+                return
+            self._unindex(key, row)
+            for name, column in self._numeric.items():
+                column[row] = _to_number(values.get(name))
+            for name, column in self._objects.items():
+                column[row] = values.get(name)
+            self._extra[row] = extra or None
+            self._updated[row] = time.time() if ts is None else ts
+            bisect.insort(self._order, (-self._heat(row), key))
+
+    def __setitem__(self, key: str, data: Dict[str, Any]):
+        self.upsert(key, data)
+
+    def remove(self, key: str) -> bool:
+        """Elimina la fila de `key` (la última fila ocupa su hueco)."""
+        with self._lock:
+            row = self._index.pop(key, None)
+            if row is None:
+                return False
+            self._unindex(key, row)
+            last = len(self._keys) - 1
+            if row != last:
+                moved = self._keys[last]
+                self._keys[row] = moved
+                self._index[moved] = row
+                for column in self._numeric.values():
+                    column[row] = column[last]
+                for column in self._objects.values():
+                    column[row] = column[last]
+                self._extra[row] = self._extra[last]
+                self._updated[row] = self._updated[last]
+            self._keys.pop()
+            for column in self._numeric.values():
+                column.pop()
+            for column in self._objects.values():
+                column.pop()
+            self._extra.pop()
+            self._updated.pop()
+            return True
+
+    def __delitem__(self, key: str):
+        if not self.remove(key):
+            raise KeyError(key)
+
+    def prune(self, max_age: float, now: Optional[float] = None) -> int:
+        """Elimina las filas no actualizadas en `max_age` segundos. Devuelve cuántas."""
+        now = time.time() if now is None else now
+        with self._lock:
+            stale = [key for key, row in self._index.items() if now - self._updated[row] > max_age]
+            for key in stale:
+                self.remove(key)
+        return len(stale)
+
+    def trim(self, max_entries: int) -> int:
+        """Conserva solo las `max_entries` filas actualizadas más recientemente."""
+        with self._lock:
+            excess = len(self._keys) - max_entries
+            if excess <= 0:
+                return 0
+            oldest = sorted(self._index.items(), key=lambda item: self._updated[item[1]])[:excess]
+            for key, _ in oldest:
+                self.remove(key)
+        return excess
+
+    def clear(self):
+        """Elimina todas las filas."""
+        with self._lock:
+            self._index.clear()
+            self._keys.clear()
+            for name in self._numeric:
+                self._numeric[name] = array('d')
+            for column in self._objects.values():
+                column.clear()
+            self._extra.clear()
+            self._updated = array('d')
+            self._order.clear()
+
+    # --- Lectura ---
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._keys))
+
+    def keys(self) -> List[str]:
+        return list(self._keys)
+
+    def last_update(self, key: str, default: float = 0.0) -> float:
+        """Instante de la última actualización de `key`."""
+        row = self._index.get(key)
+        return self._updated[row] if row is not None else default
+
+    def get_value(self, key: str, field: str, default: Any = None) -> Any:
+        """Valor de un campo de una fila sin serializarla entera."""
+        field = FIELD_ALIASES.get(field, field)
+        with self._lock:
+            row = self._index.get(key)
+            if row is None:
+                return default
+            if field in self._numeric:
+                value = _from_number(self._numeric[field][row], field)
+            elif field in self._objects:
+                value = self._objects[field][row]
+            else:
+                value = (self._extra[row] or {}).get(field)
+        return default if value is None else value
+
+    def _row_dict(self, row: int) -> Dict[str, Any]:
+        """Serializa una fila con los alias del dashboard (siempre un dict nuevo)."""
+        entry: Dict[str, Any] = {}
+        for name, column in self._objects.items():
+            value = column[row]
+            if value is not None:
+                entry[name] = value
+        for name, column in self._numeric.items():
+            value = _from_number(column[row], name)
+            if value is not None or name in ALWAYS_SERIALIZED:
+                entry[name] = value
+        for alias, canonical in FIELD_ALIASES.items():
+            if canonical in entry:
+                entry[alias] = entry[canonical]
+        extra = self._extra[row]
+        if extra:
+            entry.update(extra)
+        return entry
+
+    def __getitem__(self, key: str) -> Dict[str, Any]:
+        with self._lock:
+            row = self._index.get(key)
+            if row is None:
+                raise KeyError(key)
+            return self._row_dict(row)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._index.get(key)
+            return self._row_dict(row) if row is not None else default
+
+    def items(self, since: Optional[float] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        """Pares (clave, fila); con `since`, solo las filas actualizadas desde ese instante."""
+        with self._lock:
+            return [
+                (key, self._row_dict(row)) for key, row in self._index.items()
+                if since is None or self._updated[row] >= since
+            ]
+
+    def rows(self, exclude: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Todas las filas serializadas, ordenadas por heat_score descendente.
+
+        Args:
+            exclude: Claves a omitir
+        """
+        exclude = set(exclude or ())
+        with self._lock:
+            return [self._row_dict(self._index[key]) for _, key in self._order if key not in exclude]
+
+    def _count_above(self, heat: float, inclusive: bool) -> int:
+        """Número de filas con heat > `heat` (o >= si inclusive)."""
+        if inclusive:
+            return bisect.bisect_right(self._order, (-heat, _MAX_KEY))
+        return bisect.bisect_left(self._order, (-heat, ''))
+
+    def top(self, k: Optional[int] = None, min_heat: Optional[float] = None,
+            exclude: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Mejores filas por heat_score sin recorrer ni ordenar la tabla.
+
+        Args:
+            k: Número máximo de filas (None = sin límite)
+            min_heat: Solo filas con heat_score >= min_heat
+            exclude: Claves a omitir
+        """
+        exclude = set(exclude or ())
+        with self._lock:
+            end = len(self._order) if min_heat is None else self._count_above(min_heat, inclusive=True)
+            result = []
+            for i in range(end):
+                key = self._order[i][1]
+                if key in exclude:
+                    continue
+                result.append(self._row_dict(self._index[key]))
+                if k is not None and len(result) >= k:
+                    break
+            return result
+
+    def ranked_keys(self, k: Optional[int] = None) -> List[Tuple[str, float]]:
+        """(clave, heat_score) por heat descendente, sin serializar filas."""
+        with self._lock:
+            order = self._order if k is None else self._order[:k]
+            return [(key, -neg_heat) for neg_heat, key in order]
+
+    def rank(self, key: str) -> Optional[int]:
+        """Posición (0 = mayor heat) de `key` en el índice, None si no existe."""
+        with self._lock:
+            row = self._index.get(key)
+            if row is None:
+                return None
+            return bisect.bisect_left(self._order, (-self._heat(row), key))
+
+    def _zone_bounds(self, zone: str) -> Tuple[int, int]:
+        start = 0
+        for name, threshold in RADAR_ZONES:
+            # muy_caliente es estricto (> 85); el resto incluye su umbral
+            if threshold is None:
+                end = len(self._order)
+            else:
+                end = self._count_above(threshold, inclusive=(name != 'muy_caliente'))
+            if name == zone:
+                return start, end
+            start = end
+        raise ValueError(f"Zona de radar desconocida: {zone}")
+
+    def zone_keys(self, zone: str) -> List[str]:
+        """Claves de una zona ('muy_caliente', 'caliente', 'fria', 'muy_fria') por heat descendente."""
+        with self._lock:
+            start, end = self._zone_bounds(zone)
+            return [key for _, key in self._order[start:end]]
+
+    def zone_counts(self) -> Dict[str, int]:
+        """Número de filas en cada zona."""
+        with self._lock:
+            counts = {}
+            for name, _ in RADAR_ZONES:
+                start, end = self._zone_bounds(name)
+                counts[name] = end - start
+            return counts
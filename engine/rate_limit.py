@@ -0,0 +1,339 @@
+"""
+Planificador de rate limit con pesos de Binance y carriles de prioridad.
+
+Binance limita por *peso* de petición por minuto (no por número de llamadas) y
+`enableRateLimit` de ccxt trata igual una orden que un escaneo en frío. Aquí se
+mantiene un presupuesto compartido (token bucket en unidades de peso) y cada
+petición se cobra en un carril:
+
+    EJECUCIÓN > MONITORIZACIÓN > RADAR CALIENTE > ESCANEOS (templado/frío)
+
+Cada carril solo puede gastar mientras quede por encima de su reserva; cuando
+el presupuesto baja, los carriles inferiores esperan y, si la espera supera su
+máximo, la petición se descarta (RequestShed). El carril actual viaja en un
+ContextVar, así que las tareas asyncio heredan el carril de quien las creó.
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Carriles (menor número = mayor prioridad)
+LANE_EXECUTION = 0
+LANE_MONITOR = 1
+LANE_HOT = 2
+LANE_SCAN = 3
+LANE_NAMES = {
+    LANE_EXECUTION: 'execution',
+    LANE_MONITOR: 'monitor',
+    LANE_HOT: 'hot',
+    LANE_SCAN: 'scan'
+}
+
+# Fracción del presupuesto que cada carril debe dejar libre para los superiores
+DEFAULT_LANE_RESERVES = {LANE_EXECUTION: 0.0, LANE_MONITOR: 0.10, LANE_HOT: 0.25, LANE_SCAN: 0.50}
+# Espera máxima por carril antes de descartar la petición (None = esperar siempre)
+DEFAULT_LANE_MAX_WAIT = {LANE_EXECUTION: None, LANE_MONITOR: 10.0, LANE_HOT: 5.0, LANE_SCAN: 2.0}
+
+# Límite de peso por minuto de Binance spot y margen de seguridad
+DEFAULT_WEIGHT_PER_MINUTE = 6000
+DEFAULT_SAFETY_FACTOR = 0.8
+
+# Peso de cada endpoint ccxt en Binance spot
+ENDPOINT_WEIGHTS = {
+    'fetch_ticker': 2,
+    'fetch_tickers': 80,
+    'fetch_ohlcv': 2,
+    'fetch_order_book': 5,
+    'fetch_balance': 20,
+    'fetch_my_trades': 20,
+    'fetch_order': 4,
+    'fetch_open_orders': 6,
+    'load_markets': 20,
+    'create_order': 1,
+    'create_market_buy_order': 1,
+    'create_market_sell_order': 1,
+    'cancel_order': 1
+}
+
+# Métodos que siempre van por el carril de ejecución
+EXECUTION_METHODS = ('create_order', 'create_market_buy_order', 'create_market_sell_order', 'cancel_order')
+
+_current_lane: contextvars.ContextVar = contextvars.ContextVar('request_lane', default=LANE_SCAN)
+# True cuando el peso ya se cobró antes de entrar en el executor (evita doble cobro)
+_prepaid: contextvars.ContextVar = contextvars.ContextVar('request_prepaid', default=False)
+
+
+class RequestShed(Exception):
+    """Petición descartada por falta de presupuesto de peso en su carril."""
+
+
+def request_weight(method: str, *args, **kwargs) -> int:
+    """
+    Peso de Binance de una llamada ccxt.
+
+    Args:
+        method: Nombre del método ccxt (ej: 'fetch_ticker')
+    """
+    if method == 'fetch_order_book':
+        limit = kwargs.get('limit', args[1] if len(args) > 1 else None) or 100
+        if limit <= 100:
+            return 5
+        if limit <= 500:
+            return 25
+        if limit <= 1000:
+            return 50
+        return 250
+    if method == 'fetch_tickers':
+        symbols = kwargs.get('symbols', args[0] if args else None)
+        # 24hr con símbolos concretos: 2 por símbolo hasta el peso del listado completo
+        if symbols:
+            return min(2 * len(symbols), ENDPOINT_WEIGHTS['fetch_tickers'])
+    return ENDPOINT_WEIGHTS.get(method, 1)
+
+
+def current_lane() -> int:
+    """Carril de la tarea/hilo actual."""
+    return _current_lane.get()
+
+
+@contextmanager
+def request_lane(lane: int):
+    """
+    Ejecuta el bloque en un carril. La prioridad solo sube: dentro de un bloque
+    de ejecución, una llamada anidada de escaneo sigue cobrándose como ejecución.
+    """
+    token = _current_lane.set(min(_current_lane.get(), lane))
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+def _on_event_loop() -> bool:
+    """True si el hilo actual está ejecutando un event loop de asyncio."""
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+def set_task_lane(lane: int):
+    """
+    Fija el carril para el resto de la tarea asyncio actual (cada tarea tiene su
+    propia copia del contexto, así que no afecta a otras tareas).
+    """
+    _current_lane.set(min(_current_lane.get(), lane))
+
+
+def with_lane(lane: int):
+    """Decorador para métodos async: ejecuta la corrutina en el carril indicado."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with request_lane(lane):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class RateLimitScheduler:
+    """Token bucket de peso compartido con reservas por carril."""
+
+    def __init__(self, weight_per_minute: int = DEFAULT_WEIGHT_PER_MINUTE,
+                 safety_factor: float = DEFAULT_SAFETY_FACTOR,
+                 lane_reserves: Optional[Dict[int, float]] = None,
+                 lane_max_wait: Optional[Dict[int, Optional[float]]] = None):
+        """
+        Args:
+            weight_per_minute: Límite de peso por minuto del exchange
+            safety_factor: Fracción del límite que se permite usar
+            lane_reserves: Reserva por carril (fracción del presupuesto)
+            lane_max_wait: Espera máxima por carril en segundos (None = sin límite)
+        """
+        self.capacity = max(1.0, weight_per_minute * safety_factor)
+        self.refill_rate = self.capacity / 60.0
+        self.lane_reserves = dict(DEFAULT_LANE_RESERVES)
+        self.lane_reserves.update(lane_reserves or {})
+        self.lane_max_wait = dict(DEFAULT_LANE_MAX_WAIT)
+        self.lane_max_wait.update(lane_max_wait or {})
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        self.stats = {
+            name: {'granted': 0, 'delayed': 0, 'shed': 0, 'weight': 0}
+            for name in LANE_NAMES.values()
+        }
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]] = None) -> 'RateLimitScheduler':
+        """Crea el planificador desde la sección `rate_limit` de strategy.json."""
+        config = config or {}
+        names = {name: lane for lane, name in LANE_NAMES.items()}
+        reserves = {names[k]: v for k, v in (config.get("lane_reserves") or {}).items() if k in names}
+        max_wait = {names[k]: v for k, v in (config.get("lane_max_wait") or {}).items() if k in names}
+        return cls(
+            weight_per_minute=config.get("weight_per_minute", DEFAULT_WEIGHT_PER_MINUTE),
+            safety_factor=config.get("safety_factor", DEFAULT_SAFETY_FACTOR),
+            lane_reserves=reserves,
+            lane_max_wait=max_wait
+        )
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.refill_rate)
+        self._last_refill = now
+
+    def _try_take(self, weight: int, lane: int) -> float:
+        """
+        Intenta cobrar `weight` en el carril. Devuelve 0 si se concedió o los
+        segundos a esperar hasta que el carril tenga presupuesto.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            floor = self.lane_reserves.get(lane, 0.0) * self.capacity
+            if self._tokens - weight >= floor:
+                self._tokens -= weight
+                return 0.0
+            return (weight + floor - self._tokens) / self.refill_rate
+
+    def _record(self, lane: int, weight: int, delayed: bool):
+        stats = self.stats[LANE_NAMES.get(lane, 'scan')]
+        stats['granted'] += 1
+        stats['weight'] += weight
+        if delayed:
+            stats['delayed'] += 1
+
+    def _shed(self, lane: int, weight: int, wait: float):
+        self.stats[LANE_NAMES.get(lane, 'scan')]['shed'] += 1
+        raise RequestShed(
+            f"Presupuesto de peso insuficiente en carril {LANE_NAMES.get(lane, lane)} "
+            f"(peso {weight}, espera estimada {wait:.1f}s)"
+        )
+
+    def _force_take(self, weight: int):
+        """Cobra el peso aunque el presupuesto quede en negativo (se recupera al rellenar)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= weight
+
+    def acquire_sync(self, weight: int, lane: Optional[int] = None):
+        """
+        Cobra el peso bloqueando el hilo si hace falta esperar.
+
+        En el hilo del event loop nunca se duerme (congelaría todas las tareas):
+        sin presupuesto la petición se descarta al momento, salvo en el carril de
+        ejecución, que se cobra igualmente.
+        """
+        lane = current_lane() if lane is None else lane
+        max_wait = self.lane_max_wait.get(lane)
+        started = time.monotonic()
+        delayed = False
+        on_loop = _on_event_loop()
+        while True:
+            wait = self._try_take(weight, lane)
+            if wait <= 0:
+                self._record(lane, weight, delayed)
+                return
+            if on_loop:
+                if lane == LANE_EXECUTION:
+                    self._force_take(weight)
+                    self._record(lane, weight, delayed)
+                    return
+                self._shed(lane, weight, wait)
+            waited = time.monotonic() - started
+            if max_wait is not None and waited + wait > max_wait:
+                self._shed(lane, weight, wait)
+            delayed = True
+            time.sleep(min(wait, 1.0))
+
+    async def acquire(self, weight: int, lane: Optional[int] = None):
+        """Cobra el peso esperando en el event loop si hace falta."""
+        lane = current_lane() if lane is None else lane
+        max_wait = self.lane_max_wait.get(lane)
+        started = time.monotonic()
+        delayed = False
+        while True:
+            wait = self._try_take(weight, lane)
+            if wait <= 0:
+                self._record(lane, weight, delayed)
+                return
+            waited = time.monotonic() - started
+            if max_wait is not None and waited + wait > max_wait:
+                self._shed(lane, weight, wait)
+            delayed = True
+            await asyncio.sleep(min(wait, 1.0))
+
+    def sync_used_weight(self, used_weight: int):
+        """
+        Ajusta el presupuesto con el peso usado que informa Binance
+        (cabecera x-mbx-used-weight-1m), que incluye otros clientes de la cuenta/IP.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            remaining = self.capacity - used_weight
+            if remaining < self._tokens:
+                self._tokens = remaining
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Presupuesto disponible y contadores por carril."""
+        with self._lock:
+            self._refill(time.monotonic())
+            tokens = self._tokens
+        return {'available': round(tokens, 1), 'capacity': self.capacity, 'lanes': self.stats}
+
+
+class RateLimitedExchange:
+    """Proxy de un exchange ccxt que cobra cada llamada en el planificador."""
+
+    def __init__(self, exchange, scheduler: RateLimitScheduler):
+        """
+        Args:
+            exchange: Instancia de exchange (ccxt)
+            scheduler: Planificador compartido
+        """
+        self._exchange = exchange
+        self.scheduler = scheduler
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._exchange, name)
+        if name not in ENDPOINT_WEIGHTS or not callable(attr):
+            return attr
+
+        def _call(*args, **kwargs):
+            if name == 'load_markets' and getattr(self._exchange, 'markets', None) \
+                    and not (kwargs.get('reload') or (args and args[0])):
+                # ccxt sirve los mercados cacheados sin petición
+                return attr(*args, **kwargs)
+            if not _prepaid.get():
+                lane = LANE_EXECUTION if name in EXECUTION_METHODS else None
+                self.scheduler.acquire_sync(request_weight(name, *args, **kwargs), lane)
+            result = attr(*args, **kwargs)
+            self._sync_from_headers()
+            return result
+        return _call
+
+    def _sync_from_headers(self):
+        """Lee el peso usado de la última respuesta de Binance si está disponible."""
+        try:
+            headers = getattr(self._exchange, 'last_response_headers', None) or {}
+            used = headers.get('x-mbx-used-weight-1m') or headers.get('X-MBX-USED-WEIGHT-1M')
+            if used is not None:
+                self.scheduler.sync_used_weight(int(used))
+        except Exception:
+            pass
+
+
+def run_prepaid(fn, *args, **kwargs):
+    """Ejecuta `fn` marcando el peso como ya cobrado (para el executor del adaptador)."""
+    token = _prepaid.set(True)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _prepaid.reset(token)
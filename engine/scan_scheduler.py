@@ -0,0 +1,246 @@
+"""
+Planificador adaptativo del escaneo de la whitelist.
+
+Sustituye los niveles fijos HOT/WARM/COLD (top 10 cada tick, 11-20 cada 3 ticks,
+resto cada 10) por una cola de prioridad en la que cada activo tiene su propio
+instante de próximo escaneo. El intervalo de cada activo se interpola entre
+`min_interval` y `max_interval` según su urgencia (0-1), que combina:
+
+- volatilidad reciente del precio (% por hora, suavizada)
+- velocidad de cambio del heat_score (puntos por minuto, suavizada)
+- si el activo está en cartera (trade activo)
+- cercanía del heat_score al umbral de entrada (radar_min_heat_score)
+
+Así las llamadas al exchange se concentran en los activos cuyo heat_score tiene
+más probabilidad de cruzar un umbral de decisión.
+"""
+import heapq
+import logging
+import math
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Peso de cada factor en la urgencia (se normaliza por la suma)
+DEFAULT_URGENCY_WEIGHTS = {
+    'volatility': 0.30,
+    'heat_velocity': 0.30,
+    'threshold': 0.25,
+    'held': 0.15
+}
+# Valores a partir de los cuales un factor satura en 1.0
+VOLATILITY_REF = 2.0        # % por hora
+HEAT_VELOCITY_REF = 5.0     # puntos de heat por minuto
+THRESHOLD_BAND = 30.0       # puntos de heat alrededor del umbral de entrada
+# Suavizado exponencial de volatilidad y velocidad de heat
+SMOOTHING = 0.3
+# Urgencia a partir de la cual un activo se escanea en el carril del radar caliente
+DEFAULT_HOT_URGENCY = 0.6
+DEFAULT_MAX_ASSETS_PER_TICK = 10
+
+
+class _AssetState:
+    """Estado de planificación de un activo."""
+
+    __slots__ = ('heat', 'price', 'observed_at', 'volatility', 'heat_velocity', 'urgency', 'due')
+
+    def __init__(self, due: float):
+        self.heat: Optional[float] = None
+        self.price: Optional[float] = None
+        self.observed_at: Optional[float] = None
+        self.volatility = 0.0
+        self.heat_velocity = 0.0
+        # Sin datos: urgencia intermedia hasta la primera observación
+        self.urgency = 0.5
+        self.due = due
+
+
+class AdaptiveScanScheduler:
+    """Cola de prioridad (próximo escaneo) por activo con intervalos adaptativos."""
+
+    def __init__(self, min_interval: float, max_interval: float, entry_threshold: float = 85.0,
+                 weights: Optional[Dict[str, float]] = None, hot_urgency: float = DEFAULT_HOT_URGENCY,
+                 max_assets_per_tick: int = DEFAULT_MAX_ASSETS_PER_TICK):
+        """
+        Args:
+            min_interval: Intervalo mínimo entre escaneos de un activo (urgencia 1)
+            max_interval: Intervalo máximo entre escaneos de un activo (urgencia 0)
+            entry_threshold: heat_score de entrada (radar_min_heat_score)
+            weights: Peso de cada factor de urgencia (ver DEFAULT_URGENCY_WEIGHTS)
+            hot_urgency: Urgencia a partir de la cual el activo se considera caliente
+            max_assets_per_tick: Activos máximos que se entregan por llamada a pop_due()
+        """
+        self.min_interval = max(0.1, float(min_interval))
+        self.max_interval = max(self.min_interval, float(max_interval))
+        self.entry_threshold = float(entry_threshold)
+        self.weights = dict(DEFAULT_URGENCY_WEIGHTS)
+        self.weights.update(weights or {})
+        self.hot_urgency = hot_urgency
+        self.max_assets_per_tick = max(1, int(max_assets_per_tick))
+        self._assets: Dict[str, _AssetState] = {}
+        self._held: set = set()
+        # Heap de (due, seq, activo); las entradas obsoletas se descartan al sacarlas
+        self._heap: List = []
+        self._seq = 0
+        self._lock = threading.Lock()
+        self.stats = {'scheduled': 0, 'observed': 0}
+
+    @classmethod
+    def from_config(cls, scan_interval: float, entry_threshold: float,
+                    config: Optional[Dict[str, Any]] = None) -> 'AdaptiveScanScheduler':
+        """Crea el planificador desde la sección `scan_scheduler` de strategy.json."""
+        config = config or {}
+        return cls(
+            min_interval=config.get("min_interval", scan_interval),
+            max_interval=config.get("max_interval", scan_interval * 10),
+            entry_threshold=entry_threshold,
+            weights=config.get("weights"),
+            hot_urgency=config.get("hot_urgency", DEFAULT_HOT_URGENCY),
+            max_assets_per_tick=config.get("max_assets_per_tick", DEFAULT_MAX_ASSETS_PER_TICK)
+        )
+
+    def _push(self, asset: str, due: float):
+        self._seq += 1
+        heapq.heappush(self._heap, (due, self._seq, asset))
+        # Compactar si se acumulan entradas obsoletas
+        if len(self._heap) > 4 * len(self._assets) + 64:
+            self._heap = [
+                (state.due, i, name) for i, (name, state) in enumerate(self._assets.items())
+                if state.due != math.inf
+            ]
+            heapq.heapify(self._heap)
+
+    def sync_assets(self, assets: Iterable[str], held: Optional[Iterable[str]] = None):
+        """
+        Ajusta el conjunto de activos planificados. Los nuevos quedan pendientes
+        de inmediato; los que ya no están se descartan.
+
+        Args:
+            assets: Activos a escanear (whitelist sin FIAT/BNB)
+            held: Activos en cartera con trade activo
+        """
+        now = time.time()
+        assets = set(assets)
+        with self._lock:
+            if held is not None:
+                self._held = set(held)
+            for asset in list(self._assets):
+                if asset not in assets:
+                    del self._assets[asset]
+            for asset in assets:
+                if asset not in self._assets:
+                    self._assets[asset] = _AssetState(now)
+                    self._push(asset, now)
+
+    def _urgency(self, asset: str, state: _AssetState) -> float:
+        if state.heat is None:
+            return 0.5
+        factors = {
+            'volatility': min(1.0, state.volatility / VOLATILITY_REF),
+            'heat_velocity': min(1.0, state.heat_velocity / HEAT_VELOCITY_REF),
+            'threshold': max(0.0, 1.0 - abs(state.heat - self.entry_threshold) / THRESHOLD_BAND),
+            'held': 1.0 if asset in self._held else 0.0
+        }
+        total_weight = sum(self.weights.values()) or 1.0
+        return sum(self.weights.get(name, 0.0) * value for name, value in factors.items()) / total_weight
+
+    def interval_for(self, urgency: float) -> float:
+        """Intervalo de escaneo para una urgencia (0 = máximo, 1 = mínimo)."""
+        urgency = min(1.0, max(0.0, urgency))
+        return self.max_interval - urgency * (self.max_interval - self.min_interval)
+
+    def observe(self, asset: str, heat_score: Optional[float], price: Optional[float] = None,
+                change_24h: Optional[float] = None):
+        """
+        Registra el resultado de un escaneo y reprograma el activo.
+
+        Args:
+            asset: Activo escaneado
+            heat_score: heat_score obtenido (None si no hubo dato)
+            price: Precio actual
+            change_24h: Variación 24h en % (semilla de volatilidad en la primera observación)
+        """
+        now = time.time()
+        with self._lock:
+            state = self._assets.get(asset)
+            if state is None:
+                return
+            if heat_score is None:
+                # Sin dato: reintentar con el intervalo máximo
+                state.due = now + self.max_interval
+                self._push(asset, state.due)
+                return
+
+            heat = float(heat_score)
+            if state.observed_at is not None and now > state.observed_at:
+                elapsed = now - state.observed_at
+                heat_rate = abs(heat - state.heat) / (elapsed / 60.0)
+                state.heat_velocity += SMOOTHING * (heat_rate - state.heat_velocity)
+                if price and state.price:
+                    price_rate = abs(math.log(price / state.price)) * 100.0 / (elapsed / 3600.0)
+                    state.volatility += SMOOTHING * (price_rate - state.volatility)
+            elif change_24h is not None:
+                state.volatility = abs(float(change_24h)) / 24.0
+
+            state.heat = heat
+            state.price = price or state.price
+            state.observed_at = now
+            state.urgency = self._urgency(asset, state)
+            state.due = now + self.interval_for(state.urgency)
+            self._push(asset, state.due)
+            self.stats['observed'] += 1
+
+    def pop_due(self, now: Optional[float] = None, limit: Optional[int] = None) -> List[str]:
+        """
+        Saca los activos cuyo escaneo está pendiente, los más atrasados primero.
+        Quedan fuera de la cola hasta que se llame a observe() o reschedule().
+
+        Args:
+            now: Instante de referencia (default: ahora)
+            limit: Máximo de activos (default: max_assets_per_tick)
+        """
+        now = time.time() if now is None else now
+        limit = self.max_assets_per_tick if limit is None else limit
+        due = []
+        with self._lock:
+            while self._heap and len(due) < limit and self._heap[0][0] <= now:
+                when, _, asset = heapq.heappop(self._heap)
+                state = self._assets.get(asset)
+                # Entrada obsoleta (activo eliminado o reprogramado)
+                if state is None or state.due != when:
+                    continue
+                state.due = math.inf
+                due.append(asset)
+            self.stats['scheduled'] += len(due)
+        return due
+
+    def reschedule(self, assets: Iterable[str], delay: Optional[float] = None):
+        """Vuelve a poner en cola activos sacados que no se escanearon."""
+        now = time.time()
+        with self._lock:
+            for asset in assets:
+                state = self._assets.get(asset)
+                if state is None:
+                    continue
+                state.due = now + (self.interval_for(state.urgency) if delay is None else delay)
+                self._push(asset, state.due)
+
+    def is_hot(self, asset: str) -> bool:
+        """True si la urgencia del activo justifica el carril del radar caliente."""
+        state = self._assets.get(asset)
+        return state is not None and (state.urgency >= self.hot_urgency or asset in self._held)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores y próximos activos de la cola."""
+        with self._lock:
+            upcoming = sorted(
+                (state.due, asset) for asset, state in self._assets.items() if state.due != math.inf
+            )[:5]
+            return {
+                **self.stats,
+                'assets': len(self._assets),
+                'heap': len(self._heap),
+                'next': [(asset, round(due - time.time(), 1)) for due, asset in upcoming]
+            }
@@ -41,6 +41,32 @@ SCHEMA = {
         CREATE INDEX IF NOT EXISTS idx_portfolio_ts ON portfolio_history(ts);
         """
     ),
+    "ohlcv_candles": (
+        """
+        CREATE TABLE IF NOT EXISTS ohlcv_candles (
+            pair TEXT NOT NULL,
+            timeframe TEXT NOT NULL,
+            ts INTEGER NOT NULL,
+            open REAL,
+            high REAL,
+            low REAL,
+            close REAL,
+            volume REAL,
+            PRIMARY KEY (pair, timeframe, ts)
+        );
+        """
+    ),
+    "indicator_state": (
+        """
+        CREATE TABLE IF NOT EXISTS indicator_state (
+            pair TEXT NOT NULL,
+            timeframe TEXT NOT NULL,
+            ts INTEGER,
+            state_json TEXT,
+            PRIMARY KEY (pair, timeframe)
+        );
+        """
+    ),
 }
 
 
@@ -110,6 +136,83 @@ def save_portfolio_snapshot(snapshot: Dict[str, Any]) -> None:
         conn.close()
 
 
+def save_candles(pair: str, timeframe: str, candles: List[List[float]]) -> int:
+    """Guarda velas cerradas [ts, o, h, l, c, v] de un par/timeframe (upsert por ts)."""
+    if not candles:
+        return 0
+    conn = connect()
+    try:
+        rows = [(pair, timeframe, int(c[0]), c[1], c[2], c[3], c[4], c[5]) for c in candles]
+        conn.executemany(
+            "REPLACE INTO ohlcv_candles (pair, timeframe, ts, open, high, low, close, volume) VALUES (?,?,?,?,?,?,?,?)",
+            rows
+        )
+        conn.commit()
+        return len(rows)
+    finally:
+        conn.close()
+
+
+def load_candles(pair: str, timeframe: str, limit: int = 500) -> List[List[float]]:
+    """Recupera las últimas `limit` velas de un par/timeframe en orden cronológico."""
+    conn = connect()
+    try:
+        cursor = conn.execute(
+            """
+            SELECT ts, open, high, low, close, volume
+            FROM ohlcv_candles
+            WHERE pair = ? AND timeframe = ?
+            ORDER BY ts DESC
+            LIMIT ?
+            """,
+            (pair, timeframe, limit)
+        )
+        rows = [list(row) for row in cursor.fetchall()]
+        rows.reverse()
+        return rows
+    finally:
+        conn.close()
+
+
+def prune_candles(pair: str, timeframe: str, min_ts: int) -> None:
+    """Elimina velas de un par/timeframe anteriores a `min_ts`."""
+    conn = connect()
+    try:
+        conn.execute(
+            "DELETE FROM ohlcv_candles WHERE pair = ? AND timeframe = ? AND ts < ?",
+            (pair, timeframe, int(min_ts))
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def save_indicator_state(pair: str, timeframe: str, state: Dict[str, Any]) -> None:
+    """Guarda el estado incremental de indicadores de un par/timeframe (upsert)."""
+    conn = connect()
+    try:
+        conn.execute(
+            "REPLACE INTO indicator_state (pair, timeframe, ts, state_json) VALUES (?,?,?,?)",
+            (pair, timeframe, state.get('last_ts'), json.dumps(state))
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def load_indicator_state(pair: str, timeframe: str) -> Optional[Dict[str, Any]]:
+    """Recupera el estado incremental de indicadores de un par/timeframe (o None)."""
+    conn = connect()
+    try:
+        row = conn.execute(
+            "SELECT state_json FROM indicator_state WHERE pair = ? AND timeframe = ?",
+            (pair, timeframe)
+        ).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+    finally:
+        conn.close()
+
+
 def get_latest_market_data(limit: int = 50) -> List[Dict[str, Any]]:
     """Recupera los últimos N registros de market_data ordenados por timestamp descendente.
     
@@ -0,0 +1,209 @@
+"""
+Presupuesto de tiempo por tick y degradación del trabajo de baja prioridad.
+
+El tick de vigilancia (stop-loss) tiene como presupuesto `scan_interval`. Si un
+tick se pasa de presupuesto (o arranca tarde porque el loop estaba saturado),
+el motor entra en modo degradado y las etapas de baja prioridad se descartan
+hasta que haya `recovery_ticks` ticks seguidos en plazo:
+
+    escaneo de activos no urgentes del radar, relleno de placeholders del
+    radar, reconstrucción del inventario dinámico
+
+Una etapa descartada `max_consecutive_sheds` veces seguidas se ejecuta igualmente
+(se pospone, no se abandona). Cada tick registra cuánto tardó cada etapa y qué
+etapas se descartaron.
+
+Las etapas de baja prioridad corren en otras tareas (radar, estado compartido),
+no dentro del tick de vigilancia: los tiempos y descartes de cualquier tarea se
+anotan en el registro del tick de vigilancia abierto en ese momento (libro de
+ticks abiertos por número de tick, bajo el mismo lock).
+"""
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Etapas que se pueden descartar cuando el tick va tarde
+LOW_PRIORITY_STAGES = ('scan_background', 'radar_placeholders', 'inventory_rebuild')
+
+DEFAULT_LATE_RATIO = 1.0
+DEFAULT_RECOVERY_TICKS = 2
+DEFAULT_MAX_CONSECUTIVE_SHEDS = 10
+DEFAULT_HISTORY = 100
+# Suavizado del coste medio de cada etapa
+COST_SMOOTHING = 0.2
+
+
+class TickBudget:
+    """Mide los ticks de vigilancia y decide qué etapas de baja prioridad se ejecutan."""
+
+    def __init__(self, interval: float, late_ratio: float = DEFAULT_LATE_RATIO,
+                 recovery_ticks: int = DEFAULT_RECOVERY_TICKS,
+                 max_consecutive_sheds: int = DEFAULT_MAX_CONSECUTIVE_SHEDS,
+                 history: int = DEFAULT_HISTORY):
+        """
+        Args:
+            interval: Presupuesto de un tick en segundos (scan_interval)
+            late_ratio: Fracción del presupuesto a partir de la cual el tick va tarde
+            recovery_ticks: Ticks seguidos en plazo para salir del modo degradado
+            max_consecutive_sheds: Descartes seguidos tras los que la etapa se fuerza
+            history: Número de ticks que se conservan en el historial
+        """
+        self.interval = max(0.1, float(interval))
+        self.late_ratio = late_ratio
+        self.recovery_ticks = max(1, int(recovery_ticks))
+        self.max_consecutive_sheds = max(1, int(max_consecutive_sheds))
+        self.history: deque = deque(maxlen=history)
+        # Coste medio (s) de cada etapa medida
+        self.stage_costs: Dict[str, float] = {}
+        self.degraded = False
+        self._on_time_streak = 0
+        self._consecutive_sheds: Dict[str, int] = {}
+        self._tick = 0
+        self._last_start: Optional[float] = None
+        # Ticks abiertos (número de tick -> registro)
+        self._open: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.stats = {'ticks': 0, 'late_ticks': 0, 'shed': 0, 'forced': 0}
+
+    @classmethod
+    def from_config(cls, interval: float, config: Optional[Dict[str, Any]] = None) -> 'TickBudget':
+        """Crea el presupuesto desde la sección `tick_budget` de strategy.json."""
+        config = config or {}
+        return cls(
+            interval,
+            late_ratio=config.get("late_ratio", DEFAULT_LATE_RATIO),
+            recovery_ticks=config.get("recovery_ticks", DEFAULT_RECOVERY_TICKS),
+            max_consecutive_sheds=config.get("max_consecutive_sheds", DEFAULT_MAX_CONSECUTIVE_SHEDS)
+        )
+
+    def _new_record(self, started: float) -> Dict[str, Any]:
+        return {'tick': self._tick, 'started': started, 'elapsed': None, 'lag': 0.0,
+                'late': False, 'stages': {}, 'shed': []}
+
+    def _open_record(self, tick: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Registro del tick `tick` si sigue abierto, o del último tick abierto (con el lock)."""
+        if tick is not None and tick in self._open:
+            return self._open[tick]
+        return self._open.get(max(self._open)) if self._open else None
+
+    @property
+    def budget(self) -> float:
+        """Segundos que puede durar un tick antes de considerarse tarde."""
+        return self.interval * self.late_ratio
+
+    def begin_tick(self):
+        """Abre un tick de vigilancia."""
+        now = time.monotonic()
+        with self._lock:
+            self._tick += 1
+            record = self._new_record(now)
+            # Retraso de arranque: el tick debía empezar un intervalo después del anterior
+            if self._last_start is not None:
+                record['lag'] = max(0.0, now - self._last_start - self.interval)
+            self._last_start = now
+            self._open[record['tick']] = record
+
+    def end_tick(self) -> Dict[str, Any]:
+        """
+        Cierra el último tick de vigilancia abierto, lo guarda en el historial
+        y actualiza el modo degradado.
+
+        Returns:
+            Registro del tick (duración, retraso, etapas y descartes)
+        """
+        with self._lock:
+            record = self._open.pop(max(self._open), None) if self._open else None
+            if record is None:
+                record = self._new_record(time.monotonic())
+            record['elapsed'] = time.monotonic() - record['started']
+            late = record['elapsed'] > self.budget or record['lag'] > self.budget
+            record['late'] = late
+            self.stats['ticks'] += 1
+            if late:
+                self.stats['late_ticks'] += 1
+                self._on_time_streak = 0
+                if not self.degraded:
+                    logger.warning(
+                        f"⏱️ Tick #{record['tick']} fuera de plazo "
+                        f"({record['elapsed']:.2f}s, retraso {record['lag']:.2f}s, presupuesto {self.budget:.2f}s): "
+                        f"degradando trabajo de baja prioridad"
+                    )
+                self.degraded = True
+            else:
+                self._on_time_streak += 1
+                if self.degraded and self._on_time_streak >= self.recovery_ticks:
+                    self.degraded = False
+                    logger.info("⏱️ Ticks en plazo de nuevo: trabajo de baja prioridad reanudado")
+            self.history.append(record)
+            return record
+
+    def should_run(self, stage: str) -> bool:
+        """
+        Decide si una etapa se ejecuta ahora. Las etapas que no son de baja
+        prioridad siempre se ejecutan. Un descarte se anota en el tick abierto,
+        sea cual sea la tarea que lo pida.
+
+        Args:
+            stage: Nombre de la etapa (ver LOW_PRIORITY_STAGES)
+        """
+        if stage not in LOW_PRIORITY_STAGES:
+            return True
+        with self._lock:
+            if not self.degraded:
+                self._consecutive_sheds[stage] = 0
+                return True
+            sheds = self._consecutive_sheds.get(stage, 0) + 1
+            if sheds > self.max_consecutive_sheds:
+                # Pospuesta demasiadas veces: ejecutar para que no quede sin datos
+                self._consecutive_sheds[stage] = 0
+                self.stats['forced'] += 1
+                return True
+            self._consecutive_sheds[stage] = sheds
+            record = self._open_record()
+            if record is not None:
+                record['shed'].append(stage)
+            self.stats['shed'] += 1
+        where = f"en el tick #{record['tick']}" if record is not None else "sin tick de vigilancia abierto"
+        logger.debug(f"⏱️ Etapa {stage} descartada {where} (descartes seguidos: {sheds})")
+        return False
+
+    @contextmanager
+    def stage(self, name: str):
+        """Mide la duración de una etapa y la anota en el tick abierto al empezarla."""
+        with self._lock:
+            tick = max(self._open) if self._open else None
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            with self._lock:
+                record = self._open_record(tick)
+                if record is not None:
+                    stages = record['stages']
+                    stages[name] = stages.get(name, 0.0) + elapsed
+                previous = self.stage_costs.get(name)
+                self.stage_costs[name] = elapsed if previous is None else (
+                    previous + COST_SMOOTHING * (elapsed - previous)
+                )
+
+    def recent_ticks(self, count: int = 10) -> List[Dict[str, Any]]:
+        """Últimos ticks cerrados (más reciente al final)."""
+        with self._lock:
+            return list(self.history)[-count:]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores, modo degradado y coste medio por etapa."""
+        with self._lock:
+            return {
+                **self.stats,
+                'degraded': self.degraded,
+                'budget': self.budget,
+                'stage_costs': {k: round(v, 3) for k, v in self.stage_costs.items()},
+                'last_shed': list(self.history[-1]['shed']) if self.history else []
+            }
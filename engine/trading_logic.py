@@ -4,6 +4,7 @@ Lee strategy.json y ejecuta la lógica de trading.
 """
 import asyncio
 import ccxt
+import functools
 import json
 import logging
 import os
@@ -53,7 +54,25 @@ except Exception as e:
 
 from database import Database
 from vault import Vault
-from router import get_available_pairs, get_pair_info, find_swap_route, init_router
+from router import (
+    get_available_pairs, get_pair_assets, get_pair_info, get_spot_pairs, get_ticker_snapshot,
+    find_swap_route, find_best_routes, get_route_plan_stats, get_pair_lookup_stats, get_taker_fee, init_router
+)
+from candle_store import get_candle_store
+from engine.heat import score_signals
+from engine.radar import RadarTable, radar_zone
+from engine.change_detector import ChangeDetector
+from engine.balance import BalanceCachingExchange
+from engine.portfolio import PortfolioSnapshot
+from engine.async_exchange import AsyncExchangeAdapter
+from engine.tick_budget import TickBudget
+from engine.scan_scheduler import AdaptiveScanScheduler
+from engine.wide_scan import WideScanner
+from engine.order_book import OrderBookCache, estimate_input, max_input_within_impact
+from engine.rate_limit import (
+    LANE_EXECUTION, LANE_MONITOR, LANE_HOT, LANE_SCAN, RateLimitScheduler, RateLimitedExchange,
+    RequestShed, request_lane, set_task_lane, with_lane
+)
 from bot_config import BINANCE_API_KEY, BINANCE_SECRET_KEY, BINANCE_TESTNET, BINANCE_READ_ONLY, DB_PATH
 
 # Integración SQLite de almacenamiento
@@ -82,6 +101,27 @@ except ImportError:
 
 
 
+def with_trade_lock(fn):
+    """
+    Decorador para los métodos que ejecutan órdenes: serializa la secuencia
+    comprobación -> orden -> persistencia entre tareas (monitor, oportunidades,
+    persecución) con el lock de operaciones del motor. Es reentrante dentro de
+    la misma tarea (execute_swap_dynamic -> execute_swap, etc.).
+    """
+    @functools.wraps(fn)
+    async def wrapper(self, *args, **kwargs):
+        task = asyncio.current_task()
+        if task is not None and self._trade_lock_owner is task:
+            return await fn(self, *args, **kwargs)
+        async with self._trade_lock:
+            self._trade_lock_owner = task
+            try:
+                return await fn(self, *args, **kwargs)
+            finally:
+                self._trade_lock_owner = None
+    return wrapper
+
+
 def write_bitacora(message: str):
     """
     Escribe un mensaje en bitacora.txt con fecha y hora.
@@ -149,7 +189,30 @@ class TradingEngine:
         db_path_absolute = ROOT_DIR / DB_PATH if not os.path.isabs(DB_PATH) else DB_PATH
         self.db = Database(str(db_path_absolute))
         self.vault = Vault(self.db)
-        self.exchange = self._init_exchange()
+        # Presupuesto de peso compartido con carriles de prioridad (ver engine.rate_limit)
+        rate_limit_config = self.strategy.get("rate_limit", {})
+        self.rate_limiter = (
+            RateLimitScheduler.from_config(rate_limit_config)
+            if rate_limit_config.get("enabled", True) else None
+        )
+        exchange = self._init_exchange()
+        if self.rate_limiter is not None:
+            exchange = RateLimitedExchange(exchange, self.rate_limiter)
+        # fetch_balance() compartido por tick (ver engine.balance)
+        self.exchange = BalanceCachingExchange(exchange)
+        self.vault.set_exchange(self.exchange)
+        # Llamadas al exchange sin bloquear el event loop (executor + semáforo + timeout)
+        self.aexchange = AsyncExchangeAdapter.from_config(
+            self.exchange, self.strategy.get("exchange_adapter"), scheduler=self.rate_limiter
+        )
+        # Libros de órdenes (profundidad limitada, TTL corto) para estimar fills por VWAP (ver engine.order_book)
+        self.order_books = OrderBookCache.from_config(self.aexchange.fetch_order_book, self.strategy.get("order_book"))
+        # Cartera valorada una vez por balance/hucha (ver engine.portfolio y _get_portfolio_snapshot)
+        self._portfolio_cache: Optional[Tuple[Any, Optional[int], PortfolioSnapshot]] = None
+        self.portfolio_stats = {'builds': 0, 'hits': 0}
+        # Una sola operación (comprobación + órdenes + BD) a la vez entre todas las tareas (ver with_trade_lock)
+        self._trade_lock = asyncio.Lock()
+        self._trade_lock_owner: Optional[asyncio.Task] = None
         # Cache de volúmenes por par para cálculo de vol_pct entre ciclos
         self.last_volumes: Dict[str, float] = {}
         self.last_volumes_path: Path = ROOT_DIR / 'shared' / 'last_volumes.json'
@@ -204,7 +267,36 @@ class TradingEngine:
             logger.info("✅ Motor en modo lectura live (BINANCE_READ_ONLY=true)")
         
         # Inicializar router con la instancia de exchange
-        init_router(self.exchange)
+        market_data_config = self.strategy.get("market_data", {})
+        init_router(
+            self.exchange,
+            snapshot_ttl=market_data_config.get("ticker_snapshot_ttl"),
+            markets_refresh_interval=market_data_config.get("markets_refresh_interval")
+        )
+        # Cache de indicadores calculados en lote (par -> (timestamp, indicadores))
+        self.indicator_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self.indicator_cache_ttl = market_data_config.get("indicator_cache_ttl", 15)
+        # Recalcular indicadores / heat solo si cambian precio, volumen o vela (ver engine.change_detector)
+        indicator_timeframe = getattr(signals, 'INDICATOR_TIMEFRAME', '1h') if HAS_SIGNALS else '1h'
+        timeframe_seconds = ccxt.Exchange.parse_timeframe(indicator_timeframe)
+        change_config = self.strategy.get("change_detection")
+        self.indicator_changes = ChangeDetector.from_config(timeframe_seconds, change_config)
+        self.radar_changes = ChangeDetector.from_config(timeframe_seconds, change_config)
+        # Presupuesto de tiempo por tick de vigilancia (ver engine.tick_budget)
+        self.tick_budget = TickBudget.from_config(
+            self.strategy.get("scan_interval", 5), self.strategy.get("tick_budget")
+        )
+        self._last_dynamic_inventory: List[Dict[str, Any]] = []
+        # Pares consultados por el escáner multi-bases (acumulado)
+        self.scan_metrics = {'completed': 0, 'timed_out': 0, 'failed': 0}
+        # Próximo escaneo por activo según volatilidad, heat y umbral de entrada (ver engine.scan_scheduler)
+        self.scan_scheduler = AdaptiveScanScheduler.from_config(
+            self.strategy.get("scan_interval", 5),
+            self.strategy.get("trading", {}).get("radar_min_heat_score", 85),
+            self.strategy.get("scan_scheduler")
+        )
+        # Modo amplio (opt-in): criba de todo el mercado spot desde el snapshot de tickers (ver engine.wide_scan)
+        self.wide_scanner = WideScanner.from_config(self.strategy.get("wide_scan"))
         self._running = False
         self.fiat_assets = self.strategy.get("fiat_assets", ["EUR", "USDC"])
         self.positions_detected = False
@@ -230,12 +322,13 @@ class TradingEngine:
         self.diversify_cooldown_seconds = 30  # 30 segundos mínimo entre diversificaciones
         
         # Radar dinámico: estado y tareas de actualización
-        self.radar_data_cache = {}  # Cache de datos del radar por moneda
-        self.radar_last_update = {}  # Última actualización por moneda
+        # Datos del radar por moneda/par en columnas, con su última actualización (ver engine.radar)
+        self.radar_data_cache = RadarTable()
+        self._load_radar_snapshot()
         self.radar_update_tasks = {}  # Tareas asyncio por zona
         
         # Frecuencias de actualización por zona (en segundos)
-        # Modo CRUCERO por defecto: 15s. Persecución por par: 5s (ver _persecute_currency)
+        # Modo CRUCERO por defecto: 15s. Persecución: 5s / 0.5s en cartera (ver _persecution_loop)
         self.radar_frequencies = {
             'muy_caliente': 15,
             'caliente': 15,
@@ -243,8 +336,15 @@ class TradingEngine:
             'muy_fria': 15
         }
 
-        # Tareas de persecución por par (per-pair short polling)
-        self.persecution_tasks: Dict[str, asyncio.Task] = {}
+        # Persecución: un único bucle compartido sondea las monedas perseguidas (con cupo máximo)
+        persecution_config = self.strategy.get("persecution", {})
+        self.persecution_max = max(1, int(persecution_config.get("max_concurrent", 5)))
+        self.persecution_poll_interval = persecution_config.get("poll_interval", 5)
+        self.persecution_active_poll_interval = persecution_config.get("active_poll_interval", 0.5)
+        self.persecution_full_refresh = persecution_config.get("full_refresh_interval", 60)
+        # moneda -> {'pair', 'held', 'next_poll', 'full_at'}
+        self.persecuted: Dict[str, Dict[str, Any]] = {}
+        self._persecution_task: Optional[asyncio.Task] = None
 
         # Control de escritura agrupada para radar.json (evitar I/O excesivo)
         self.radar_last_save_time = 0  # Timestamp de última escritura
@@ -411,24 +511,55 @@ Thumbs.db
         except Exception:
             pass
 
+    def _load_radar_snapshot(self):
+        """
+        Carga shared/radar.json en la tabla del radar al arrancar, para que los
+        lectores del radar no tengan que releer el archivo mientras la cache se llena.
+        
+        Solo se restauran filas más recientes que el horizonte de refresco del radar
+        (intervalo máximo de escaneo): una fila más antigua tendría un heat obsoleto
+        y los selectores de trades (top(min_heat=...)) actuarían sobre ella.
+        """
+        try:
+            if not self.radar_path.exists():
+                return
+            horizon = time.time() - self.scan_scheduler.max_interval
+            skipped = 0
+            if HAS_FILE_UTILS:
+                radar_data = read_json_safe(self.radar_path, {})
+            else:
+                with open(self.radar_path, 'r', encoding='utf-8') as f:
+                    radar_data = json.load(f)
+            file_ts = self.radar_path.stat().st_mtime
+            loaded = 0
+            for item in (radar_data or {}).get('radar_data', []):
+                if not isinstance(item, dict):
+                    continue
+                key = item.get('currency')
+                if not key and item.get('origin') and item.get('destination'):
+                    key = f"{item['origin']}/{item['destination']}"
+                if not key:
+                    continue
+                try:
+                    ts = datetime.fromisoformat(item['last_update']).timestamp() if item.get('last_update') else file_ts
+                except (TypeError, ValueError):
+                    ts = file_ts
+                if ts < horizon:
+                    skipped += 1
+                    continue
+                # zone / last_update / in_persecution se recalculan al guardar
+                entry = {k: v for k, v in item.items() if k not in ('zone', 'last_update', 'in_persecution')}
+                self.radar_data_cache.upsert(key, entry, ts=ts)
+                loaded += 1
+            if loaded or skipped:
+                logger.info(f"📡 Radar restaurado desde radar.json: {loaded} entradas ({skipped} obsoletas descartadas)")
+        except Exception as e:
+            logger.debug(f"No se pudo cargar radar.json: {e}")
+
     def _cleanup_radar_cache(self):
         """Elimina entradas de `radar_data_cache` que no se actualizaron en las últimas 2 horas."""
         try:
-            now = time.time()
-            removed = 0
-            keys = list(self.radar_data_cache.keys())
-            for k in keys:
-                last = self.radar_last_update.get(k, 0)
-                if now - last > self.RADAR_CACHE_MAX_AGE_SECONDS:
-                    try:
-                        del self.radar_data_cache[k]
-                    except Exception:
-                        pass
-                    try:
-                        del self.radar_last_update[k]
-                    except Exception:
-                        pass
-                    removed += 1
+            removed = self.radar_data_cache.prune(self.RADAR_CACHE_MAX_AGE_SECONDS)
             if removed > 0:
                 logger.info(f"🧹 Mantenimiento: Eliminadas {removed} entradas antiguas del radar_data_cache")
         except Exception as e:
@@ -485,7 +616,9 @@ Thumbs.db
         - BINANCE_TESTNET=false + BINANCE_READ_ONLY=false: Conecta con credenciales reales (⚠️ cuidado)
         """
         exchange_config = {
-            'enableRateLimit': True,
+            # Con el planificador de peso activo, el throttle genérico de ccxt sobra
+            # (y serializaría las llamadas concurrentes del executor)
+            'enableRateLimit': not self.strategy.get("rate_limit", {}).get("enabled", True),
             'options': {
                 'defaultType': 'spot'
             }
@@ -516,9 +649,11 @@ Thumbs.db
     
     async def stop_radar_dynamic_updates(self):
         """
-        Detiene las actualizaciones del radar dinámico.
-        Versión simplificada: sin tareas asincio pendientes.
+        Detiene las actualizaciones del radar dinámico y el bucle de persecución.
         """
+        if self._persecution_task and not self._persecution_task.done():
+            self._persecution_task.cancel()
+        self.persecuted.clear()
         logger.debug("✅ Radar dinámico detenido")
         return True
 
@@ -527,6 +662,11 @@ Thumbs.db
         self.strategy = self._load_strategy()
         logger.info("🔄 Estrategia recargada")
     
+    def _trade_is_active(self, slot_id: int, trade_id: int) -> bool:
+        """True si `trade_id` sigue siendo el trade activo del slot."""
+        active_trade = self.db.get_active_trade(slot_id)
+        return bool(active_trade) and active_trade.get('id') == trade_id
+    
     def _get_active_assets(self) -> List[str]:
         """Obtiene la lista de activos actualmente en uso en los slots activos."""
         active_trades = self.db.get_all_active_trades()
@@ -626,17 +766,20 @@ Thumbs.db
                     logger.error(f"❌ Error crítico guardando hucha diversificada después de {max_retries} intentos: {e}")
                     raise
     
-    def _calculate_swap_order_size(self, currency: str, total_balance: float) -> float:
+    def _calculate_swap_order_size(self, currency: str, total_balance: float, pair: Optional[str] = None) -> float:
         """
         Calcula el tamaño de orden para un swap según las reglas:
         - Máximo entre 25% del saldo operable y mínimo 10€
         - Saldo operable = total - hucha
         - Si el resto sería < 10€, usar 100% del saldo operable (evitar polvo)
+        - Si hay libro de órdenes del par en cache, no superar el impacto de
+          precio máximo (order_book.max_price_impact_pct)
         - BNB siempre retorna 0 (no operable, reservado para gas)
         
         Args:
             currency: Moneda a intercambiar
             total_balance: Balance total de la moneda en la wallet
+            pair: Par en el que se ejecutará el swap (opcional)
         
         Returns:
             Cantidad a intercambiar, o 0 si no es operable o no cumple requisitos
@@ -700,6 +843,20 @@ Thumbs.db
             # Asegurar que no exceda el saldo operable
             swap_amount = min(swap_amount, operable_balance)
             
+            # Limitar a la profundidad del libro que cabe en el impacto de precio máximo
+            if pair:
+                side = 'sell' if pair.split('/')[0] == currency else 'buy'
+                depth_limit = max_input_within_impact(
+                    self.order_books.peek(pair), side, self.order_books.max_price_impact_pct
+                )
+                if depth_limit is not None and swap_amount > depth_limit:
+                    logger.info(
+                        f"📉 Tamaño de swap de {currency} limitado por profundidad de {pair}: "
+                        f"{swap_amount:.8f} -> {depth_limit:.8f} "
+                        f"(impacto máximo {self.order_books.max_price_impact_pct}%)"
+                    )
+                    swap_amount = depth_limit
+            
             # Verificación final: Asegurar que el swap_amount tenga valor >= 10€
             try:
                 final_value_eur = self.vault.get_asset_value(currency, swap_amount, 'EUR')
@@ -729,7 +886,7 @@ Thumbs.db
         """
         inventory = []
         try:
-            balances = self.exchange.fetch_balance()
+            balances = await self.aexchange.fetch_balance()
             if not balances or 'total' not in balances:
                 return inventory
             
@@ -825,6 +982,54 @@ Thumbs.db
         
         return inventory
     
+    def _get_portfolio_snapshot(self) -> PortfolioSnapshot:
+        """
+        Cartera valorada (saldos, hucha, valores EUR, gas, capital real y sobreexposición).
+        
+        Se reutiliza mientras no cambien el snapshot de balance del tick (una orden
+        lo invalida) ni hucha_diversificada.json; fuera de un tick cada llamada
+        descarga el balance y vuelve a valorar.
+        
+        Returns:
+            PortfolioSnapshot (vacío si no se pudo obtener el balance)
+        """
+        try:
+            balance_snapshot = self.exchange.get_balance_snapshot()
+            try:
+                hucha_mtime = self.hucha_diversificada_path.stat().st_mtime_ns
+            except OSError:
+                hucha_mtime = None
+            cached = self._portfolio_cache
+            if cached is not None and cached[0] is balance_snapshot and cached[1] == hucha_mtime:
+                self.portfolio_stats['hits'] += 1
+                return cached[2]
+            portfolio = PortfolioSnapshot.build(
+                balance_snapshot.balances, self._get_hucha_amount_per_currency(), self.vault.get_asset_values
+            )
+            self.portfolio_stats['builds'] += 1
+            self._portfolio_cache = (balance_snapshot, hucha_mtime, portfolio)
+            return portfolio
+        except Exception as e:
+            logger.error(f"Error valorando la cartera: {e}")
+            return PortfolioSnapshot.empty()
+    
+    async def _refresh_portfolio_snapshot(self) -> PortfolioSnapshot:
+        """
+        Construye el snapshot de cartera en el executor (fetch_balance y valoración
+        fuera del event loop). Llamar al inicio del tick: el adaptador copia el
+        contexto, así que el balance queda en el ámbito del tick y las lecturas
+        síncronas posteriores salen de la cache.
+        """
+        try:
+            return await self.aexchange.run(self._get_portfolio_snapshot)
+        except Exception as e:
+            logger.debug(f"Error construyendo el snapshot de cartera en el executor: {e}")
+            return PortfolioSnapshot.empty()
+    
+    def _total_portfolio_value(self) -> float:
+        """Valor total del portfolio en EUR (desde el snapshot de cartera)."""
+        return self._get_portfolio_snapshot().total_portfolio_eur
+    
     def _calculate_real_investment_balance(self) -> Dict[str, Any]:
         """
         🎯 GESTIÓN DINÁMICA DE CAPITAL: Calcula el saldo real de inversión.
@@ -841,56 +1046,7 @@ Thumbs.db
             - real_investment_balance_eur: Capital disponible para trading
             - gas_percentage: Porcentaje actual de gas
         """
-        try:
-            # Calcular valor total del portfolio
-            total_portfolio_eur = self.vault.calculate_total_portfolio_value()
-            if total_portfolio_eur <= 0:
-                return {
-                    'total_portfolio_eur': 0.0,
-                    'gas_reserve_eur': 0.0,
-                    'hucha_total_eur': 0.0,
-                    'real_investment_balance_eur': 0.0,
-                    'gas_percentage': 0.0
-                }
-            
-            # 1. Reserva de Gas (BNB): 2.5% - 5% del valor total
-            gas_percentage = self._get_gas_percentage()
-            target_gas_percent = 5.0  # Objetivo: 5%
-            gas_reserve_eur = total_portfolio_eur * (target_gas_percent / 100.0)
-            
-            # 2. Calcular valor total en hucha
-            hucha_amounts = self._get_hucha_amount_per_currency()
-            hucha_total_eur = 0.0
-            balances = self.exchange.fetch_balance()
-            
-            for currency, amount in hucha_amounts.items():
-                if amount > 0:
-                    try:
-                        value_eur = self.vault.get_asset_value(currency, amount, 'EUR')
-                        hucha_total_eur += value_eur
-                    except:
-                        pass
-            
-            # 3. Saldo real de inversión (excluyendo Gas y Hucha)
-            real_investment_balance_eur = max(0.0, total_portfolio_eur - gas_reserve_eur - hucha_total_eur)
-            
-            return {
-                'total_portfolio_eur': total_portfolio_eur,
-                'gas_reserve_eur': gas_reserve_eur,
-                'hucha_total_eur': hucha_total_eur,
-                'real_investment_balance_eur': real_investment_balance_eur,
-                'gas_percentage': gas_percentage
-            }
-            
-        except Exception as e:
-            logger.error(f"Error calculando saldo real de inversión: {e}")
-            return {
-                'total_portfolio_eur': 0.0,
-                'gas_reserve_eur': 0.0,
-                'hucha_total_eur': 0.0,
-                'real_investment_balance_eur': 0.0,
-                'gas_percentage': 0.0
-            }
+        return self._get_portfolio_snapshot().capital_info()
     
     def _detect_overexposure(self) -> List[Dict[str, Any]]:
         """
@@ -904,62 +1060,7 @@ Thumbs.db
             - excess_value_eur: Valor que excede el 25% (capital disponible para swaps)
             - excess_percent: Porcentaje de exceso sobre el 25%
         """
-        try:
-            # Calcular capital real de inversión
-            capital_info = self._calculate_real_investment_balance()
-            real_investment_balance_eur = capital_info.get('real_investment_balance_eur', 0.0)
-            
-            if real_investment_balance_eur <= 0:
-                return []
-            
-            # Umbral máximo por activo (25% del capital real)
-            MAX_POSITION_PCT = 0.25
-            max_position_value_eur = real_investment_balance_eur * MAX_POSITION_PCT
-            
-            # Obtener balances operables (excluyendo FIAT y BNB de gas)
-            balances = self.exchange.fetch_balance()
-            total_balances = balances.get('total', {})
-            
-            overexposed = []
-            
-            # Excluir activos que no deben contarse (FIAT, BNB de gas)
-            excluded_assets = {'EUR', 'USDC', 'BNB'}
-            
-            for currency, balance in total_balances.items():
-                if currency in excluded_assets or balance <= 0:
-                    continue
-                
-                try:
-                    # Calcular valor en EUR
-                    asset_value_eur = self.vault.get_asset_value(currency, balance, 'EUR')
-                    if asset_value_eur <= 0:
-                        continue
-                    
-                    # Calcular porcentaje sobre el capital real
-                    asset_percent = (asset_value_eur / real_investment_balance_eur * 100.0) if real_investment_balance_eur > 0 else 0
-                    
-                    # Detectar sobreexposición (>25%)
-                    if asset_percent > (MAX_POSITION_PCT * 100):
-                        excess_value_eur = asset_value_eur - max_position_value_eur
-                        excess_percent = (excess_value_eur / asset_value_eur * 100.0) if asset_value_eur > 0 else 0
-                        
-                        overexposed.append({
-                            'currency': currency,
-                            'current_value_eur': asset_value_eur,
-                            'current_percent': asset_percent,
-                            'excess_value_eur': excess_value_eur,
-                            'excess_percent': excess_percent
-                        })
-                        
-                except Exception as e:
-                    logger.debug(f"Error detectando sobreexposición para {currency}: {e}")
-                    continue
-            
-            return overexposed
-            
-        except Exception as e:
-            logger.error(f"Error en _detect_overexposure: {e}")
-            return []
+        return self._get_portfolio_snapshot().overexposure()
     
     def _calculate_total_investment_value(self) -> float:
         """
@@ -969,42 +1070,7 @@ Thumbs.db
         Returns:
             Valor total en EUR
         """
-        try:
-            balances = self.exchange.fetch_balance()
-            total_balances = balances.get('total', {})
-            valor_total = 0.0
-            
-            # Obtener saldos en hucha para excluirlos del saldo operable
-            hucha_amounts = self._get_hucha_amount_per_currency()
-            
-            # Sumar todos los saldos operables (total - hucha)
-            for currency, total_amount in total_balances.items():
-                if total_amount <= 0:
-                    continue
-                
-                # Excluir BNB del cálculo (BNB es solo para gas)
-                if currency == 'BNB':
-                    continue
-                
-                # Restar hucha de este activo
-                hucha_amount = hucha_amounts.get(currency, 0.0)
-                operable_amount = max(0.0, total_amount - hucha_amount)
-                
-                if operable_amount > 0:
-                    asset_value = self.vault.get_asset_value(currency, operable_amount, 'EUR')
-                    valor_total += asset_value
-            
-            # Sumar valor de la hucha
-            for currency, hucha_amount in hucha_amounts.items():
-                if hucha_amount > 0:
-                    hucha_value = self.vault.get_asset_value(currency, hucha_amount, 'EUR')
-                    valor_total += hucha_value
-            
-            return valor_total
-        except Exception as e:
-            logger.error(f"Error calculando valor total de inversión: {e}")
-            # Fallback: usar calculate_total_portfolio_value
-            return self.vault.calculate_total_portfolio_value()
+        return self._get_portfolio_snapshot().total_investment_eur
     
     def _calculate_gas_reserve_separation(self) -> Dict[str, Any]:
         """
@@ -1022,11 +1088,11 @@ Thumbs.db
             - gas_percentage: Porcentaje actual de gas sobre total
         """
         try:
-            balances = self.exchange.fetch_balance()
-            total_bnb = balances.get('total', {}).get('BNB', 0.0)
+            portfolio = self._get_portfolio_snapshot()
+            total_bnb = portfolio.amounts.get('BNB', 0.0)
             
             # Calcular valor total del portfolio
-            total_portfolio_eur = self.vault.calculate_total_portfolio_value()
+            total_portfolio_eur = portfolio.total_portfolio_eur
             if total_portfolio_eur <= 0:
                 return {
                     'total_bnb': total_bnb,
@@ -1040,7 +1106,7 @@ Thumbs.db
             gas_reserve_eur = total_portfolio_eur * (target_gas_percent / 100.0)
             
             # Convertir a BNB
-            bnb_price_eur = self.vault.get_asset_value('BNB', 1.0, 'EUR')
+            bnb_price_eur = portfolio.prices_eur.get('BNB') or self.vault.get_asset_value('BNB', 1.0, 'EUR')
             if bnb_price_eur <= 0:
                 return {
                     'total_bnb': total_bnb,
@@ -1082,24 +1148,7 @@ Thumbs.db
         Returns:
             Porcentaje de gas (0.0 - 100.0)
         """
-        try:
-            valor_total_inversion = self._calculate_total_investment_value()
-            if valor_total_inversion <= 0:
-                return 0.0
-            
-            balances = self.exchange.fetch_balance()
-            bnb_balance = balances.get('total', {}).get('BNB', 0.0)
-            
-            if bnb_balance <= 0:
-                return 0.0
-            
-            bnb_value_eur = self.vault.get_asset_value('BNB', bnb_balance, 'EUR')
-            gas_percent = (bnb_value_eur / valor_total_inversion * 100.0) if valor_total_inversion > 0 else 0.0
-            
-            return gas_percent
-        except Exception as e:
-            logger.debug(f"Error calculando porcentaje de gas: {e}")
-            return 0.0
+        return self._get_portfolio_snapshot().gas_percentage
     
     async def _refill_gas_passive(self, bnb_amount: float, target_percent: float = None) -> float:
         """
@@ -1116,7 +1165,7 @@ Thumbs.db
             target_percent = self.gas_max_target
         
         try:
-            total_portfolio = self.vault.calculate_total_portfolio_value()
+            total_portfolio = self._total_portfolio_value()
             if total_portfolio <= 0:
                 return 0.0
             
@@ -1127,7 +1176,7 @@ Thumbs.db
             
             # Calcular cuánto BNB necesitamos en EUR
             target_gas_value_eur = total_portfolio * (target_percent / 100.0)
-            balances = self.exchange.fetch_balance()
+            balances = await self.aexchange.fetch_balance()
             current_bnb_balance = balances.get('BNB', {}).get('total', 0.0)
             current_bnb_value_eur = self.vault.get_asset_value('BNB', current_bnb_balance, 'EUR')
             needed_gas_value_eur = max(0, target_gas_value_eur - current_bnb_value_eur)
@@ -1158,6 +1207,8 @@ Thumbs.db
             logger.error(f"Error en refill gas pasivo: {e}")
             return 0.0
     
+    @with_lane(LANE_EXECUTION)
+    @with_trade_lock
     async def _refill_gas_emergency(self) -> bool:
         """
         NIVEL EMERGENCIA (< 0.5%): Detiene cualquier operación y compra BNB inmediatamente.
@@ -1181,7 +1232,7 @@ Thumbs.db
             target_percent = 2.5
             target_gas_value_eur = valor_total_inversion * (target_percent / 100.0)
             
-            balances = self.exchange.fetch_balance()
+            balances = await self.aexchange.fetch_balance()
             current_bnb_balance = balances.get('total', {}).get('BNB', 0.0)
             current_bnb_value_eur = self.vault.get_asset_value('BNB', current_bnb_balance, 'EUR')
             needed_gas_value_eur = max(0, target_gas_value_eur - current_bnb_value_eur)
@@ -1262,7 +1313,7 @@ Thumbs.db
             
             # Ejecutar swap
             sell_amount = self.exchange.amount_to_precision(swap_pair, amount_to_sell)
-            order_sell = self.exchange.create_market_sell_order(swap_pair, sell_amount)
+            order_sell = await self.aexchange.create_market_sell_order(swap_pair, sell_amount)
             
             filled_amount = order_sell.get('filled', 0)
             
@@ -1296,7 +1347,7 @@ Thumbs.db
                 return False
             
             # Calcular cuánto BNB necesitamos
-            total_portfolio_eur = self.vault.calculate_total_portfolio_value()
+            total_portfolio_eur = self._total_portfolio_value()
             target_gas_eur = total_portfolio_eur * (target_gas_percent / 100.0)
             current_gas_eur = total_portfolio_eur * (current_gas_percent / 100.0)
             needed_gas_eur = max(0.0, target_gas_eur - current_gas_eur)
@@ -1305,34 +1356,8 @@ Thumbs.db
                 return False
             
             # 🎯 Buscar BNB en Radar con umbral reducido (Heat Score > 60)
-            radar_list = []
-            if self.radar_data_cache:
-                for currency, data in self.radar_data_cache.items():
-                    if currency == 'BNB':
-                        radar_list.append(data.copy())
-            else:
-                try:
-                    if HAS_FILE_UTILS:
-                        radar_data = read_json_safe(self.radar_path, {})
-                    else:
-                        if self.radar_path.exists():
-                            with open(self.radar_path, 'r', encoding='utf-8') as f:
-                                radar_data = json.load(f)
-                        else:
-                            radar_data = {}
-                    
-                    if radar_data and 'radar_data' in radar_data:
-                        for currency_data in radar_data.get('radar_data', []):
-                            if currency_data.get('currency') == 'BNB':
-                                radar_list.append(currency_data)
-                except:
-                    pass
-            
             # Si BNB está en radar con Heat Score > 60, usar activo más débil para comprar
-            bnb_heat_score = 0
-            if radar_list:
-                bnb_data = radar_list[0]
-                bnb_heat_score = bnb_data.get('heat_score', 0)
+            bnb_heat_score = self.radar_data_cache.get_value('BNB', 'heat_score', 0)
             
             if bnb_heat_score < 60:
                 logger.debug(f"BNB no está en radar con Heat Score suficiente (actual: {bnb_heat_score})")
@@ -1346,6 +1371,7 @@ Thumbs.db
             logger.error(f"Error en refill gas estratégico mejorado: {e}")
             return False
     
+    @with_trade_lock
     async def _buy_bnb_with_weakest_asset(self, needed_gas_eur: float) -> bool:
         """
         Compra BNB usando el activo con menor Heat Score (más débil).
@@ -1353,7 +1379,7 @@ Thumbs.db
         try:
             MIN_ORDER_VALUE_EUR = 10.0
             
-            balances = self.exchange.fetch_balance()
+            balances = await self.aexchange.fetch_balance()
             active_trades = self.db.get_all_active_trades()
             
             # Buscar activo con menor Heat Score
@@ -1408,9 +1434,9 @@ Thumbs.db
                 base, quote = bnb_pair.split('/')
                 
                 if base == weakest_asset:
-                    order = self.exchange.create_market_sell_order(bnb_pair, sell_amount)
+                    order = await self.aexchange.create_market_sell_order(bnb_pair, sell_amount)
                 else:
-                    order = self.exchange.create_market_buy_order(bnb_pair, sell_amount)
+                    order = await self.aexchange.create_market_buy_order(bnb_pair, sell_amount)
                 
                 if order and order.get('filled', 0) > 0:
                     filled = order.get('filled', 0)
@@ -1429,6 +1455,7 @@ Thumbs.db
             logger.error(f"Error en _buy_bnb_with_weakest_asset: {e}")
             return False
     
+    @with_trade_lock
     async def _refill_gas_strategic(self) -> bool:
         """
         NIVEL ESTRATÉGICO (< 2.5%): Busca en el Radar la moneda operable (>10€) 
@@ -1452,7 +1479,7 @@ Thumbs.db
             target_percent = 5.0
             target_gas_value_eur = valor_total_inversion * (target_percent / 100.0)
             
-            balances = self.exchange.fetch_balance()
+            balances = await self.aexchange.fetch_balance()
             current_bnb_balance = balances.get('total', {}).get('BNB', 0.0)
             current_bnb_value_eur = self.vault.get_asset_value('BNB', current_bnb_balance, 'EUR')
             needed_gas_value_eur = max(0, target_gas_value_eur - current_bnb_value_eur)
@@ -1507,7 +1534,7 @@ Thumbs.db
                     # Si hay ruta, obtener heat_score de la moneda del radar
                     heat_score = 0
                     if self.radar_data_cache and currency in self.radar_data_cache:
-                        heat_score = self.radar_data_cache[currency].get('heat_score', 0)
+                        heat_score = self.radar_data_cache.get_value(currency, 'heat_score', 0)
                     
                     # Preferir monedas con menor heat_score (mejor momento para venderlas)
                     if not best_currency or heat_score < best_heat_score:
@@ -1542,7 +1569,7 @@ Thumbs.db
             
             # Ejecutar swap
             sell_amount = self.exchange.amount_to_precision(best_swap_pair, amount_to_sell)
-            order_sell = self.exchange.create_market_sell_order(best_swap_pair, sell_amount)
+            order_sell = await self.aexchange.create_market_sell_order(best_swap_pair, sell_amount)
             
             filled_amount = order_sell.get('filled', 0)
             
@@ -1606,7 +1633,7 @@ Thumbs.db
             
             for pair in btc_pairs:
                 try:
-                    ticker = self.exchange.fetch_ticker(pair)
+                    ticker = await self.aexchange.fetch_ticker(pair)
                     current_price = ticker['last']
                     if current_price:
                         break
@@ -1617,7 +1644,10 @@ Thumbs.db
                 return False
             
             try:
-                ohlcv = self.exchange.fetch_ohlcv('BTC/EUR', '1h', limit=2)
+                ohlcv = await self.aexchange.run_coalesced(
+                    ('ohlcv', 'BTC/EUR', '1h', 2),
+                    get_candle_store().get_ohlcv, self.exchange, 'BTC/EUR', '1h', limit=2
+                )
                 if len(ohlcv) >= 2:
                     price_1h_ago = ohlcv[0][4]
                     price_change = ((current_price - price_1h_ago) / price_1h_ago) * 100
@@ -1640,7 +1670,7 @@ Thumbs.db
         
         try:
             print("DEBUG: Escaneando wallet para detectar posiciones existentes...")
-            balances = self.exchange.fetch_balance()
+            balances = await self.aexchange.fetch_balance()
             print("DEBUG: Balances obtenidos, analizando posiciones...")
             
             if not balances or 'total' not in balances:
@@ -1677,7 +1707,7 @@ Thumbs.db
                                     asset_value_eur = self.vault.get_asset_value(currency, total_balance, 'EUR')
                                     
                                     # Calcular monto por slot: (total - gas_reserve) / max_slots
-                                    total_portfolio_eur = self.vault.calculate_total_portfolio_value()
+                                    total_portfolio_eur = self._total_portfolio_value()
                                     if total_portfolio_eur <= 0:
                                         # Si no podemos calcular el total, usar solo el valor del activo
                                         total_portfolio_eur = asset_value_eur
@@ -1755,6 +1785,7 @@ Thumbs.db
         except Exception as e:
             logger.error(f"Error al detectar posiciones existentes: {e}")
     
+    @with_lane(LANE_MONITOR)
     async def monitor_active_trades(self):
         """
         ⚡ VIGILANCIA RÁPIDA: Monitorea trades activos (alta prioridad, cada 5s).
@@ -1928,33 +1959,11 @@ Thumbs.db
             except Exception:
                 pass
             
-            # Leer radar
-            radar_list = []
-            if self.radar_data_cache:
-                for currency, data in self.radar_data_cache.items():
-                    radar_list.append(data.copy())
-                radar_list.sort(key=lambda x: x.get('heat_score', 0), reverse=True)
-            else:
-                try:
-                    if HAS_FILE_UTILS:
-                        radar_data = read_json_safe(self.radar_path, {})
-                    else:
-                        if self.radar_path.exists():
-                            with open(self.radar_path, 'r', encoding='utf-8') as f:
-                                radar_data = json.load(f)
-                        else:
-                            radar_data = {}
-                    
-                    if radar_data and 'radar_data' in radar_data:
-                        radar_list = radar_data.get('radar_data', [])
-                except:
-                    pass
+            # Leer radar: solo las filas con heat >= mínimo, ya ordenadas (índice de heat)
+            radar_list = self.radar_data_cache.top(min_heat=min_heat_score)
             
             if not radar_list:
                 return False
-            
-                        # Buscar la mejor oportunidad caliente (priorizar por heat más alto)
-            radar_list = sorted(radar_list, key=lambda x: x.get('heat_score', 0), reverse=True)
 
             for currency_data in radar_list:
                 currency = currency_data.get('currency', '')
@@ -2032,6 +2041,8 @@ Thumbs.db
             logger.error(f"Error en _assign_from_radar_dynamic: {e}")
             return False
     
+    @with_lane(LANE_EXECUTION)
+    @with_trade_lock
     async def execute_buy_dynamic(self, pair: str, base_asset: str, target_asset: str, 
                                    position_size_eur: float, confidence: float, signal_data: Dict[str, Any]) -> bool:
         """
@@ -2075,6 +2086,8 @@ Thumbs.db
             logger.error(f"Error en execute_buy_dynamic: {e}")
             return False
     
+    @with_lane(LANE_EXECUTION)
+    @with_trade_lock
     async def execute_swap_dynamic(self, origin_asset: str, target_asset: str, pair: str,
                                     position_size_eur: float, heat_score: int, signal_data: Dict[str, Any]=None,
                                     require_triple_green: bool = True) -> bool:
@@ -2134,7 +2147,7 @@ Thumbs.db
                     return False
             
             # Obtener balance total del activo de origen
-            balances = self.exchange.fetch_balance()
+            balances = await self.aexchange.fetch_balance()
             total_balance = balances.get('total', {}).get(origin_asset, 0.0)
             # Excluir hucha: no vender lo que está marcado como reserva
             try:
@@ -2158,38 +2171,41 @@ Thumbs.db
             # Cantidad necesaria para obtener position_size_eur en el destino
             # Primero necesitamos el precio del par para calcular cuánto recibiremos
             try:
-                ticker = self.exchange.fetch_ticker(pair)
-                if not ticker:
-                    logger.warning(f"No se puede obtener ticker para {pair}")
-                    return False
-                
                 # Determinar dirección del par
                 base, quote = pair.split('/')
-                if base == origin_asset:
-                    # Par directo: origin/target - vendemos origin para recibir target
-                    price = ticker.get('bid', ticker.get('last', 0))
-                    # Cantidad de origin necesaria para obtener position_size_eur en target
-                    target_price_eur = self.vault.get_asset_value(target_asset, 1.0, 'EUR')
-                    if target_price_eur <= 0:
-                        logger.warning(f"No se puede obtener precio de {target_asset}")
-                        return False
-                    
-                    # Calcular cantidad de target que queremos
-                    target_amount_desired = position_size_eur / target_price_eur
-                    # Calcular cantidad de origin necesaria (considerando comisión)
-                    taker_fee = 0.001  # 0.1% de Binance
-                    origin_amount_needed = (target_amount_desired / price) / (1 - taker_fee)
-                else:
-                    # Par inverso: target/origin - compramos target con origin
-                    price = ticker.get('ask', ticker.get('last', 0))
-                    target_price_eur = self.vault.get_asset_value(target_asset, 1.0, 'EUR')
-                    if target_price_eur <= 0:
+                target_price_eur = self.vault.get_asset_value(target_asset, 1.0, 'EUR')
+                if target_price_eur <= 0:
+                    logger.warning(f"No se puede obtener precio de {target_asset}")
+                    return False
+                # Calcular cantidad de target que queremos
+                target_amount_desired = position_size_eur / target_price_eur
+                taker_fee = get_taker_fee(pair)
+                # origin/target: vendemos origin contra los bids; target/origin: compramos target en los asks
+                side = 'sell' if base == origin_asset else 'buy'
+                
+                # Cantidad de origin necesaria recorriendo el libro (VWAP, comisión incluida)
+                origin_amount_needed = estimate_input(
+                    await self.order_books.get(pair), side, target_amount_desired, taker_fee
+                )
+                if origin_amount_needed is None:
+                    # Sin libro o sin profundidad suficiente: mejor precio del ticker
+                    ticker = await self.aexchange.fetch_ticker(pair)
+                    if not ticker:
+                        logger.warning(f"No se puede obtener ticker para {pair}")
                         return False
-                    
-                    target_amount_desired = position_size_eur / target_price_eur
-                    # Para comprar target_amount_desired, necesitamos origin_amount_needed
-                    origin_value_eur_needed = (target_amount_desired * price) / (1 - taker_fee)
-                    origin_amount_needed = origin_value_eur_needed / origin_price_eur
+                    if side == 'sell':
+                        price = ticker.get('bid', ticker.get('last', 0))
+                        origin_amount_needed = (target_amount_desired / price) / (1 - taker_fee)
+                    else:
+                        price = ticker.get('ask', ticker.get('last', 0))
+                        origin_amount_needed = (target_amount_desired * price) / (1 - taker_fee)
+                
+                fill = await self.order_books.estimate(pair, side, origin_amount_needed, taker_fee)
+                if fill and fill['price_impact_pct'] > self.order_books.max_price_impact_pct:
+                    logger.warning(
+                        f"⚠️ Impacto de precio estimado en {pair}: {fill['price_impact_pct']:.2f}% "
+                        f"(precio medio {fill['avg_price']:.8g} vs mejor {fill['best_price']:.8g})"
+                    )
                 
                 # 🎯 VALIDACIÓN DE MÍNIMOS Y POLVO
                 # Verificar que el remanente no quede < 10€ (usar balance operable)
@@ -2257,10 +2273,10 @@ Thumbs.db
                     sell_amount = self.exchange.amount_to_precision(pair, origin_amount_needed)
                     
                     if base == origin_asset:
-                        order = self.exchange.create_market_sell_order(pair, sell_amount)
+                        order = await self.aexchange.create_market_sell_order(pair, sell_amount)
                     else:
                         # Par inverso: necesitamos comprar
-                        order = self.exchange.create_market_buy_order(pair, sell_amount)
+                        order = await self.aexchange.create_market_buy_order(pair, sell_amount)
                     
                     if order and order.get('filled', 0) > 0:
                         filled = order.get('filled', 0)
@@ -2469,31 +2485,38 @@ Thumbs.db
             monitor_only: Si True, solo monitorea trades activos (rápido).
                          Si False, también escanea nuevas oportunidades (lento).
         """
-        # 🎯 PRIORIDAD 0: Actualizar portfolio value al inicio de cada tick
-        # Esto asegura que _detect_overexposure() siempre tenga datos correctos
-        try:
-            capital_info = self._calculate_real_investment_balance()
-            self.total_portfolio_value = capital_info.get('total_portfolio_eur', 0.0)
-            if self.total_portfolio_value <= 0:
-                # Fallback: calcular desde vault directamente
-                self.total_portfolio_value = self.vault.calculate_total_portfolio_value() or 0.0
-        except Exception as e:
-            logger.debug(f"Error actualizando portfolio value al inicio del tick: {e}")
+        # Un solo fetch_balance() por tick; las órdenes lo invalidan (engine.balance)
+        with self.exchange.tick():
+            # 🎯 PRIORIDAD 0: Actualizar portfolio value al inicio de cada tick
+            # Esto asegura que _detect_overexposure() siempre tenga datos correctos; el
+            # snapshot de cartera queda cacheado para el resto del tick (engine.portfolio)
             try:
-                self.total_portfolio_value = self.vault.calculate_total_portfolio_value() or 0.0
-            except:
+                portfolio = await self._refresh_portfolio_snapshot()
+                self.total_portfolio_value = portfolio.total_portfolio_eur
+            except Exception as e:
+                logger.debug(f"Error actualizando portfolio value al inicio del tick: {e}")
                 self.total_portfolio_value = 0.0
+            
+            # ⛽ PRIORIDAD 1: Verificar y reponer gas (BNB) si es necesario
+            # Esto se ejecuta primero para asegurar que hay gas para cualquier operación
+            await self._check_and_refill_gas()
+            
+            # Siempre monitorear trades activos (rápido)
+            await self.monitor_active_trades()
+            
+            # Escanear nuevas oportunidades solo si no es monitor_only
+            if not monitor_only:
+                await self.scan_new_opportunities()
         
-        # ⛽ PRIORIDAD 1: Verificar y reponer gas (BNB) si es necesario
-        # Esto se ejecuta primero para asegurar que hay gas para cualquier operación
-        await self._check_and_refill_gas()
-        
-        # Siempre monitorear trades activos (rápido)
-        await self.monitor_active_trades()
-        
-        # Escanear nuevas oportunidades solo si no es monitor_only
-        if not monitor_only:
-            await self.scan_new_opportunities()
+        logger.debug(f"Exchange adapter: {self.aexchange.get_stats()}")
+        logger.debug(
+            f"Detección de cambios: indicadores {self.indicator_changes.get_stats()}, "
+            f"radar {self.radar_changes.get_stats()}"
+        )
+        logger.debug(
+            f"Libros de órdenes: {self.order_books.get_stats()}, planes de ruta: {get_route_plan_stats()}, "
+            f"consultas de pares: {get_pair_lookup_stats()}, cartera: {self.portfolio_stats}"
+        )
     
     async def scan_opportunities(self):
         """
@@ -2521,7 +2544,7 @@ Thumbs.db
         """
         try:
             # PRIORIDAD 1: Verificar FIAT disponible
-            balances = self.exchange.fetch_balance()
+            balances = await self.aexchange.fetch_balance()
             free_balances = balances.get('free', {})
             
             for fiat in self.fiat_assets:
@@ -2631,27 +2654,7 @@ Thumbs.db
                     return False
             
             # Leer radar para buscar oportunidades hirvientes
-            radar_list = []
-            if self.radar_data_cache:
-                for currency, data in self.radar_data_cache.items():
-                    radar_list.append(data.copy())
-                radar_list.sort(key=lambda x: x.get('heat_score', 0), reverse=True)
-            else:
-                try:
-                    if HAS_FILE_UTILS:
-                        radar_data = read_json_safe(self.radar_path, {})
-                    else:
-                        if self.radar_path.exists():
-                            with open(self.radar_path, 'r', encoding='utf-8') as f:
-                                radar_data = json.load(f)
-                        else:
-                            radar_data = {}
-                    
-                    if radar_data and 'radar_data' in radar_data:
-                        radar_list = radar_data.get('radar_data', [])
-                        radar_list.sort(key=lambda x: x.get('heat_score', 0), reverse=True)
-                except:
-                    pass
+            radar_list = self.radar_data_cache.top(min_heat=MIN_HEAT_SCORE_CENTINELA)
             
             if not radar_list:
                 return False
@@ -2679,7 +2682,7 @@ Thumbs.db
             )
             
             # Verificar que no hay capital libre (FIAT)
-            balances = self.exchange.fetch_balance()
+            balances = await self.aexchange.fetch_balance()
             free_balances = balances.get('free', {})
             has_free_fiat = False
             
@@ -2910,29 +2913,8 @@ Thumbs.db
             # Obtener monedas activas en otros slots
             active_assets = self._get_active_assets()
             
-            # Leer radar.json o usar cache del motor
-            radar_list = []
-            if self.radar_data_cache:
-                # Usar cache del radar dinámico
-                for currency, data in self.radar_data_cache.items():
-                    radar_list.append(data.copy())
-                radar_list.sort(key=lambda x: x.get('heat_score', 0), reverse=True)
-            else:
-                # Intentar leer desde archivo
-                try:
-                    if HAS_FILE_UTILS:
-                        radar_data = read_json_safe(self.radar_path, {})
-                    else:
-                        if self.radar_path.exists():
-                            with open(self.radar_path, 'r', encoding='utf-8') as f:
-                                radar_data = json.load(f)
-                        else:
-                            radar_data = {}
-                    
-                    if radar_data and 'radar_data' in radar_data:
-                        radar_list = radar_data.get('radar_data', [])
-                except:
-                    pass
+            # Solo filas con heat >= mínimo, ya ordenadas (índice de heat del radar)
+            radar_list = self.radar_data_cache.top(min_heat=min_heat_score)
             
             if not radar_list:
                 return False
@@ -3054,10 +3036,10 @@ Thumbs.db
         max_slots = self.strategy["trading"]["max_slots"]
         
         # Obtener balances para calcular disponibilidad
-        balances = self.exchange.fetch_balance()
+        balances = await self.aexchange.fetch_balance()
         
         # Calcular el valor total del portfolio
-        total_portfolio_eur = self.vault.calculate_total_portfolio_value()
+        total_portfolio_eur = self._total_portfolio_value()
         if total_portfolio_eur <= 0:
             # Si calculate_total_portfolio_value retorna 0, calcular manualmente
             total_portfolio_eur = 0.0
@@ -3095,6 +3077,11 @@ Thumbs.db
         for fiat in self.fiat_assets:
             try:
                 available_pairs = get_available_pairs(fiat)
+                # Indicadores de los candidatos de la whitelist en una sola pasada
+                await self._prefetch_indicators([
+                    p for p in available_pairs
+                    if any(a in whitelist and a != fiat for a in p.split("/"))
+                ])
                 
                 for pair in available_pairs:
                     base, quote = pair.split("/")
@@ -3293,28 +3280,8 @@ Thumbs.db
             True si el mercado es positivo (< 70% de monedas con tendencia negativa), False en caso contrario
         """
         try:
-            # Obtener datos del radar
-            radar_list = []
-            if self.radar_data_cache:
-                for currency, data in self.radar_data_cache.items():
-                    radar_list.append(data.copy())
-                radar_list.sort(key=lambda x: x.get('heat_score', 0), reverse=True)
-            else:
-                # Intentar leer desde archivo
-                try:
-                    if HAS_FILE_UTILS:
-                        radar_data = read_json_safe(self.radar_path, {})
-                    else:
-                        if self.radar_path.exists():
-                            with open(self.radar_path, 'r', encoding='utf-8') as f:
-                                radar_data = json.load(f)
-                        else:
-                            radar_data = {}
-                    
-                    if radar_data and 'radar_data' in radar_data:
-                        radar_list = radar_data.get('radar_data', [])
-                except:
-                    pass
+            # Top 10 del radar por heat_score (índice de heat, sin ordenar la cache)
+            radar_list = self.radar_data_cache.top(10)
             
             if not radar_list or len(radar_list) < 10:
                 # Si no hay suficientes datos, permitir rotación (fallback seguro)
@@ -3344,7 +3311,7 @@ Thumbs.db
                         # Intentar obtener desde exchange si está disponible
                         try:
                             if self.exchange:
-                                ticker = self.exchange.fetch_ticker(pair)
+                                ticker = await self.aexchange.fetch_ticker(pair)
                                 # Usar percentage del ticker si está disponible (cambio 24h como aproximación)
                                 # O calcular cambio porcentual aproximado
                                 percentage = ticker.get('percentage', 0)
@@ -3731,106 +3698,21 @@ Thumbs.db
             return False
     
     async def _calculate_heat_score(self, signal_result: Dict[str, Any]) -> int:
-        """Calcula el heat_score de una señal."""
+        """Calcula el heat_score de una señal (envoltorio de engine.heat.score_signals)."""
         if not signal_result:
             return 0
-        
-        # Componentes y pesos
-        WEIGHTS = {
-            'rsi': 0.55,   # Dar más peso al momentum inmediato (RSI)
-            'ema': 0.25,
-            'vol': 0.15,
-            'bonus': 0.05
-        }
-
-        # Offset para evitar que todos los activos se queden anclados en valores bajos
-        BASE_SCORE = 5.0
-
-        # Valores raw
-        rsi = signal_result.get('rsi')
-        ema_dist = signal_result.get('ema200_distance')
-        volume_status = signal_result.get('volume_status')
-        currency = signal_result.get('currency') or signal_result.get('pair')
-
-        # 1) RSI: máximo si RSI entre 45-65
-        rsi_score = 0.0
-        rsi_boost = 0.0
-        if rsi is not None:
-            distance = abs(rsi - 50.0)
-
-            if 45.0 <= rsi <= 65.0:
-                rsi_score = 100.0
-            else:
-                # Penalizar de forma más agresiva conforme se aleja del punto dulce
-                rsi_score = max(0.0, 100.0 - distance * 3.0)
-
-            # Boost extra cerca del neutro para romper empates de heat planos
-            rsi_boost = max(0.0, 20.0 - distance * 1.5)
-
-        # 2) EMA distance: máximo si por encima de EMA y < 2%
-        ema_score = 0.0
-        if ema_dist is not None:
-            try:
-                # Si precio está por encima (positivo) y dentro de 2%
-                if ema_dist > 0 and ema_dist <= 2.0:
-                    ema_score = 100.0
-                elif ema_dist > 2.0:
-                    # Penalizar cuanto más alejado por encima (0 en 10%)
-                    ema_score = max(0.0, 100.0 - ((ema_dist - 2.0) / 8.0) * 100.0)
-                else:
-                    # Por debajo de EMA: penalizar según distancia (0 en -5%)
-                    ema_score = max(0.0, 100.0 - (abs(ema_dist) / 5.0) * 100.0)
-            except Exception:
-                ema_score = 0.0
-
-        # 3) Volumen: según incremento relativo / etiquetas
-        vol_score = 0.0
-        if volume_status is True or (isinstance(volume_status, str) and volume_status.lower() == 'high'):
-            vol_score = 100.0
-        elif isinstance(volume_status, str) and volume_status.lower() in ('normal', 'medium'):
-            vol_score = 50.0
-        else:
-            vol_score = 0.0
-
-        # 4) Bonus por estar en RESERVE_ASSETS
-        bonus_score = 0.0
-        try:
-            if currency and isinstance(currency, str):
-                # currency puede ser 'BTC' o 'BTC/EUR' dependiendo del origen
-                short_curr = currency.split('/')[0]
-                if short_curr in self.RESERVE_ASSETS:
-                    bonus_score = 100.0
-        except Exception:
-            bonus_score = 0.0
-
-        # Contribuciones (puntos reales sobre 100)
-        contrib_rsi = rsi_score * WEIGHTS['rsi']
-        contrib_ema = ema_score * WEIGHTS['ema']
-        contrib_vol = vol_score * WEIGHTS['vol']
-        contrib_bonus = bonus_score * WEIGHTS['bonus']
-
-        raw_total = BASE_SCORE + contrib_rsi + contrib_ema + contrib_vol + contrib_bonus + rsi_boost
-        total = min(max(raw_total, 0.0), 100.0)
-
-        # Guardar desglose en el resultado para que el radar lo exponga
-        try:
-            signal_result['heat_components'] = {
-                'rsi_raw': round(rsi_score, 2),
-                'ema_raw': round(ema_score, 2),
-                'vol_raw': round(vol_score, 2),
-                'bonus_raw': round(bonus_score, 2),
-                'rsi': round(contrib_rsi),
-                'ema': round(contrib_ema),
-                'vol': round(contrib_vol),
-                'bonus': round(contrib_bonus),
-                'rsi_boost': round(rsi_boost, 2),
-                'base': BASE_SCORE,
-                'total': int(round(total))
-            }
-        except Exception:
-            pass
-
-        return int(round(total))
+        return score_signals([signal_result], self.RESERVE_ASSETS)[0]
+    
+    def _score_heat_batch(self, signal_results: List[Optional[Dict[str, Any]]]) -> List[int]:
+        """
+        Calcula el heat_score de muchas señales en una sola pasada vectorizada.
+        Escribe `heat_components` y `heat_score` en cada señal.
+        """
+        scores = score_signals(signal_results, self.RESERVE_ASSETS)
+        for signal_result, heat_score in zip(signal_results, scores):
+            if signal_result:
+                signal_result['heat_score'] = heat_score
+        return scores
     
     async def _scan_jump_opportunity(self, slot_id: int, active_trade: Dict[str, Any]):
         """Escanea oportunidades de salto desde el activo actual."""
@@ -3844,6 +3726,9 @@ Thumbs.db
             
             current_profit = await self._calculate_current_profit(trade_id, active_trade)
             
+            # Indicadores de todos los candidatos en una sola pasada vectorizada
+            await self._prefetch_indicators(available_pairs)
+            
             current_pair = None
             for pair in available_pairs:
                 if current_asset in pair:
@@ -3978,7 +3863,7 @@ Thumbs.db
                     result.setdefault('currency', base_currency)
                     return result
             elif hasattr(signals, 'get_technical_indicators'):
-                indicators = signals.get_technical_indicators(pair, self.exchange)
+                indicators = await self._get_indicators(pair)
                 rsi = indicators.get('rsi')
                 ema200_distance = indicators.get('ema200_distance')
                 volume_status = indicators.get('volume_status')
@@ -4017,15 +3902,22 @@ Thumbs.db
             'heat_score': 0
         }
     
+    @with_lane(LANE_EXECUTION)
+    @with_trade_lock
     async def execute_buy(self, slot_id: int, pair: str, base_asset: str,
                          target_asset: str, is_fiat_entry: bool = False, confidence: float = 1.0,
                          signal_data: Optional[Dict[str, Any]] = None) -> bool:
         """Ejecuta una orden de compra."""
         try:
+            # Bajo el lock de operaciones: otra tarea pudo ocupar el slot desde la comprobación
+            if self.db.get_active_trade(slot_id):
+                logger.info(f"[Slot {slot_id}] El slot ya tiene un trade activo; se omite la compra")
+                return False
+            
             # Constante: mínimo de 10€ para operar en Binance
             MIN_ORDER_VALUE_EUR = 10.0
             
-            balance = self.exchange.fetch_balance()
+            balance = await self.aexchange.fetch_balance()
             base_balance = balance.get(base_asset, {}).get('free', 0)
             
             if base_asset in self.fiat_assets:
@@ -4044,7 +3936,7 @@ Thumbs.db
                 return False
             
             # Calcular el valor total del portfolio y monto por slot
-            total_portfolio_eur = self.vault.calculate_total_portfolio_value()
+            total_portfolio_eur = self._total_portfolio_value()
             if total_portfolio_eur <= 0:
                 # Si calculate_total_portfolio_value retorna 0, calcular manualmente
                 total_portfolio_eur = 0.0
@@ -4102,7 +3994,7 @@ Thumbs.db
                     f"({capital_to_use:.2f} {base_asset}), reservando {emergency_reserve:.2f} {base_asset}"
                 )
             
-            ticker = self.exchange.fetch_ticker(pair)
+            ticker = await self.aexchange.fetch_ticker(pair)
             price = ticker['last']
             
             # Calcular valor de la operación en EUR
@@ -4128,7 +4020,7 @@ Thumbs.db
             amount = self.exchange.amount_to_precision(pair, amount)
             
             logger.info(f"Ejecutando compra: {pair}, cantidad: {amount}, precio: {price}")
-            order = self.exchange.create_market_buy_order(pair, amount)
+            order = await self.aexchange.create_market_buy_order(pair, amount)
             
             executed_price = order.get('price', price)
             executed_amount = order.get('filled', amount)
@@ -4186,6 +4078,41 @@ Thumbs.db
             logger.error(f"Error al ejecutar compra en slot {slot_id}: {e}")
             return False
     
+    async def _estimate_leg_output(self, pair: str, from_asset: str, amount: float) -> Optional[float]:
+        """
+        Cantidad recibida al entregar `amount` de `from_asset` en `pair`, recorriendo
+        el libro de órdenes (VWAP, comisión taker del par incluida).
+        
+        Returns:
+            Cantidad recibida, 0.0 si el fill se rechaza (la profundidad cargada no
+            alcanza o el impacto supera max_price_impact_pct) o None si no hay libro
+        """
+        side = 'sell' if pair.split('/')[0] == from_asset else 'buy'
+        fill = await self.order_books.estimate(pair, side, amount, get_taker_fee(pair))
+        if not fill:
+            return None
+        if fill['price_impact_pct'] > self.order_books.max_price_impact_pct or not fill['complete']:
+            logger.info(
+                f"Fill rechazado en {pair} para {amount:.8f} {from_asset}: impacto "
+                f"{fill['price_impact_pct']:.2f}% (profundidad suficiente: {fill['complete']})"
+            )
+            return 0.0
+        return fill['output']
+    
+    async def _estimate_route_output(self, route: Dict[str, Any], amount: float) -> Optional[float]:
+        """
+        Cantidad de destino de una ruta del router encadenando la estimación por libro de cada salto.
+        
+        Returns:
+            Cantidad recibida, 0.0 si algún salto se rechaza o None si falta algún libro
+        """
+        output = amount
+        for origin, pair in zip(route['path'], route['pairs']):
+            output = await self._estimate_leg_output(pair, origin, output)
+            if not output:
+                return output
+        return output
+    
     async def _calculate_route_value(self, route_type: str, target_asset: str, amount: float, 
                                      pair: Optional[str] = None, intermediate: Optional[str] = None) -> float:
         """
@@ -4208,7 +4135,12 @@ Thumbs.db
                 if not pair_info:
                     return 0.0
                 
-                ticker = self.exchange.fetch_ticker(pair)
+                # Precio medio de ejecución según la profundidad del libro
+                value_after_fee = await self._estimate_leg_output(pair, target_asset, amount)
+                if value_after_fee is not None:
+                    return value_after_fee
+                
+                ticker = await self.aexchange.fetch_ticker(pair)
                 if not ticker:
                     return 0.0
                 
@@ -4238,8 +4170,18 @@ Thumbs.db
                 if not pair1_info:
                     return 0.0
                 
+                # Precio medio de ejecución de ambos saltos según la profundidad del libro
+                pair2 = f"{intermediate}/EUR"
+                intermediate_amount = await self._estimate_leg_output(pair, target_asset, amount)
+                if intermediate_amount == 0.0:
+                    return 0.0
+                if intermediate_amount is not None and get_pair_info(pair2):
+                    value_final = await self._estimate_leg_output(pair2, intermediate, intermediate_amount)
+                    if value_final is not None:
+                        return value_final
+                
                 # Primer swap: ALT -> INTERMEDIATE
-                ticker1 = self.exchange.fetch_ticker(pair)
+                ticker1 = await self.aexchange.fetch_ticker(pair)
                 if not ticker1:
                     return 0.0
                 
@@ -4257,7 +4199,7 @@ Thumbs.db
                 if not pair2_info:
                     return 0.0
                 
-                ticker2 = self.exchange.fetch_ticker(pair2)
+                ticker2 = await self.aexchange.fetch_ticker(pair2)
                 if not ticker2:
                     return 0.0
                 
@@ -4306,11 +4248,14 @@ Thumbs.db
             
             try:
                 # Obtener precio de hace 24h (usando último ticker disponible y cálculo aproximado)
-                ticker = self.exchange.fetch_ticker(btc_pair)
+                ticker = await self.aexchange.fetch_ticker(btc_pair)
                 change_24h = ticker.get('percentage', 0)  # Cambio porcentual en 24h del ticker
                 
                 # Obtener datos OHLCV para análisis de 7 días
-                ohlcv_7d = self.exchange.fetch_ohlcv(btc_pair, '1d', limit=8)
+                ohlcv_7d = await self.aexchange.run_coalesced(
+                    ('ohlcv', btc_pair, '1d', 8),
+                    get_candle_store().get_ohlcv, self.exchange, btc_pair, '1d', limit=8
+                )
                 
                 change_7d = 0
                 if len(ohlcv_7d) >= 8:
@@ -4367,34 +4312,8 @@ Thumbs.db
             # Solo excluir BNB para gas, y activos explícitamente en exclude_assets
             # El bot debe poder diversificar hacia cualquier activo de la whitelist, incluyendo FIAT
             
-            # Leer radar.json o usar cache del motor
-            radar_list = []
-            if self.radar_data_cache:
-                # Usar cache del radar dinámico
-                for currency, data in self.radar_data_cache.items():
-                    if currency not in exclude_assets:
-                        radar_list.append(data.copy())
-                radar_list.sort(key=lambda x: x.get('heat_score', 0), reverse=True)
-            else:
-                # Intentar leer desde archivo
-                try:
-                    if HAS_FILE_UTILS:
-                        radar_data = read_json_safe(self.radar_path, {})
-                    else:
-                        if self.radar_path.exists():
-                            with open(self.radar_path, 'r', encoding='utf-8') as f:
-                                radar_data = json.load(f)
-                        else:
-                            radar_data = {}
-                    
-                    if radar_data and 'radar_data' in radar_data:
-                        for currency_data in radar_data.get('radar_data', []):
-                            currency = currency_data.get('currency', '')
-                            if currency not in exclude_assets:
-                                radar_list.append(currency_data)
-                        radar_list.sort(key=lambda x: x.get('heat_score', 0), reverse=True)
-                except:
-                    pass
+            # Cache del radar dinámico (filas ya ordenadas por heat_score)
+            radar_list = self.radar_data_cache.rows(exclude=exclude_assets)
             
             # 🎯 Si no hay datos en radar, buscar directamente en whitelist
             if not radar_list:
@@ -4476,7 +4395,10 @@ Thumbs.db
         """
         Encuentra la mejor ruta para hacer swap desde source_asset hacia target_asset.
         
-        Prioriza pares directos sobre rutas intermedias para minimizar comisiones.
+        Con snapshot de tickers elige, en una sola búsqueda sobre el grafo de rutas
+        del router, la ruta de 1 o 2 saltos (intermedias: whitelist y fiat) con más
+        destino recibido neto de comisiones. Sin snapshot prioriza pares directos
+        sobre rutas intermedias para minimizar comisiones.
         
         Args:
             source_asset: Activo de origen
@@ -4488,8 +4410,48 @@ Thumbs.db
             - best_pair: Par a usar para el swap (None si no hay ruta)
             - intermediate_asset: Moneda intermedia si es ruta intermedia, None si es directa
             - expected_target_value_eur: Valor esperado del destino en EUR después de comisiones
+        
+        Raises:
+            RequestShed: si el planificador de peso descartó una consulta de
+                mercado (no significa que no haya ruta; se reintenta más tarde)
         """
         try:
+            intermediates = [a for a in self.strategy["whitelist"] + self.fiat_assets if a != 'BNB']
+            routes = await self.aexchange.run(
+                find_best_routes, source_asset, target_asset, amount, intermediates,
+                self.strategy.get("order_book", {}).get("route_candidates", 3)
+            )
+            if routes:
+                # Re-ordenar los mejores candidatos (top-of-book) por fill estimado con el libro de
+                # órdenes. No se mezclan unidades: si algún candidato tiene estimación por libro, los
+                # que no la tienen se descartan (su top-of-book siempre parecería mejor); los fills
+                # rechazados (sin profundidad o con impacto excesivo) se descartan siempre.
+                estimated = []
+                for candidate in routes:
+                    vwap_output = await self._estimate_route_output(candidate, amount)
+                    if vwap_output is not None:
+                        estimated.append((candidate, vwap_output))
+                if estimated:
+                    routes = [dict(candidate, expected_output=output) for candidate, output in estimated if output > 0]
+                    if not routes:
+                        # El fallback de pares directos valora a top-of-book sin mirar el libro:
+                        # ejecutaría igualmente el fill rechazado
+                        logger.info(
+                            f"Rutas {source_asset} -> {target_asset} rechazadas por profundidad/impacto; "
+                            f"no se opera"
+                        )
+                        return (None, None, 0.0)
+            if routes:
+                route = max(routes, key=lambda r: r['expected_output'])
+                expected_value_eur = self.vault.get_asset_value(target_asset, route['expected_output'], 'EUR')
+                if expected_value_eur > 0:
+                    intermediate = route['path'][1] if len(route['path']) == 3 else None
+                    logger.debug(
+                        f"✅ Ruta seleccionada: {' -> '.join(route['path'])} vía {' -> '.join(route['pairs'])} "
+                        f"(Esperado: {expected_value_eur:.2f}€ en {target_asset})"
+                    )
+                    return (route['pairs'][0], intermediate, expected_value_eur)
+            
             # PRIORIDAD 1: Buscar par directo source_asset/target_asset
             direct_pair_candidates = [
                 f"{source_asset}/{target_asset}",
@@ -4505,7 +4467,7 @@ Thumbs.db
                     direct_pair = pair_candidate
                     try:
                         # Obtener ticker para calcular valor recibido
-                        ticker = self.exchange.fetch_ticker(pair_candidate)
+                        ticker = await self.aexchange.fetch_ticker(pair_candidate)
                         if ticker:
                             base, quote = pair_candidate.split('/')
                             
@@ -4659,6 +4621,8 @@ Thumbs.db
                 logger.warning(f"❌ No se encontró ruta para swap {source_asset} -> {target_asset}")
                 return (None, None, 0.0)
                     
+        except RequestShed:
+            raise
         except Exception as e:
             logger.error(f"Error buscando mejor ruta de swap {source_asset} -> {target_asset}: {e}")
             return (None, None, 0.0)
@@ -4679,9 +4643,16 @@ Thumbs.db
         # Delegar a la nueva función con destino EUR
         return await self._find_best_swap_route(target_asset, 'EUR', amount)
     
+    @with_lane(LANE_EXECUTION)
+    @with_trade_lock
     async def execute_sell(self, slot_id: int, trade_id: int, trade: Dict[str, Any]) -> bool:
         """Ejecuta una orden de venta optimizada y cierra el trade."""
         try:
+            # Bajo el lock de operaciones: otra tarea pudo cerrar o rotar el trade desde la comprobación
+            if not self._trade_is_active(slot_id, trade_id):
+                logger.info(f"[Slot {slot_id}] Trade {trade_id} ya no está activo; se omite la venta")
+                return False
+            
             target_asset = trade['target_asset']
             amount = trade['amount']
             initial_fiat_value = trade['initial_fiat_value']
@@ -4798,7 +4769,7 @@ Thumbs.db
             
             hucha_info = f" (Hucha: {hucha_amount:.8f} {target_asset} guardado)" if hucha_amount > 0 else ""
             logger.info(f"Ejecutando venta optimizada: {best_pair}, cantidad: {amount_to_sell} (de {amount} total){hucha_info}")
-            order1 = self.exchange.create_market_sell_order(best_pair, amount_to_sell)
+            order1 = await self.aexchange.create_market_sell_order(best_pair, amount_to_sell)
             
             executed_price1 = order1.get('price', 0)
             executed_amount1 = order1.get('filled', amount_to_sell)
@@ -4834,10 +4805,10 @@ Thumbs.db
                     logger.info(f"Ejecutando segundo swap: {intermediate_pair}, cantidad: {intermediate_amount}")
                     # Determinar si es compra o venta según el par
                     if intermediate_pair.startswith(f"{intermediate}/"):
-                        order2 = self.exchange.create_market_sell_order(intermediate_pair, intermediate_amount)
+                        order2 = await self.aexchange.create_market_sell_order(intermediate_pair, intermediate_amount)
                     else:
                         # Par inverso: necesitamos comprar
-                        order2 = self.exchange.create_market_buy_order(intermediate_pair, intermediate_amount)
+                        order2 = await self.aexchange.create_market_buy_order(intermediate_pair, intermediate_amount)
                     final_destination_amount = order2.get('filled', intermediate_amount)
                 except Exception as e:
                     logger.error(f"Error en segundo swap {intermediate_pair}: {e}")
@@ -4910,7 +4881,7 @@ Thumbs.db
                                 break
                     
                     if destination_pair:
-                        ticker = self.exchange.fetch_ticker(destination_pair)
+                        ticker = await self.aexchange.fetch_ticker(destination_pair)
                         entry_price = ticker.get('last', 0)
                     else:
                         # Calcular precio desde valor EUR
@@ -5030,7 +5001,7 @@ Thumbs.db
                                     btc_amount_to_buy = self.exchange.amount_to_precision(btc_pair, btc_amount_to_buy)
                                     
                                     if btc_amount_to_buy > 0:
-                                        btc_order = self.exchange.create_market_buy_order(btc_pair, btc_amount_to_buy)
+                                        btc_order = await self.aexchange.create_market_buy_order(btc_pair, btc_amount_to_buy)
                                         filled_btc = btc_order.get('filled', 0)
                                         logger.info(f"💰 BTC comprado para hucha: {filled_btc:.8f} BTC")
                             except Exception as e:
@@ -5063,12 +5034,12 @@ Thumbs.db
             # Mantener lógica antigua de BNB como fallback (se puede eliminar después)
             bnb_status = self.vault.check_and_refill_bnb()
             if bnb_status.get('needs_refill', False) and final_value_eur > 0:
-                total_portfolio = self.vault.calculate_total_portfolio_value()
+                total_portfolio = self._total_portfolio_value()
                 bnb_config = self.strategy.get("bnb_management", {})
                 target_bnb_percent = bnb_config.get("min_target_percent", 3.0)
                 target_bnb_value = total_portfolio * (target_bnb_percent / 100.0)
                 current_bnb_value = self.vault.get_asset_value('BNB', 
-                    self.exchange.fetch_balance().get('BNB', {}).get('total', 0), 'EUR')
+                    (await self.aexchange.fetch_balance()).get('BNB', {}).get('total', 0), 'EUR')
                 needed_bnb_value = max(0, target_bnb_value - current_bnb_value)
                 
                 if needed_bnb_value > 0 and needed_bnb_value <= final_value_eur * 0.1:
@@ -5085,7 +5056,7 @@ Thumbs.db
                             
                             if bnb_pair:
                                 bnb_amount = self.exchange.amount_to_precision(bnb_pair, bnb_amount)
-                                order = self.exchange.create_market_buy_order(bnb_pair, bnb_amount)
+                                order = await self.aexchange.create_market_buy_order(bnb_pair, bnb_amount)
                                 
                                 filled_bnb = order.get('filled', 0)
                                 new_bnb_percent = (target_bnb_value / total_portfolio * 100) if total_portfolio > 0 else 0
@@ -5106,17 +5077,22 @@ Thumbs.db
             logger.info(f"Trade {trade_id} cerrado exitosamente en slot {slot_id}")
             return True
         
+        except RequestShed as e:
+            # Sin presupuesto de peso: no es falta de ruta, se reintenta en el próximo tick
+            logger.warning(f"[Slot {slot_id}] Venta pospuesta: presupuesto de peso agotado ({e})")
+            return False
         except Exception as e:
             logger.error(f"Error al ejecutar venta en slot {slot_id}: {e}")
             return False
     
+    @with_trade_lock
     async def _rebalance_to_whitelist_asset(self, currency: str, excess_value_eur: float, destination: str) -> bool:
         """
         🎯 Reequilibra exceso directamente a un activo de la whitelist.
         Versión optimizada que usa el destino ya encontrado.
         """
         try:
-            balances = self.exchange.fetch_balance()
+            balances = await self.aexchange.fetch_balance()
             total_balance = balances.get('total', {}).get(currency, 0.0)
             
             if total_balance <= 0:
@@ -5149,7 +5125,7 @@ Thumbs.db
             if best_pair:
                 try:
                     sell_amount = self.exchange.amount_to_precision(best_pair, excess_amount)
-                    order = self.exchange.create_market_sell_order(best_pair, sell_amount)
+                    order = await self.aexchange.create_market_sell_order(best_pair, sell_amount)
                     
                     if order and order.get('filled', 0) > 0:
                         filled = order.get('filled', 0)
@@ -5169,10 +5145,15 @@ Thumbs.db
             
             return False
             
+        except RequestShed as e:
+            # Sin presupuesto de peso: no es falta de ruta, se reintenta en el próximo tick
+            logger.warning(f"Reequilibrio de {currency} pospuesto: presupuesto de peso agotado ({e})")
+            return False
         except Exception as e:
             logger.error(f"Error en reequilibrio a whitelist: {e}")
             return False
     
+    @with_trade_lock
     async def _rebalance_overexposed_asset(self, currency: str, excess_value_eur: float) -> bool:
         """
         🎯 RE-EQUILIBRIO AUTOMÁTICO: Vende el exceso de un activo sobreexpuesto.
@@ -5200,7 +5181,7 @@ Thumbs.db
                     break
             
             # Obtener balance actual
-            balances = self.exchange.fetch_balance()
+            balances = await self.aexchange.fetch_balance()
             total_balance = balances.get('total', {}).get(currency, 0.0)
             
             if total_balance <= 0:
@@ -5258,7 +5239,7 @@ Thumbs.db
                     try:
                         # Ejecutar swap
                         sell_amount = self.exchange.amount_to_precision(best_pair, excess_amount)
-                        order = self.exchange.create_market_sell_order(best_pair, sell_amount)
+                        order = await self.aexchange.create_market_sell_order(best_pair, sell_amount)
                         
                         if order and order.get('filled', 0) > 0:
                             filled = order.get('filled', 0)
@@ -5293,7 +5274,7 @@ Thumbs.db
                 if pair_info:
                     try:
                         sell_amount = self.exchange.amount_to_precision(pair, excess_amount)
-                        order = self.exchange.create_market_sell_order(pair, sell_amount)
+                        order = await self.aexchange.create_market_sell_order(pair, sell_amount)
                         
                         if order and order.get('filled', 0) > 0:
                             filled = order.get('filled', 0)
@@ -5317,16 +5298,27 @@ Thumbs.db
             logger.warning(f"No se pudo ejecutar reequilibrio de {currency}")
             return False
             
+        except RequestShed as e:
+            # Sin presupuesto de peso: no es falta de ruta, se reintenta en el próximo tick
+            logger.warning(f"Reequilibrio de {currency} pospuesto: presupuesto de peso agotado ({e})")
+            return False
         except Exception as e:
             logger.error(f"Error en reequilibrio de {currency}: {e}")
             import traceback
             logger.debug(traceback.format_exc())
             return False
     
+    @with_lane(LANE_EXECUTION)
+    @with_trade_lock
     async def execute_swap(self, slot_id: int, trade_id: int, current_trade: Dict[str, Any],
                          new_pair: str, new_target_asset: str) -> bool:
         """Ejecuta un swap: vende el activo actual y compra el nuevo."""
         try:
+            # Bajo el lock de operaciones: otra tarea pudo cerrar o rotar el trade desde la comprobación
+            if not self._trade_is_active(slot_id, trade_id):
+                logger.info(f"[Slot {slot_id}] Trade {trade_id} ya no está activo; se omite el swap")
+                return False
+            
             # Constante: mínimo de 10€ para operar en Binance
             MIN_ORDER_VALUE_EUR = 10.0
             
@@ -5335,11 +5327,12 @@ Thumbs.db
             initial_fiat_value = current_trade['initial_fiat_value']
             
             # Obtener balance total de la moneda en la wallet
-            balances = self.exchange.fetch_balance()
+            balances = await self.aexchange.fetch_balance()
             total_balance = balances.get('total', {}).get(current_asset, 0.0)
             
-            # Calcular tamaño de orden según nuevas reglas
-            swap_amount = self._calculate_swap_order_size(current_asset, total_balance)
+            # Calcular tamaño de orden según nuevas reglas (con el libro de órdenes del par en cache)
+            await self.order_books.get(new_pair)
+            swap_amount = self._calculate_swap_order_size(current_asset, total_balance, new_pair)
             
             if swap_amount <= 0:
                 logger.warning(
@@ -5366,9 +5359,9 @@ Thumbs.db
             needed_base = base if base != current_asset else quote
             
             if current_asset == base:
-                ticker_buy = self.exchange.fetch_ticker(new_pair)
+                ticker_buy = await self.aexchange.fetch_ticker(new_pair)
                 buy_amount = self.exchange.amount_to_precision(new_pair, swap_amount)  # Usar swap_amount calculado
-                order_buy = self.exchange.create_market_buy_order(new_pair, buy_amount)
+                order_buy = await self.aexchange.create_market_buy_order(new_pair, buy_amount)
                 
                 final_amount = order_buy.get('filled', 0)
                 final_price = order_buy.get('price', ticker_buy['last'])
@@ -5443,9 +5436,9 @@ Thumbs.db
                 # Si es ruta directa, usar el par directamente
                 if intermediate is None:
                     # Par directo encontrado - ejecutar swap directo
-                    ticker_sell = self.exchange.fetch_ticker(swap_pair)
+                    ticker_sell = await self.aexchange.fetch_ticker(swap_pair)
                     sell_amount = self.exchange.amount_to_precision(swap_pair, swap_amount)  # Usar swap_amount calculado
-                    order_sell = self.exchange.create_market_sell_order(swap_pair, sell_amount)
+                    order_sell = await self.aexchange.create_market_sell_order(swap_pair, sell_amount)
                     
                     base_sell, quote_sell = swap_pair.split("/")
                     received_asset = quote_sell if base_sell == current_asset else base_sell
@@ -5453,9 +5446,9 @@ Thumbs.db
                     
                     # Si recibimos directamente el activo necesario, comprar el nuevo par
                     if received_asset == needed_base:
-                        ticker_buy = self.exchange.fetch_ticker(new_pair)
+                        ticker_buy = await self.aexchange.fetch_ticker(new_pair)
                         buy_amount = self.exchange.amount_to_precision(new_pair, received_amount)
-                        order_buy = self.exchange.create_market_buy_order(new_pair, buy_amount)
+                        order_buy = await self.aexchange.create_market_buy_order(new_pair, buy_amount)
                         
                         final_amount = order_buy.get('filled', 0)
                         final_price = order_buy.get('price', ticker_buy['last'])
@@ -5464,9 +5457,9 @@ Thumbs.db
                         return False
                 else:
                     # Ruta con intermediario: ejecutar dos swaps
-                    ticker_sell = self.exchange.fetch_ticker(swap_pair)
+                    ticker_sell = await self.aexchange.fetch_ticker(swap_pair)
                     sell_amount = self.exchange.amount_to_precision(swap_pair, swap_amount)  # Usar swap_amount calculado
-                    order_sell = self.exchange.create_market_sell_order(swap_pair, sell_amount)
+                    order_sell = await self.aexchange.create_market_sell_order(swap_pair, sell_amount)
                     
                     base_sell, quote_sell = swap_pair.split("/")
                     received_asset = quote_sell if base_sell == current_asset else base_sell
@@ -5489,9 +5482,9 @@ Thumbs.db
                             logger.error(f"No se encontró segundo par desde {intermediate} hacia {needed_base}")
                             return False
                         
-                        ticker_buy2 = self.exchange.fetch_ticker(swap_pair2)
+                        ticker_buy2 = await self.aexchange.fetch_ticker(swap_pair2)
                         buy_amount2 = self.exchange.amount_to_precision(swap_pair2, received_amount)
-                        order_buy2 = self.exchange.create_market_buy_order(swap_pair2, buy_amount2)
+                        order_buy2 = await self.aexchange.create_market_buy_order(swap_pair2, buy_amount2)
                         
                         base_buy2, quote_buy2 = swap_pair2.split("/")
                         received_asset2 = quote_buy2 if base_buy2 == intermediate else base_buy2
@@ -5499,9 +5492,9 @@ Thumbs.db
                         
                         if received_asset2 == needed_base:
                             # Ahora comprar el par final
-                            ticker_buy = self.exchange.fetch_ticker(new_pair)
+                            ticker_buy = await self.aexchange.fetch_ticker(new_pair)
                             buy_amount = self.exchange.amount_to_precision(new_pair, received_amount2)
-                            order_buy = self.exchange.create_market_buy_order(new_pair, buy_amount)
+                            order_buy = await self.aexchange.create_market_buy_order(new_pair, buy_amount)
                             
                             final_amount = order_buy.get('filled', 0)
                             final_price = order_buy.get('price', ticker_buy['last'])
@@ -5583,7 +5576,7 @@ Thumbs.db
             if final_price <= 0:
                 # Si no tenemos precio válido, obtener precio de mercado actual
                 try:
-                    ticker = self.exchange.fetch_ticker(new_pair)
+                    ticker = await self.aexchange.fetch_ticker(new_pair)
                     final_price = ticker.get('last', ticker.get('ask', 0))
                     if final_price <= 0:
                         logger.warning(
@@ -5616,6 +5609,10 @@ Thumbs.db
             )
             return True
         
+        except RequestShed as e:
+            # Sin presupuesto de peso: no es falta de ruta, se reintenta en el próximo tick
+            logger.warning(f"[Slot {slot_id}] Swap pospuesto: presupuesto de peso agotado ({e})")
+            return False
         except Exception as e:
             logger.error(f"Error al ejecutar swap en slot {slot_id}: {e}")
             return False
@@ -5660,6 +5657,105 @@ Thumbs.db
         except Exception as e:
             logger.error(f"Error al crear estado inicial: {e}")
     
+    def _resolve_radar_pair(self, currency: str) -> Optional[str]:
+        """Devuelve el par del radar de una moneda (base exacta, quote EUR o USDC)."""
+        # Activos promocionados por el escáner amplio: el par con el que superaron la criba
+        promoted = self.wide_scanner.pair_for(currency)
+        if promoted:
+            return promoted
+        for quote in ['EUR', 'USDC']:
+            for p in get_available_pairs(quote):
+                assets = get_pair_assets(p)
+                if assets and assets == (currency, quote):
+                    return p
+        return None
+    
+    async def _market_tickers(self) -> Dict[str, Dict[str, Any]]:
+        """Snapshot de tickers del router (precio y volumen para la detección de cambios)."""
+        try:
+            _, tickers = await self.aexchange.run(get_ticker_snapshot)
+            return tickers or {}
+        except Exception as e:
+            logger.debug(f"Error obteniendo snapshot de tickers: {e}")
+            return {}
+    
+    @staticmethod
+    def _ticker_inputs(tickers: Dict[str, Dict[str, Any]], pair: Optional[str]) -> Tuple[Optional[float], Optional[float]]:
+        """(precio, volumen 24h en quote) de un par en el snapshot."""
+        ticker = (tickers.get(pair) or {}) if pair else {}
+        return ticker.get('last'), ticker.get('quoteVolume')
+    
+    def _indicators_unchanged(self, pair: str, tickers: Dict[str, Dict[str, Any]], now: float) -> bool:
+        """
+        True si los indicadores cacheados del par siguen valiendo: sus datos de
+        entrada no cambiaron desde el cálculo. Renueva el timestamp de la cache.
+        """
+        cached = self.indicator_cache.get(pair)
+        if not cached or self.indicator_changes.is_dirty(pair, *self._ticker_inputs(tickers, pair), now=now):
+            return False
+        self.indicator_cache[pair] = (now, cached[1])
+        return True
+    
+    def _radar_unchanged(self, currency: str, tickers: Dict[str, Dict[str, Any]], now: float) -> bool:
+        """True si la moneda ya está en el radar y su par no cambió desde la última evaluación."""
+        if currency not in self.radar_data_cache:
+            return False
+        pair = self._resolve_radar_pair(currency)
+        return not self.radar_changes.is_dirty(currency, *self._ticker_inputs(tickers, pair), now=now)
+    
+    def _mark_radar_clean(self, currency: str, tickers: Dict[str, Dict[str, Any]]):
+        """Guarda precio/volumen con los que se recalculó la moneda en el radar."""
+        self.radar_changes.mark_clean(currency, *self._ticker_inputs(tickers, self._resolve_radar_pair(currency)))
+    
+    async def _prefetch_indicators(self, pairs: List[str]):
+        """
+        Calcula en una sola pasada vectorizada los indicadores de varios pares
+        y los deja en self.indicator_cache para _evaluate_signal y el radar.
+        Solo se recalculan los pares cuyo precio, volumen o vela cambiaron.
+        """
+        if not HAS_SIGNALS or not hasattr(signals, 'get_technical_indicators_batch'):
+            return
+        now = time.time()
+        expired = [
+            p for p in dict.fromkeys(pairs)
+            if p and now - self.indicator_cache.get(p, (0, None))[0] >= self.indicator_cache_ttl
+        ]
+        if not expired:
+            return
+        tickers = await self._market_tickers()
+        stale = [p for p in expired if not self._indicators_unchanged(p, tickers, now)]
+        if not stale:
+            return
+        try:
+            # Sin timeout global: el lote puede incluir descargas completas de velas
+            batch = await self.aexchange.run(
+                signals.get_technical_indicators_batch, stale, self.exchange, use_default_timeout=False
+            )
+            now = time.time()
+            for pair, indicators in batch.items():
+                self.indicator_cache[pair] = (now, indicators)
+                self.indicator_changes.mark_clean(pair, *self._ticker_inputs(tickers, pair), now=now)
+            logger.debug(f"Indicadores en lote: {len(batch)}/{len(stale)} pares calculados ({len(expired) - len(stale)} sin cambios)")
+        except Exception as e:
+            logger.debug(f"Error calculando indicadores en lote: {e}")
+    
+    async def _get_indicators(self, pair: str) -> Dict[str, Any]:
+        """Indicadores de un par: del lote si están frescos o sin cambios, si no cálculo individual."""
+        cached = self.indicator_cache.get(pair)
+        now = time.time()
+        if cached and now - cached[0] < self.indicator_cache_ttl:
+            return cached[1]
+        tickers = await self._market_tickers()
+        if cached and self._indicators_unchanged(pair, tickers, now):
+            return cached[1]
+        indicators = await self.aexchange.run_coalesced(
+            ('indicators', pair), signals.get_technical_indicators, pair, self.exchange
+        )
+        if indicators:
+            self.indicator_cache[pair] = (time.time(), indicators)
+            self.indicator_changes.mark_clean(pair, *self._ticker_inputs(tickers, pair))
+        return indicators
+    
     async def _evaluate_currency_signal_for_radar(self, currency: str) -> Dict[str, Any]:
         """Evalúa las señales técnicas de una moneda para el radar."""
         result = {
@@ -5678,15 +5774,7 @@ Thumbs.db
             return result
         
         try:
-            pair = None
-            for base in ['EUR', 'USDC']:
-                candidate_pairs = get_available_pairs(base)
-                for p in candidate_pairs:
-                    if currency in p:
-                        pair = p
-                        break
-                if pair:
-                    break
+            pair = self._resolve_radar_pair(currency)
             
             if not pair:
                 return result
@@ -5694,7 +5782,7 @@ Thumbs.db
             try:
                 import signals
                 if hasattr(signals, 'get_technical_indicators'):
-                    indicators = signals.get_technical_indicators(pair, self.exchange)
+                    indicators = await self._get_indicators(pair)
                     result['rsi'] = indicators.get('rsi')
                     ema_dist = indicators.get('ema200_distance')
                     if ema_dist is not None:
@@ -5728,36 +5816,33 @@ Thumbs.db
             if result['volume_status'] is None:
                 result['volume_status'] = 'medium'
             
-            rsi_threshold = self.strategy["indicators"].get("rsi_radar_threshold", 48)
-            ema_traditional = self.strategy["indicators"].get("ema200_traditional_threshold", -2.0)
-            ema_buy_dip = self.strategy["indicators"].get("ema200_buy_dip_threshold", 0.0)
-            
-            rsi_ok = result['rsi'] < rsi_threshold if result['rsi'] is not None else False
-            ema_ok = False
-            if result['ema200_distance'] is not None:
-                ema_ok = result['ema200_distance'] < ema_traditional or result['ema200_distance'] > ema_buy_dip
-            volume_ok = result['volume_status'] == 'high' if result['volume_status'] else False
-            
-            result['conditions_met'] = sum([rsi_ok, ema_ok, volume_ok])
-            result['triple_green'] = result['conditions_met'] == 3
-            # Calcular heat_score usando la función completa (se recalcula después)
-            result['heat_score'] = (result['conditions_met'] * 33) + (10 if result['triple_green'] else 0)
+            self._apply_radar_conditions(result)
             
         except Exception as e:
             logger.debug(f"Error al evaluar señal para {currency}: {e}")
         
         return result
     
+    def _apply_radar_conditions(self, result: Dict[str, Any]):
+        """Calcula conditions_met, triple_green y el heat_score provisional de una señal del radar."""
+        rsi_threshold = self.strategy["indicators"].get("rsi_radar_threshold", 48)
+        ema_traditional = self.strategy["indicators"].get("ema200_traditional_threshold", -2.0)
+        ema_buy_dip = self.strategy["indicators"].get("ema200_buy_dip_threshold", 0.0)
+        
+        rsi_ok = result['rsi'] < rsi_threshold if result['rsi'] is not None else False
+        ema_ok = False
+        if result['ema200_distance'] is not None:
+            ema_ok = result['ema200_distance'] < ema_traditional or result['ema200_distance'] > ema_buy_dip
+        volume_ok = result['volume_status'] == 'high' if result['volume_status'] else False
+        
+        result['conditions_met'] = sum([rsi_ok, ema_ok, volume_ok])
+        result['triple_green'] = result['conditions_met'] == 3
+        # Calcular heat_score usando la función completa (se recalcula después)
+        result['heat_score'] = (result['conditions_met'] * 33) + (10 if result['triple_green'] else 0)
+    
     def _get_radar_zone(self, heat_score: int) -> str:
         """Determina la zona del radar según el heat_score."""
-        if heat_score > 85:
-            return 'muy_caliente'
-        elif heat_score >= 70:
-            return 'caliente'
-        elif heat_score >= 40:
-            return 'fria'
-        else:
-            return 'muy_fria'
+        return radar_zone(heat_score)
     
     async def _update_radar_zone(self, zone: str, currencies: List[str]):
         """
@@ -5774,56 +5859,75 @@ Thumbs.db
             'fria': 'Fría',
             'muy_fria': 'Muy Fría'
         }.get(zone, zone)
+        # Las zonas calientes van por el carril del radar caliente; el resto, por el de escaneo
+        if zone in ('muy_caliente', 'caliente'):
+            set_task_lane(LANE_HOT)
         
         while self.running:
             try:
                 updated_count = 0
-                for currency in currencies:
+                # Solo se recalculan las monedas cuyo precio, volumen o vela cambiaron
+                tickers = await self._market_tickers()
+                now = time.time()
+                dirty = [c for c in currencies if not self._radar_unchanged(c, tickers, now)]
+                if len(dirty) < len(currencies):
+                    logger.debug(f"Radar [{zone_name_display}]: {len(currencies) - len(dirty)} monedas sin cambios")
+                # Indicadores de toda la zona en una sola pasada vectorizada
+                await self._prefetch_indicators([self._resolve_radar_pair(c) for c in dirty])
+                
+                # 1) Evaluar señales de la zona
+                evaluated = []
+                for currency in dirty:
                     if not self.running:
                         break
-                    
                     try:
-                        # Evaluar señal de la moneda
-                        signal_data = await self._evaluate_currency_signal_for_radar(currency)
+                        evaluated.append((currency, await self._evaluate_currency_signal_for_radar(currency)))
+                        # Pequeño delay entre monedas para no saturar la API
+                        await asyncio.sleep(0.1)
+                    except Exception as e:
+                        logger.debug(f"Error evaluando {currency} en zona {zone}: {e}")
+                
+                # 2) Recalcular heat_score de toda la zona en una sola pasada
+                try:
+                    self._score_heat_batch([signal_data for _, signal_data in evaluated])
+                except Exception as e:
+                    logger.debug(f"Error calculando heat_score en lote para zona {zone}: {e}")
+                
+                try:
+                    active_assets = self._get_active_assets()
+                except Exception:
+                    active_assets = []
+                
+                # 3) Actualizar cache
+                for currency, signal_data in evaluated:
+                    try:
                         heat_score = signal_data.get('heat_score', 0)
                         
-                        # Recalcular heat_score usando la función completa
-                        heat_score = await self._calculate_heat_score(signal_data)
-                        signal_data['heat_score'] = heat_score
-                        
                         # Recortar historiales y actualizar cache
                         try:
                             signal_data = self._trim_price_history(signal_data)
                         except Exception:
                             pass
                         self.radar_data_cache[currency] = signal_data
-                        self.radar_last_update[currency] = time.time()
+                        self._mark_radar_clean(currency, tickers)
                         updated_count += 1
                         
                         logger.debug(f"Radar [{zone_name_display}]: {currency} actualizado (heat: {heat_score})")
-
-                        # Si la moneda cumple criterios de persecución (heat alto o slot activo),
-                        # lanzar tarea per-pair para polling más frecuente (5s) sin bloquear la zona.
-                        try:
-                            active_assets = self._get_active_assets()
-                        except Exception:
-                            active_assets = []
-
-                        try:
-                            if (heat_score >= 90 or currency in active_assets) and currency not in self.persecution_tasks:
-                                # Crear tarea de persecución concurrente
-                                task = asyncio.create_task(self._persecute_currency(currency))
-                                self.persecution_tasks[currency] = task
-                                logger.info(f"MODE: PERSECUCIÓN activada para {currency} (heat: {heat_score})")
-                        except Exception as e:
-                            logger.debug(f"Error iniciando persecución para {currency}: {e}")
-                        
-                        # Pequeño delay entre monedas para no saturar la API
-                        await asyncio.sleep(0.1)
                     except Exception as e:
                         logger.debug(f"Error actualizando {currency} en zona {zone}: {e}")
                         continue
                 
+                # 4) Lanzar persecuciones en toda la zona: si la moneda cumple criterios
+                # (heat alto o slot activo), añadirla al bucle de persecución (polling más
+                # frecuente) sin bloquear la zona. Las monedas sin cambios usan su heat cacheado.
+                for currency in currencies:
+                    try:
+                        heat_score = self.radar_data_cache.get_value(currency, 'heat_score', 0) or 0
+                        if heat_score >= 90 or currency in active_assets:
+                            self._start_persecution(currency, heat_score, currency in active_assets)
+                    except Exception as e:
+                        logger.debug(f"Error iniciando persecución para {currency}: {e}")
+                
                 if updated_count > 0:
                     # Guardar radar actualizado
                     await self._save_radar_data()
@@ -5852,26 +5956,21 @@ Thumbs.db
             self.radar_last_save_time = current_time
             self.radar_pending_save = False
             
-            # Convertir cache a lista y ordenar por heat_score
-            radar_list = []
-            for currency, data in self.radar_data_cache.items():
-                radar_list.append(data)
-            
-            # Ordenar por heat_score descendente
-            radar_list.sort(key=lambda x: x.get('heat_score', 0), reverse=True)
+            # Filas serializadas (con alias del dashboard) ordenadas por heat_score descendente
+            radar_list = self.radar_data_cache.rows()
             
             # Añadir información de zona y última actualización
             for item in radar_list:
                 heat_score = item.get('heat_score', 0)
                 item['zone'] = self._get_radar_zone(heat_score)
                 currency = item.get('currency', '')
-                if currency in self.radar_last_update:
+                if currency in self.radar_data_cache:
                     item['last_update'] = datetime.fromtimestamp(
-                        self.radar_last_update[currency]
+                        self.radar_data_cache.last_update(currency)
                     ).isoformat()
                 # Indicar si la moneda tiene una tarea de persecución activa
                 try:
-                    item['in_persecution'] = currency in getattr(self, 'persecution_tasks', {})
+                    item['in_persecution'] = currency in self.persecuted
                 except Exception:
                     item['in_persecution'] = False
             
@@ -5906,33 +6005,15 @@ Thumbs.db
             try:
                 for it in radar_list:
                     cur = it.get('currency')
-                    it['in_persecution'] = cur in getattr(self, 'persecution_tasks', {})
+                    it['in_persecution'] = cur in self.persecuted
             except Exception:
                 pass
             
             # Limpiar cache en memoria si se ha vuelto demasiado grande
             try:
                 MAX_CACHE_ENTRIES = 1000
-                if isinstance(self.radar_data_cache, dict) and len(self.radar_data_cache) > MAX_CACHE_ENTRIES:
-                    # Ordenar por última actualización (desc) y mantener las más recientes
-                    items = sorted(
-                        [(k, self.radar_last_update.get(k, 0)) for k in self.radar_data_cache.keys()],
-                        key=lambda x: x[1],
-                        reverse=True
-                    )
-                    keep_keys = set([k for k, _ in items[:MAX_CACHE_ENTRIES]])
-                    for k in list(self.radar_data_cache.keys()):
-                        if k not in keep_keys:
-                            try:
-                                del self.radar_data_cache[k]
-                            except Exception:
-                                pass
-                    for k in list(self.radar_last_update.keys()):
-                        if k not in keep_keys:
-                            try:
-                                del self.radar_last_update[k]
-                            except Exception:
-                                pass
+                # Mantener las entradas actualizadas más recientemente
+                self.radar_data_cache.trim(MAX_CACHE_ENTRIES)
             except Exception:
                 pass
 
@@ -5968,56 +6049,114 @@ Thumbs.db
         except Exception as e:
             logger.error(f"Error guardando radar.json: {e}")
 
-    async def _persecute_currency(self, currency: str):
+    def _start_persecution(self, currency: str, heat_score: int, held: bool = False) -> bool:
         """
-        Tarea per-pair: actualiza la `currency` con mayor frecuencia (5s)
-        mientras cumpla el criterio de persecución (heat>=90 o slot activo).
+        Añade una moneda al bucle de persecución (respetando el cupo máximo).
+        Con el cupo lleno, un activo en cartera desplaza a la moneda no poseída
+        con menor heat; una moneda no poseída se descarta.
+        
+        Returns:
+            True si la moneda queda en persecución
         """
-        try:
-            LOG_TAG = f"Persecución:{currency}"
-            while self.running:
-                try:
-                    # Evaluar señal y heat
-                    signal_data = await self._evaluate_currency_signal_for_radar(currency)
-                    heat_score = signal_data.get('heat_score', 0)
-                    heat_score = await self._calculate_heat_score(signal_data)
-                    signal_data['heat_score'] = heat_score
-
-                    # Trim historiales y actualizar cache
-                    try:
-                        signal_data = self._trim_price_history(signal_data)
-                    except Exception:
-                        pass
-                    self.radar_data_cache[currency] = signal_data
-                    self.radar_last_update[currency] = time.time()
-
-                    # Verificar condición de salida: si ya no cumple persecución, terminar
-                    try:
-                        active_assets = self._get_active_assets()
-                    except Exception:
-                        active_assets = []
-
-                    is_active_asset = currency in active_assets
-
-                    if not (heat_score >= 90 or is_active_asset):
-                        logger.info(f"MODE: CRUCERO reanudado para {currency} (heat: {heat_score})")
-                        break
-
-                    # Esperar periodo de persecución (priorizar activos en posición abierta)
-                    poll_interval = 0.5 if is_active_asset else 5
-                    await asyncio.sleep(poll_interval)
-                except asyncio.CancelledError:
-                    logger.info(f"Tarea de persecución cancelada para {currency}")
-                    break
-                except Exception as e:
-                    logger.debug(f"{LOG_TAG} Error intern|o: {e}")
-                    await asyncio.sleep(poll_interval if 'poll_interval' in locals() else 1)
-        finally:
+        if currency in self.persecuted:
+            return True
+        if len(self.persecuted) >= self.persecution_max:
+            victims = [c for c, state in self.persecuted.items() if not state['held']]
+            if not held or not victims:
+                logger.debug(f"Persecución de {currency} descartada: cupo lleno ({self.persecution_max})")
+                return False
+            victim = min(victims, key=lambda c: self.radar_data_cache.get_value(c, 'heat_score', 0))
+            self.persecuted.pop(victim, None)
+            logger.info(f"MODE: CRUCERO reanudado para {victim} (desplazada por {currency})")
+        # El par se resuelve una sola vez: el sondeo no vuelve a consultar los mercados
+        pair = self._resolve_radar_pair(currency)
+        if not pair:
+            return False
+        self.persecuted[currency] = {'pair': pair, 'held': held, 'next_poll': 0.0, 'full_at': 0.0}
+        logger.info(f"MODE: PERSECUCIÓN activada para {currency} (heat: {heat_score})")
+        if self._persecution_task is None or self._persecution_task.done():
+            self._persecution_task = asyncio.create_task(self._persecution_loop())
+        return True
+    
+    async def _persecute_currency(self, currency: str, state: Dict[str, Any],
+                                  tickers: Dict[str, Dict[str, Any]], active_assets: set) -> bool:
+        """
+        Un sondeo de persecución. Vía rápida: solo el precio del snapshot aplicado a
+        la vela en curso (signals.get_live_indicators); la evaluación completa con
+        velas se hace al cerrar vela y cada `full_refresh_interval` segundos.
+        
+        Returns:
+            False si la moneda ya no cumple el criterio de persecución (heat>=90 o slot activo)
+        """
+        pair = state['pair']
+        now = time.time()
+        if self._radar_unchanged(currency, tickers, now):
+            # Sin cambios de precio/volumen/vela: el heat cacheado sigue valiendo
+            heat_score = self.radar_data_cache.get_value(currency, 'heat_score', 0)
+        else:
+            price, _ = self._ticker_inputs(tickers, pair)
+            indicators = {}
+            if HAS_SIGNALS and now < state['full_at'] and hasattr(signals, 'get_live_indicators'):
+                indicators = signals.get_live_indicators(pair, price)
+            signal_data = self.radar_data_cache.get(currency)
+            if indicators and signal_data:
+                signal_data['rsi'] = indicators.get('rsi')
+                signal_data['ema200_distance'] = indicators.get('ema200_distance')
+                signal_data['current_price'] = price
+                self._apply_radar_conditions(signal_data)
+            else:
+                signal_data = await self._evaluate_currency_signal_for_radar(currency)
+                state['full_at'] = now + self.persecution_full_refresh
+            heat_score = await self._calculate_heat_score(signal_data)
+            signal_data['heat_score'] = heat_score
+            
+            # Trim historiales y actualizar cache
             try:
-                if currency in self.persecution_tasks:
-                    del self.persecution_tasks[currency]
+                signal_data = self._trim_price_history(signal_data)
             except Exception:
                 pass
+            self.radar_data_cache[currency] = signal_data
+            self._mark_radar_clean(currency, tickers)
+        
+        state['held'] = currency in active_assets
+        if not (heat_score >= 90 or state['held']):
+            logger.info(f"MODE: CRUCERO reanudado para {currency} (heat: {heat_score})")
+            return False
+        
+        # Priorizar activos en posición abierta
+        state['next_poll'] = now + (
+            self.persecution_active_poll_interval if state['held'] else self.persecution_poll_interval
+        )
+        return True
+    
+    @with_lane(LANE_HOT)
+    async def _persecution_loop(self):
+        """Bucle compartido que sondea las monedas en persecución cuando les toca."""
+        try:
+            while self.running and self.persecuted:
+                now = time.time()
+                due = [c for c, state in self.persecuted.items() if state['next_poll'] <= now]
+                if due:
+                    tickers = await self._market_tickers()
+                    try:
+                        active_assets = set(self._get_active_assets())
+                    except Exception:
+                        active_assets = set()
+                    for currency in due:
+                        state = self.persecuted.get(currency)
+                        if state is None:
+                            continue
+                        try:
+                            if not await self._persecute_currency(currency, state, tickers, active_assets):
+                                self.persecuted.pop(currency, None)
+                        except Exception as e:
+                            logger.debug(f"Persecución:{currency} Error interno: {e}")
+                            state['next_poll'] = time.time() + 1
+                if self.persecuted:
+                    wait = min(state['next_poll'] for state in self.persecuted.values()) - time.time()
+                    await asyncio.sleep(min(max(wait, 0.05), self.persecution_poll_interval))
+        except asyncio.CancelledError:
+            logger.info("Bucle de persecución cancelado")
     
     async def _get_wallet_currencies_for_radar(self) -> List[str]:
         """
@@ -6033,7 +6172,7 @@ Thumbs.db
             if not self.exchange:
                 return []
             
-            balances = self.exchange.fetch_balance()
+            balances = await self.aexchange.fetch_balance()
             if not balances or 'total' not in balances:
                 return []
             
@@ -6246,7 +6385,7 @@ Thumbs.db
             ticker = None
             try:
                 # BYPASS AGRESIVO: Ir directamente a OHLCV si ticker no existe
-                ticker = self.exchange.fetch_ticker(pair)  # fetch_ticker es SYNC, no async
+                ticker = await self.aexchange.fetch_ticker(pair)
             except Exception as e:
                 logger.debug(f"❌ {pair}: fetch_ticker falló ({type(e).__name__}), usando OHLCV")
                 ticker = None  # Forzar fallback inmediato
@@ -6255,7 +6394,7 @@ Thumbs.db
                     if '/' in pair:
                         base, quote = pair.split('/')
                         inverse_pair = f"{quote}/{base}"
-                        ticker = self.exchange.fetch_ticker(inverse_pair)
+                        ticker = await self.aexchange.fetch_ticker(inverse_pair)
                         logger.info(f"✅ {pair}: Fallback inverso usando {inverse_pair}")
                 except Exception as inv_err:
                     logger.debug(f"Fallback inverso también falló para {pair}: {inv_err}")
@@ -6292,7 +6431,10 @@ Thumbs.db
                 # FALLBACK AGRESIVO: Usar OHLCV para precio y cambio 24h
                 logger.info(f"🔄 {pair}: Sin ticker, usando OHLCV fallback...")
                 try:
-                    ohlcv_24h = self.exchange.fetch_ohlcv(pair, timeframe='1h', limit=25)
+                    ohlcv_24h = await self.aexchange.run_coalesced(
+                        ('ohlcv', pair, '1h', 25),
+                        get_candle_store().get_ohlcv, self.exchange, pair, '1h', limit=25
+                    )
                     if ohlcv_24h and len(ohlcv_24h) >= 2:
                         price_24h_ago = ohlcv_24h[0][4]  # Close de hace 24h
                         current_price = ohlcv_24h[-1][4]  # Close actual
@@ -6312,7 +6454,10 @@ Thumbs.db
             # FALLBACK DE VOLUMEN: Si ticker no tiene volumen, usar última vela de OHLCV
             if quote_volume_raw == 0.0:
                 try:
-                    ohlcv_1h = self.exchange.fetch_ohlcv(pair, timeframe='1h', limit=1)
+                    ohlcv_1h = await self.aexchange.run_coalesced(
+                        ('ohlcv', pair, '1h', 1),
+                        get_candle_store().get_ohlcv, self.exchange, pair, '1h', limit=1
+                    )
                     if ohlcv_1h and len(ohlcv_1h) > 0:
                         quote_volume_raw = float(ohlcv_1h[-1][5])  # Volumen de última vela 1h
                         logger.info(f"📊 {pair}: Volumen desde OHLCV: {quote_volume_raw:.8f}")
@@ -6489,7 +6634,6 @@ Thumbs.db
                             'note': f"proxy_from_{pair_found}" if '/' in pair_found and base_asset not in pair_found else 'direct'
                         }
                         self.radar_data_cache[key] = entry
-                        self.radar_last_update[key] = time.time()
                         entries_added += 1
                         await asyncio.sleep(0.001)  # Yield control mínimo
                     
@@ -6503,25 +6647,30 @@ Thumbs.db
             logger.error(f"Error en _scan_whitelist_against_base: {e}", exc_info=True)
 
     async def _classify_whitelist_by_heat(self) -> Dict[str, List[str]]:
-        """Clasifica la whitelist en 3 niveles de prioridad según heat_score almacenado en SQLite.
+        """Clasifica la whitelist en 3 niveles de prioridad según el heat_score del radar.
         
         Returns:
             Dict con keys 'hot' (Top 10), 'warm' (11-20), 'cold' (resto)
         """
         try:
-            from engine.storage import get_latest_market_data
             whitelist = self.strategy.get('whitelist', [])
-            
-            # Obtener heat_score de todos los activos desde SQLite
-            db_entries = get_latest_market_data(limit=200)
-            heat_map = {}  # destination -> heat_score
-            
-            for entry in db_entries:
-                dest = entry.get('destination')
-                heat = entry.get('heat_score', 0) or 0
-                if dest and dest in whitelist:
-                    # Mantener el heat más alto si hay múltiples pares para el mismo activo
-                    if dest not in heat_map or heat > heat_map[dest]:
+            whitelist_set = set(whitelist)
+            
+            # Recorrer el índice de heat del radar (ya ordenado); la primera aparición
+            # de cada activo es su heat más alto
+            heat_map = {}  # destino -> heat_score, en orden de heat descendente
+            for key, heat in self.radar_data_cache.ranked_keys():
+                dest = self.radar_data_cache.get_value(key, 'destination') or self.radar_data_cache.get_value(key, 'currency')
+                if dest in whitelist_set and dest not in heat_map:
+                    heat_map[dest] = heat
+            
+            if not heat_map:
+                # Radar vacío (arranque): heat_score almacenado en SQLite
+                from engine.storage import get_latest_market_data
+                for entry in get_latest_market_data(limit=200):
+                    dest = entry.get('destination')
+                    heat = entry.get('heat_score', 0) or 0
+                    if dest in whitelist_set and (dest not in heat_map or heat > heat_map[dest]):
                         heat_map[dest] = heat
             
             # Ordenar por heat_score descendente
@@ -6556,6 +6705,9 @@ Thumbs.db
         """Escanea un subset de la whitelist contra múltiples bases (USDT, BTC, ETH).
 
         - Usa get_pair_info para evitar llamadas pesadas (aprovecha el cache/ticker).
+        - Todas las combinaciones activo×base se consultan en paralelo con
+          concurrencia acotada y timeout por par; un par lento no bloquea al resto.
+        - Para cada activo se usa la primera base (en orden de preferencia) con precio.
         - Construye entradas con proxy RSI y heat basados en change_24h.
         - Devuelve el número de activos distintos actualizados.
         
@@ -6571,26 +6723,50 @@ Thumbs.db
             if target_assets is None:
                 target_assets = self.strategy.get('whitelist', [])
             
-            if not target_assets:
+            # Saltar activos que no aportan al radar
+            targets = [t for t in dict.fromkeys(target_assets or []) if t not in ['EUR', 'USDC', 'BNB']]
+            if not targets:
                 return 0
 
+            scan_config = self.strategy.get('scan_scheduler', {})
+            pair_timeout = scan_config.get('pair_timeout', 3.0)
+            semaphore = asyncio.Semaphore(max(1, int(scan_config.get('max_parallel_pairs', 16))))
+            results = {'completed': 0, 'timed_out': 0, 'failed': 0}
+
+            async def fetch_candidate(candidate: str) -> Optional[Dict[str, Any]]:
+                async with semaphore:
+                    try:
+                        info = await self.aexchange.run(get_pair_info, candidate, timeout=pair_timeout)
+                        results['completed'] += 1
+                        return info
+                    except asyncio.TimeoutError:
+                        results['timed_out'] += 1
+                    except Exception as e:
+                        results['failed'] += 1
+                        logger.debug(f"Error en scan multi-bases para {candidate}: {e}")
+                    return None
+
+            # Solo pares que existen en el exchange (evita consultas a pares inexistentes)
+            spot_pairs = get_spot_pairs()
+            candidates = [
+                (target, base) for target in targets for base in bases
+                if not spot_pairs or f"{target}/{base}" in spot_pairs
+            ]
+            infos = await asyncio.gather(*(fetch_candidate(f"{target}/{base}") for target, base in candidates))
+            by_candidate = dict(zip(candidates, infos))
+
             updated_destinations: set = set()
-            for target in target_assets:
+            for target in targets:
                 try:
-                    # Saltar activos que no aportan al radar
-                    if target in ['EUR', 'USDC', 'BNB']:
-                        continue
-
                     # Buscar el par más líquido en orden de preferencia
                     pair_found = None
                     pair_info = None
                     base_used = None
 
                     for base in bases:
-                        candidate = f"{target}/{base}"
-                        info = get_pair_info(candidate)
+                        info = by_candidate.get((target, base))
                         if info and info.get('last_price'):
-                            pair_found = candidate
+                            pair_found = f"{target}/{base}"
                             pair_info = info
                             base_used = base
                             break
@@ -6630,25 +6806,155 @@ Thumbs.db
                             'note': f"proxy_from_{pair_found}"
                         }
                         self.radar_data_cache[key] = entry
-                        self.radar_last_update[key] = time.time()
                         updated_destinations.add(target)
 
-                        # Pequeño yield para no bloquear el loop
-                        await asyncio.sleep(0.001)
-
-                    # Criterio: intentar rellenar al menos 10 activos distintos con datos
-                    if len(updated_destinations) >= 10:
-                        break
-
                 except Exception as e:
                     logger.debug(f"Error en scan multi-bases para {target}: {e}")
                     continue
 
-            logger.info(f"✅ Escáner multi-bases completado: {len(updated_destinations)} activos actualizados")
+            for name, count in results.items():
+                self.scan_metrics[name] += count
+            logger.info(
+                f"✅ Escáner multi-bases completado: {len(updated_destinations)}/{len(targets)} activos actualizados "
+                f"(pares: {results['completed']} ok, {results['timed_out']} timeout, {results['failed']} error)"
+            )
             return len(updated_destinations)
         except Exception as e:
             logger.error(f"Error en _scan_whitelist_multi_bases: {e}", exc_info=True)
             return 0
+
+    async def _screen_wide_market(self, exclude: List[str]) -> List[str]:
+        """
+        Criba todos los pares spot con el snapshot de tickers (modo amplio).
+        
+        Returns:
+            Activos fuera de la whitelist promocionados a evaluación completa
+        """
+        scanner = self.wide_scanner
+        try:
+            version, tickers = await self.aexchange.run(get_ticker_snapshot)
+            if tickers and scanner.due(version):
+                promoted = scanner.screen(tickers, get_spot_pairs(), exclude, version)
+                logger.debug(f"🔭 Escáner amplio: {len(promoted)} activos promocionados {scanner.get_stats()}")
+        except Exception as e:
+            logger.debug(f"Error en la criba del escáner amplio: {e}")
+        return scanner.promoted()
+
+    async def _evaluate_wide_assets(self, assets: List[str]) -> int:
+        """
+        Evaluación completa (velas + indicadores + heat_score) de los activos
+        promocionados por el escáner amplio. Se guardan en el radar por moneda.
+        
+        Returns:
+            Número de activos actualizados
+        """
+        await self._prefetch_indicators([self._resolve_radar_pair(a) for a in assets])
+        evaluated = []
+        for asset in assets:
+            try:
+                evaluated.append(await self._evaluate_currency_signal_for_radar(asset))
+            except Exception as e:
+                logger.debug(f"Error evaluando {asset} (escáner amplio): {e}")
+        try:
+            self._score_heat_batch(evaluated)
+        except Exception as e:
+            logger.debug(f"Error calculando heat_score del escáner amplio: {e}")
+        tickers = await self._market_tickers()
+        for signal_data in evaluated:
+            currency = signal_data['currency']
+            price, _ = self._ticker_inputs(tickers, self._resolve_radar_pair(currency))
+            signal_data['current_price'] = price
+            signal_data['note'] = 'wide_scan'
+            self.radar_data_cache[currency] = self._trim_price_history(signal_data)
+            self._mark_radar_clean(currency, tickers)
+        return len(evaluated)
+
+    async def _scan_due_assets(self, bases: List[str] = None) -> int:
+        """Escanea los activos de la whitelist cuyo próximo escaneo ha vencido.
+
+        - Cada activo tiene su propio intervalo (engine.scan_scheduler): los que
+          están en cartera, cerca del umbral de entrada o moviéndose rápido se
+          escanean más a menudo.
+        - Los activos urgentes van por el carril del radar caliente; el resto se
+          pospone si el tick de vigilancia va tarde (engine.tick_budget).
+        - En modo amplio (engine.wide_scan) se planifican también los activos
+          promocionados por la criba del mercado completo; se evalúan con
+          indicadores como trabajo de baja prioridad.
+        
+        Returns:
+            Número de activos actualizados
+        """
+        if bases is None:
+            bases = ['USDT', 'BTC', 'ETH']
+        scheduler = self.scan_scheduler
+        whitelist = [a for a in self.strategy.get('whitelist', []) if a not in ['EUR', 'USDC', 'BNB']]
+        held = set()
+        try:
+            held = {t.get('target_asset') for t in self.db.get_all_active_trades() if t.get('target_asset')}
+        except Exception as e:
+            logger.debug(f"Error leyendo trades activos para el planificador: {e}")
+        promoted = []
+        if self.wide_scanner.enabled:
+            promoted = await self._screen_wide_market(self.strategy.get('whitelist', []) + ['EUR', 'USDC', 'BNB'])
+        scheduler.sync_assets(whitelist + promoted, held)
+
+        due = scheduler.pop_due()
+        if not due:
+            return 0
+        promoted_set = set(promoted)
+        wide = [a for a in due if a in promoted_set]
+        due = [a for a in due if a not in promoted_set]
+        hot = [a for a in due if scheduler.is_hot(a)]
+        background = [a for a in due if not scheduler.is_hot(a)]
+        if (background or wide) and not self.tick_budget.should_run('scan_background'):
+            # Tick fuera de plazo: posponer los no urgentes un intervalo mínimo
+            scheduler.reschedule(background + wide, delay=scheduler.min_interval)
+            background = []
+            wide = []
+
+        updated = 0
+        for assets, lane in ((hot, LANE_HOT), (background, LANE_SCAN)):
+            if not assets:
+                continue
+            stage = 'scan_hot' if lane == LANE_HOT else 'scan_background'
+            scan_started = time.time()
+            try:
+                with self.tick_budget.stage(stage), request_lane(lane):
+                    updated += await self._scan_whitelist_multi_bases(bases, assets)
+            finally:
+                # Reprogramar con el resultado (intervalo máximo si no hubo dato)
+                fresh = {}
+                for _, entry in self.radar_data_cache.items(since=scan_started):
+                    if entry.get('destination') in assets:
+                        fresh[entry['destination']] = entry
+                for asset in assets:
+                    entry = fresh.get(asset)
+                    if entry is not None:
+                        # Heat real del radar; el proxy del escaneo multi-bases solo si falta
+                        heat = self.radar_data_cache.get_value(asset, 'heat_score')
+                        if heat is None:
+                            heat = entry.get('heat_score')
+                        scheduler.observe(asset, heat, entry.get('current_price'),
+                                          entry.get('price_change_24h'))
+                    else:
+                        scheduler.observe(asset, None)
+        if wide:
+            try:
+                with self.tick_budget.stage('scan_wide'), request_lane(LANE_SCAN):
+                    updated += await self._evaluate_wide_assets(wide)
+            finally:
+                for asset in wide:
+                    if asset in self.radar_data_cache:
+                        scheduler.observe(asset, self.radar_data_cache.get_value(asset, 'heat_score'),
+                                          self.radar_data_cache.get_value(asset, 'current_price'))
+                    else:
+                        scheduler.observe(asset, None)
+        logger.debug(
+            f"📅 Planificador de escaneo: {len(hot)} urgentes, {len(background)} normales, {len(wide)} amplios, "
+            f"{scheduler.get_stats()}, pares: {self.scan_metrics}"
+        )
+        return updated
+
     async def _save_active_trades(self, open_trades: List[Dict[str, Any]]):
         """
         Guarda los trades activos en shared/active_trades.json para recuperación tras reinicio.
@@ -6809,7 +7115,7 @@ Thumbs.db
             balances_data = {'total': {}}
             try:
                 if self.exchange:
-                    balances = self.exchange.fetch_balance()
+                    balances = await self.aexchange.fetch_balance()
                     if balances and 'total' in balances:
                         balances_data = {'total': balances['total']}
             except Exception as e:
@@ -6830,8 +7136,8 @@ Thumbs.db
             # 1. PRIORIDAD: Usar cache del radar (datos recién calculados)
             cached_pairs = {}
             if hasattr(self, 'radar_data_cache') and self.radar_data_cache:
-                for key, entry in self.radar_data_cache.items():
-                    if isinstance(entry, dict) and 'destination' in entry:
+                for entry in self.radar_data_cache.rows():
+                    if 'destination' in entry:
                         cached_pairs[entry['destination']] = entry
                         radar_data.append(entry)
                 logger.info(f"🔄 Cache del radar: {len(cached_pairs)} pares cargados")
@@ -6852,9 +7158,11 @@ Thumbs.db
                 logger.debug(f"No se pudieron recuperar datos de SQLite: {db_error}")
             
             # 3. LLENAR HUECOS: Crear entradas por defecto solo para activos faltantes
+            # (baja prioridad: se omite si el tick de vigilancia va tarde)
             covered_destinations = set(cached_pairs.keys())
             missing_count = 0
-            for whitelist_asset in whitelist:
+            fill_placeholders = self.tick_budget.should_run('radar_placeholders')
+            for whitelist_asset in (whitelist if fill_placeholders else []):
                 # Saltar FIAT y BNB
                 if whitelist_asset in ['EUR', 'USDC', 'BNB']:
                     continue
@@ -6897,6 +7205,8 @@ Thumbs.db
             
             if missing_count > 0:
                 logger.info(f"🔧 Placeholders creados: {missing_count} activos sin datos")
+            elif not fill_placeholders:
+                logger.debug("⏱️ Placeholders omitidos: tick de vigilancia fuera de plazo")
             logger.info(f"✅ Radar generado: {len(radar_data)} pares (cache: {len(cached_pairs)}, placeholders: {missing_count})")
             
             # PERSISTIR EN SQLITE (usando save_market_data)
@@ -6974,13 +7284,16 @@ Thumbs.db
             except Exception as vig_err:
                 logger.debug(f"No se pudo actualizar vigilancia: {vig_err}")
             
-            # 5. Inventario Dinámico
-            dynamic_inventory = []
-            try:
-                dynamic_inventory = await self._get_dynamic_inventory()
-                logger.debug(f"Inventario dinámico: {len(dynamic_inventory)} activos")
-            except Exception as e:
-                logger.debug(f"Error al obtener inventario dinámico: {e}")
+            # 5. Inventario Dinámico (baja prioridad: si el tick va tarde se reutiliza el último)
+            dynamic_inventory = self._last_dynamic_inventory
+            if self.tick_budget.should_run('inventory_rebuild'):
+                try:
+                    with self.tick_budget.stage('inventory_rebuild'):
+                        dynamic_inventory = await self._get_dynamic_inventory()
+                    self._last_dynamic_inventory = dynamic_inventory
+                    logger.debug(f"Inventario dinámico: {len(dynamic_inventory)} activos")
+                except Exception as e:
+                    logger.debug(f"Error al obtener inventario dinámico: {e}")
             
             # 6. Valor total del portfolio
             total_portfolio_value = 0.0
@@ -6988,7 +7301,7 @@ Thumbs.db
                 if hasattr(self, 'total_portfolio_value') and self.total_portfolio_value > 0:
                     total_portfolio_value = self.total_portfolio_value
                 else:
-                    total_portfolio_value = self.vault.calculate_total_portfolio_value()
+                    total_portfolio_value = self._total_portfolio_value()
                     if total_portfolio_value is None or total_portfolio_value < 0:
                         total_portfolio_value = 0.0
             except Exception as e:
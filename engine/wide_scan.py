@@ -0,0 +1,186 @@
+"""
+Escáner amplio: criba de todo el mercado spot a partir del snapshot de tickers.
+
+Evaluar un activo con velas e indicadores es caro, por eso el radar solo cubre
+la whitelist. En modo amplio (opt-in, sección `wide_scan` de strategy.json) se
+recorren todos los pares spot activos con filtros baratos sobre el snapshot de
+tickers que el router ya descarga con un único fetch_tickers:
+
+- quote del par en `quotes` (volúmenes comparables entre sí)
+- volumen 24h en quote >= `min_quote_volume`
+- spread bid/ask <= `max_spread_pct`
+- variación 24h dentro de [`min_change_pct`, `max_change_pct`]
+
+Solo los `promote_top` mejores candidatos se promocionan a la evaluación
+completa (velas + indicadores + heat_score). Un activo promocionado se mantiene
+`promotion_ttl` segundos desde la última criba que superó, para no entrar y
+salir del radar en cada tick. La criba no añade llamadas al exchange.
+"""
+import math
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_QUOTES = ('USDT', 'USDC', 'EUR')
+DEFAULT_MIN_QUOTE_VOLUME = 500000.0
+DEFAULT_MAX_SPREAD_PCT = 0.3
+DEFAULT_MIN_CHANGE_PCT = 2.0
+DEFAULT_MAX_CHANGE_PCT = 40.0
+DEFAULT_PROMOTE_TOP = 20
+DEFAULT_PROMOTION_TTL = 900.0
+DEFAULT_SCREEN_INTERVAL = 30.0
+# Tokens apalancados de Binance (no son activos spot reales)
+DEFAULT_EXCLUDE_SUFFIXES = ('UP', 'DOWN', 'BULL', 'BEAR')
+# Peso del volumen (log10 sobre el mínimo) frente a la variación 24h en la puntuación
+VOLUME_WEIGHT = 2.0
+
+
+class WideScanner:
+    """Criba el snapshot de tickers y decide qué activos fuera de la whitelist se evalúan."""
+
+    def __init__(self, enabled: bool = False, quotes: Iterable[str] = DEFAULT_QUOTES,
+                 min_quote_volume: float = DEFAULT_MIN_QUOTE_VOLUME,
+                 max_spread_pct: float = DEFAULT_MAX_SPREAD_PCT,
+                 min_change_pct: float = DEFAULT_MIN_CHANGE_PCT,
+                 max_change_pct: float = DEFAULT_MAX_CHANGE_PCT,
+                 promote_top: int = DEFAULT_PROMOTE_TOP,
+                 promotion_ttl: float = DEFAULT_PROMOTION_TTL,
+                 screen_interval: float = DEFAULT_SCREEN_INTERVAL,
+                 exclude_suffixes: Iterable[str] = DEFAULT_EXCLUDE_SUFFIXES):
+        """
+        Args:
+            enabled: Activa el modo amplio
+            quotes: Monedas quote cuyos pares se criban
+            min_quote_volume: Volumen 24h mínimo (en quote)
+            max_spread_pct: Spread bid/ask máximo en %
+            min_change_pct: Variación 24h mínima en %
+            max_change_pct: Variación 24h máxima en % (descarta pumps extremos)
+            promote_top: Activos promocionados como máximo
+            promotion_ttl: Segundos que un activo sigue promocionado sin superar la criba
+            screen_interval: Segundos mínimos entre cribas
+            exclude_suffixes: Sufijos de activos que nunca se promocionan
+        """
+        self.enabled = bool(enabled)
+        self.quotes = tuple(quotes)
+        self.min_quote_volume = float(min_quote_volume)
+        self.max_spread_pct = float(max_spread_pct)
+        self.min_change_pct = float(min_change_pct)
+        self.max_change_pct = float(max_change_pct)
+        self.promote_top = max(0, int(promote_top))
+        self.promotion_ttl = float(promotion_ttl)
+        self.screen_interval = float(screen_interval)
+        self.exclude_suffixes = tuple(exclude_suffixes)
+        # activo -> (puntuación, par, instante de la última criba superada)
+        self._promoted: Dict[str, Tuple[float, str, float]] = {}
+        self._last_screen = 0.0
+        self._last_version: Optional[int] = None
+        self._lock = threading.Lock()
+        self.stats = {'screens': 0, 'pairs_screened': 0, 'passed': 0, 'promoted': 0}
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]] = None) -> 'WideScanner':
+        """Crea el escáner desde la sección `wide_scan` de strategy.json."""
+        config = config or {}
+        return cls(
+            enabled=config.get("enabled", False),
+            quotes=config.get("quotes", DEFAULT_QUOTES),
+            min_quote_volume=config.get("min_quote_volume", DEFAULT_MIN_QUOTE_VOLUME),
+            max_spread_pct=config.get("max_spread_pct", DEFAULT_MAX_SPREAD_PCT),
+            min_change_pct=config.get("min_change_pct", DEFAULT_MIN_CHANGE_PCT),
+            max_change_pct=config.get("max_change_pct", DEFAULT_MAX_CHANGE_PCT),
+            promote_top=config.get("promote_top", DEFAULT_PROMOTE_TOP),
+            promotion_ttl=config.get("promotion_ttl", DEFAULT_PROMOTION_TTL),
+            screen_interval=config.get("screen_interval", DEFAULT_SCREEN_INTERVAL),
+            exclude_suffixes=config.get("exclude_suffixes", DEFAULT_EXCLUDE_SUFFIXES)
+        )
+
+    def _score(self, ticker: Dict[str, Any]) -> Optional[float]:
+        """Puntuación de un ticker o None si no supera los filtros."""
+        volume = ticker.get('quoteVolume') or 0.0
+        if volume < self.min_quote_volume:
+            return None
+        bid, ask = ticker.get('bid'), ticker.get('ask')
+        if not bid or not ask or ask < bid:
+            return None
+        spread_pct = (ask - bid) / ((ask + bid) / 2) * 100
+        if spread_pct > self.max_spread_pct:
+            return None
+        change = ticker.get('percentage')
+        if change is None:
+            last, open_price = ticker.get('last'), ticker.get('open')
+            if not last or not open_price:
+                return None
+            change = (last - open_price) / open_price * 100
+        if not self.min_change_pct <= change <= self.max_change_pct:
+            return None
+        return change + VOLUME_WEIGHT * math.log10(volume / max(self.min_quote_volume, 1.0))
+
+    def due(self, snapshot_version: Optional[int] = None, now: Optional[float] = None) -> bool:
+        """True si toca cribar (intervalo vencido y snapshot nuevo)."""
+        now = time.time() if now is None else now
+        if not self.enabled or now - self._last_screen < self.screen_interval:
+            return False
+        return snapshot_version is None or snapshot_version != self._last_version
+
+    def screen(self, tickers: Dict[str, Dict[str, Any]], spot_pairs: Dict[str, Tuple[str, str]],
+               exclude: Iterable[str] = (), snapshot_version: Optional[int] = None) -> List[str]:
+        """
+        Criba todos los pares spot y actualiza los activos promocionados.
+
+        Args:
+            tickers: Snapshot de tickers {símbolo: ticker}
+            spot_pairs: Pares spot indexados {par: (base, quote)}
+            exclude: Activos que no se promocionan (whitelist, fiat, BNB)
+            snapshot_version: Versión del snapshot cribado
+
+        Returns:
+            Activos promocionados tras la criba (mejor puntuación primero)
+        """
+        now = time.time()
+        exclude = set(exclude)
+        best: Dict[str, Tuple[float, str]] = {}
+        screened = 0
+        for pair, (base, quote) in spot_pairs.items():
+            if quote not in self.quotes or base in exclude or base in self.quotes:
+                continue
+            if self.exclude_suffixes and base.endswith(self.exclude_suffixes):
+                continue
+            ticker = tickers.get(pair)
+            if not ticker:
+                continue
+            screened += 1
+            score = self._score(ticker)
+            if score is not None and (base not in best or score > best[base][0]):
+                best[base] = (score, pair)
+
+        ranked = sorted(best.items(), key=lambda item: item[1][0], reverse=True)[:self.promote_top]
+        with self._lock:
+            for asset, (score, pair) in ranked:
+                if asset not in self._promoted:
+                    self.stats['promoted'] += 1
+                self._promoted[asset] = (score, pair, now)
+            # Caducar los que llevan demasiado sin superar la criba
+            for asset in [a for a, (_, _, seen) in self._promoted.items()
+                          if now - seen > self.promotion_ttl or a in exclude]:
+                del self._promoted[asset]
+            self._last_screen = now
+            self._last_version = snapshot_version
+            self.stats['screens'] += 1
+            self.stats['pairs_screened'] += screened
+            self.stats['passed'] += len(best)
+        return self.promoted()
+
+    def promoted(self) -> List[str]:
+        """Activos promocionados (mejor puntuación primero)."""
+        with self._lock:
+            return [asset for asset, _ in sorted(self._promoted.items(), key=lambda item: item[1][0], reverse=True)]
+
+    def pair_for(self, asset: str) -> Optional[str]:
+        """Par con el que el activo superó la criba."""
+        entry = self._promoted.get(asset)
+        return entry[1] if entry else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores y activos promocionados."""
+        with self._lock:
+            return {**self.stats, 'enabled': self.enabled, 'active': len(self._promoted)}
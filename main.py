@@ -9,6 +9,7 @@ import sys
 import time
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
 # Agregar el directorio raíz al path para importar módulos existentes
 # main.py está en botCeibe/, así que el ROOT_DIR es el directorio actual (botCeibe)
@@ -76,8 +77,254 @@ async def run_bot_cycle(engine: TradingEngine, update_shared_state: bool = True)
         return False
 
 
+# Intervalos (en ticks de scan_interval) y timeouts (s) por defecto de cada tarea
+DEFAULT_TASK_CADENCES = {
+    'monitor': {'ticks': 1, 'timeout': None},
+    'opportunities': {'ticks': 1, 'timeout': None},
+    'shared_state': {'ticks': 1, 'timeout': 20.0},
+    'radar_scan': {'ticks': 1, 'timeout': 20.0},
+    'portfolio_snapshot': {'ticks': None, 'timeout': 60.0}
+}
+
+# Tareas que ejecutan órdenes: nunca se cancelan por timeout. Cancelar mientras se
+# espera una orden no la anula en el exchange y dejaría sin actualizar la BD/slot
+# (o un swap de dos patas a medias); sus lecturas ya tienen el timeout del adaptador.
+TRADING_TASKS = ('monitor', 'opportunities')
+
+
+def _has_active_trades(engine: TradingEngine) -> bool:
+    """True si algún slot tiene un trade activo."""
+    max_slots = engine.strategy.get("trading", {}).get("max_slots", 4)
+    try:
+        for slot_id in range(max_slots):
+            if engine.db.get_active_trade(slot_id):
+                return True
+    except Exception:
+        pass
+    return False
+
+
+def _save_portfolio_snapshot(engine: TradingEngine):
+    """Guarda el valor total y el efectivo libre del portfolio (síncrono)."""
+    # Un solo fetch_balance() para el valor total y el efectivo libre
+    with engine.exchange.tick():
+        total_value = engine.vault.calculate_total_portfolio_value()
+        
+        # Calcular efectivo libre (EUR + USDC) EXCLUYENDO el treasury
+        balances = engine.exchange.fetch_balance()
+    free_cash_eur = 0.0
+    for fiat in ['EUR', 'USDC']:
+        free_balance = balances.get(fiat, {}).get('free', 0)
+        if fiat == 'EUR':
+            free_cash_eur += free_balance
+        else:
+            free_cash_eur += engine.vault.get_asset_value('USDC', free_balance, 'EUR')
+    
+    # Excluir el treasury del free_cash disponible
+    treasury_total = engine.db.get_total_treasury()
+    treasury_eur = treasury_total.get('total_eur', 0.0)
+    free_cash_eur = max(0.0, free_cash_eur - treasury_eur)
+    
+    # Guardar snapshot
+    engine.db.save_portfolio_snapshot(total_value, free_cash_eur)
+    logger.info(
+        f"Snapshot del portfolio guardado: "
+        f"Total: {total_value:.2f} EUR, "
+        f"Efectivo libre: {free_cash_eur:.2f} EUR"
+    )
+
+
+async def _run_periodic(engine: TradingEngine, name: str, job, interval, timeout: Optional[float]):
+    """
+    Ejecuta `job` periódicamente mientras el motor esté activo.
+    
+    Cada ejecución tiene su propio timeout; los errores se registran y la tarea
+    continúa, de modo que una tarea lenta o fallida no retrasa a las demás.
+    
+    Args:
+        name: Nombre de la tarea (logs)
+        job: Función async sin argumentos
+        interval: Segundos entre inicios de ejecución, o función que los devuelve
+        timeout: Timeout por ejecución en segundos (None = sin timeout; siempre
+                 None para las tareas de TRADING_TASKS)
+    """
+    if name in TRADING_TASKS and timeout is not None:
+        logger.warning(f"Tarea {name} ejecuta órdenes: se ignora su timeout ({timeout}s)")
+        timeout = None
+    while engine.running:
+        start_time = time.monotonic()
+        try:
+            if timeout is None:
+                await job()
+            else:
+                await asyncio.wait_for(job(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.debug(f"⚠️ Timeout en tarea {name} (>{timeout:.0f}s)")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error en tarea {name}: {e}", exc_info=True)
+        
+        period = interval() if callable(interval) else interval
+        elapsed = time.monotonic() - start_time
+        await asyncio.sleep(max(0.0, period - elapsed))
+
+
+async def run_engine(engine: TradingEngine):
+    """
+    Bucle principal asíncrono: cada responsabilidad es una tarea supervisada con
+    su propio intervalo y timeout.
+    
+    - monitor: vigilancia de trades activos (stop-loss, gas) cada scan_interval
+    - opportunities: búsqueda de nuevas entradas (menos frecuente con trades activos)
+    - shared_state: shared/state.json para el dashboard
+    - radar_scan: escaneo de los activos de la whitelist cuyo turno ha vencido
+    - portfolio_snapshot: histórico del valor del portfolio
+    
+    Un escaneo frío lento nunca retrasa la evaluación de stop-loss.
+    """
+    # Recuperar trades activos desde persistencia
+    logger.info("Recuperando trades activos desde persistencia...")
+    await engine._recover_active_trades()
+    
+    # Detectar posiciones existentes
+    logger.info("Detectando posiciones existentes en la wallet...")
+    await engine._detect_existing_positions()
+    
+    # Pequeña pausa de 2s antes de iniciar comprobaciones de tesorería
+    await asyncio.sleep(2)
+    
+    # Verificar y gestionar BNB para comisiones
+    logger.info("⛽ Verificando balance de BNB para comisiones...")
+    bnb_status = await engine.aexchange.run(engine.vault.check_and_refill_bnb, use_default_timeout=False)
+    if bnb_status.get('status') == 'needs_refill':
+        logger.info(f"📋 BNB marcado para recarga: {bnb_status.get('bnb_percent', 0):.2f}% (objetivo: 3-5%)")
+    elif bnb_status.get('status') == 'emergency_refilled':
+        logger.info(f"✅ BNB recargado en emergencia: {bnb_status.get('amount_bought', 0):.8f} BNB")
+
+    # Pausa adicional de 2s antes de iniciar API/Dashboard para repartir carga de inicio
+    await asyncio.sleep(2)
+    
+    # Obtener intervalos desde strategy.json
+    scan_interval = engine.strategy.get("scan_interval", 5)
+    shared_state_update_interval = engine.strategy.get("shared_state_update_interval", 12)
+    snapshot_interval = engine.strategy.get("portfolio_snapshot_interval", 1800)
+    # Con trades activos, el escaneo completo de oportunidades va cada N ticks de vigilancia
+    scan_opportunities_interval = 10
+    
+    cadences = {name: dict(values) for name, values in DEFAULT_TASK_CADENCES.items()}
+    for name, values in (engine.strategy.get("task_cadences") or {}).items():
+        if name in cadences and isinstance(values, dict):
+            cadences[name].update(values)
+    
+    def every(name: str, default_ticks: int = 1) -> float:
+        ticks = cadences[name].get('ticks') or default_ticks
+        return scan_interval * ticks
+    
+    logger.info(f"Intervalo de escaneo: {scan_interval}s")
+    logger.info(f"Actualización de estado compartido: cada {shared_state_update_interval} ticks")
+    logger.info("Motor de trading iniciado. Presiona Ctrl+C para detener.")
+    
+    engine.running = True
+    await engine.start_radar_dynamic_updates()
+    
+    tick_count = 0
+    
+    async def monitor_job():
+        nonlocal tick_count
+        tick_count += 1
+        # Vigilancia rápida: portfolio, gas y trades activos (stop-loss)
+        # El tick mide su presupuesto: si va tarde se degradan las etapas de baja prioridad
+        engine.tick_budget.begin_tick()
+        try:
+            await engine.run_bot_cycle(monitor_only=True)
+        finally:
+            record = engine.tick_budget.end_tick()
+        shed = f", descartado: {', '.join(record['shed'])}" if record['shed'] else ""
+        logger.debug(f"Tick #{tick_count} completado (tiempo: {record['elapsed']:.2f}s{shed})")
+        # Log de acción al final de cada ciclo
+        print(f"Tick completado: {datetime.now()}")
+    
+    def opportunities_interval() -> float:
+        # ⚡ FAST TRACK: con trades activos el escaneo completo va cada N ticks
+        if _has_active_trades(engine):
+            return every('opportunities') * scan_opportunities_interval
+        return every('opportunities')
+    
+    async def opportunities_job():
+        with engine.exchange.tick():
+            # Balance y valoración fuera del event loop; el resto del tick lee la cache
+            await engine._refresh_portfolio_snapshot()
+            await engine.scan_new_opportunities()
+    
+    def shared_state_interval() -> float:
+        # Con trades activos cada tick; sin trades, cada N ticks para ahorrar recursos
+        if _has_active_trades(engine):
+            return every('shared_state')
+        return every('shared_state') * shared_state_update_interval
+    
+    async def shared_state_job():
+        await engine._save_shared_state()
+    
+    async def radar_scan_job():
+        # Cada activo tiene su propio próximo escaneo (engine.scan_scheduler)
+        await engine._scan_due_assets(['USDT', 'BTC', 'ETH'])
+    
+    async def snapshot_job():
+        await engine.aexchange.run(_save_portfolio_snapshot, engine, use_default_timeout=False)
+    
+    specs = {
+        'monitor': (monitor_job, every('monitor')),
+        'opportunities': (opportunities_job, opportunities_interval),
+        'shared_state': (shared_state_job, shared_state_interval),
+        'radar_scan': (radar_scan_job, every('radar_scan')),
+        'portfolio_snapshot': (snapshot_job, cadences['portfolio_snapshot'].get('ticks') and every('portfolio_snapshot') or snapshot_interval)
+    }
+    
+    def start_task(name: str) -> asyncio.Task:
+        job, interval = specs[name]
+        return asyncio.create_task(
+            _run_periodic(engine, name, job, interval, cadences[name]['timeout']),
+            name=name
+        )
+    
+    # El snapshot del portfolio no se ejecuta al arrancar: primera ejecución tras su intervalo
+    async def delayed_snapshot_start():
+        await asyncio.sleep(specs['portfolio_snapshot'][1])
+        await _run_periodic(engine, 'portfolio_snapshot', snapshot_job,
+                            specs['portfolio_snapshot'][1], cadences['portfolio_snapshot']['timeout'])
+    
+    tasks = {name: start_task(name) for name in specs if name != 'portfolio_snapshot'}
+    tasks['portfolio_snapshot'] = asyncio.create_task(delayed_snapshot_start(), name='portfolio_snapshot')
+    
+    try:
+        # Supervisión: reiniciar cualquier tarea que termine inesperadamente
+        while engine.running:
+            done, _ = await asyncio.wait(list(tasks.values()), timeout=1.0, return_when=asyncio.FIRST_COMPLETED)
+            if not engine.running:
+                break
+            for task in done:
+                name = task.get_name()
+                if task.cancelled():
+                    error = "cancelada"
+                else:
+                    error = task.exception() or "finalizada"
+                logger.error(f"Tarea {name} terminó inesperadamente ({error}); reiniciando")
+                tasks[name] = start_task(name)
+    finally:
+        engine.running = False
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        try:
+            await engine.stop_radar_dynamic_updates()
+        except Exception:
+            pass
+        engine.aexchange.shutdown()
+
+
 def main():
-    """Función principal con bucle infinito."""
+    """Función principal: arranca el motor y su bucle asíncrono."""
     try:
         logger.info("=" * 60)
         logger.info("Iniciando botCeibe")
@@ -91,267 +338,13 @@ def main():
         logger.info("Creando estado inicial...")
         engine._create_initial_shared_state()
         
-        # Recuperar trades activos desde persistencia
-        logger.info("Recuperando trades activos desde persistencia...")
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(engine._recover_active_trades())
-        
-        # Detectar posiciones existentes
-        logger.info("Detectando posiciones existentes en la wallet...")
-        loop.run_until_complete(engine._detect_existing_positions())
-        
-        # NOTA: El radar dinámico se inicializará en el primer tick del loop principal
-        # para evitar bloquear el arranque del motor
-        logger.info("Radar dinámico se inicializará en el primer tick...")
-        # Pequeña pausa de 2s antes de iniciar comprobaciones de tesorería
-        time.sleep(2)
-        
-        # Verificar y gestionar BNB para comisiones
-        logger.info("⛽ Verificando balance de BNB para comisiones...")
-        bnb_status = engine.vault.check_and_refill_bnb()
-        if bnb_status.get('status') == 'needs_refill':
-            logger.info(f"📋 BNB marcado para recarga: {bnb_status.get('bnb_percent', 0):.2f}% (objetivo: 3-5%)")
-        elif bnb_status.get('status') == 'emergency_refilled':
-            logger.info(f"✅ BNB recargado en emergencia: {bnb_status.get('amount_bought', 0):.8f} BNB")
-
-        # Pausa adicional de 2s antes de iniciar API/Dashboard para repartir carga de inicio
-        time.sleep(2)
-        
-        # Obtener intervalo de escaneo desde strategy.json
-        scan_interval = engine.strategy.get("scan_interval", 5)
-        shared_state_update_interval = engine.strategy.get("shared_state_update_interval", 12)
-        
-        logger.info(f"Intervalo de escaneo: {scan_interval}s")
-        logger.info(f"Actualización de estado compartido: cada {shared_state_update_interval} ticks")
-        logger.info("Motor de trading iniciado. Presiona Ctrl+C para detener.")
-        
-        # Bucle infinito principal
-        tick_count = 0
-        engine.running = True
-        radar_initialized = False  # Flag para inicializar radar en primer tick
-        
-        # Contador para snapshots del portfolio
-        snapshot_interval = engine.strategy.get("portfolio_snapshot_interval", 1800)
-        last_snapshot_time = time.time()
-        
-        # Contador para escaneo completo de oportunidades (cada 10 ticks de vigilancia)
-        scan_opportunities_interval = 10
-        last_full_scan_tick = 0
-        
-        # Contador para escaneo completo de whitelist (cada 10 ticks = 50 segundos)
-        whitelist_scan_interval = 10
-        last_whitelist_scan_tick = 0
-        
-        # Usar el loop ya creado
-        
-        while engine.running:
-            try:
-                tick_count += 1
-                start_time = time.time()
-                
-                # 🔄 INICIALIZAR RADAR EN PRIMER TICK (para no bloquear el startup)
-                if not radar_initialized:
-                    logger.info("Inicializando radar dinámico en primer tick...")
-                    try:
-                        loop.run_until_complete(engine.start_radar_dynamic_updates())
-                        radar_initialized = True
-                        logger.info("✅ Radar dinámico inicializado")
-                    except Exception as radar_error:
-                        logger.error(f"Error inicializando radar: {radar_error}", exc_info=True)
-                        radar_initialized = True  # Marcar como inicializado para no reintentar
-                
-                # 🔄 PRIORIDAD DE VIGILANCIA: Verificar trades activos primero
-                max_slots = engine.strategy.get("trading", {}).get("max_slots", 4)
-                has_active_trades = False
-                try:
-                    for slot_id in range(max_slots):
-                        if engine.db.get_active_trade(slot_id):
-                            has_active_trades = True
-                            break
-                except:
-                    pass
-                
-                # ⚡ FAST TRACK: Si hay trades activos, solo vigilancia (rápido, cada 5s)
-                # Escaneo completo solo cada N ticks para no bloquear
-                monitor_only = has_active_trades and (tick_count - last_full_scan_tick) < scan_opportunities_interval
-                
-                # Si hay trades activos, actualizar shared_state cada tick (cada 5s)
-                # Si no hay trades, actualizar cada N ticks para ahorrar recursos
-                if has_active_trades:
-                    update_shared_state = True  # Actualizar cada 5 segundos cuando hay trades activos
-                else:
-                    # Sin trades activos, actualizar cada N ticks para ahorrar recursos
-                    update_shared_state = (tick_count == 1) or (tick_count % shared_state_update_interval == 0)
-                
-                # Determinar si hacer escaneo completo
-                do_full_scan = not monitor_only
-                if do_full_scan:
-                    last_full_scan_tick = tick_count
-                
-                if update_shared_state:
-                    scan_type = "Vigilancia + Escaneo" if do_full_scan else "Vigilancia rápida"
-                    logger.info(f"--- Tick #{tick_count} iniciado ({scan_type}, actualización estado: SÍ) ---")
-                else:
-                    logger.debug(f"--- Tick #{tick_count} iniciado (sin actualización estado) ---")
-                
-                # Ejecutar ciclo del bot (vigilancia rápida o completo)
-                if do_full_scan:
-                    # Escaneo completo: monitoreo + búsqueda de oportunidades
-                    loop.run_until_complete(engine.run_bot_cycle(monitor_only=False))
-                else:
-                    # Solo vigilancia rápida
-                    loop.run_until_complete(engine.run_bot_cycle(monitor_only=True))
-                
-                # Guardar estado compartido si es necesario
-                if update_shared_state:
-                    try:
-                        loop.run_until_complete(engine._save_shared_state())
-                    except Exception as state_error:
-                        logger.error(f"Error al guardar estado compartido: {state_error}", exc_info=True)
-                
-                # SISTEMA DE ESCANEO EN CASCADA (3 niveles de prioridad)
-                # Nivel 1 (HOT - Top 10): cada tick (cada 5s)
-                # Nivel 2 (WARM - Pos 11-20): cada 3 ticks (~15s)
-                # Nivel 3 (COLD - Resto): cada 10 ticks (~50s)
-                try:
-                    # Clasificar whitelist en 3 niveles según heat_score actual
-                    levels = loop.run_until_complete(engine._classify_whitelist_by_heat())
-                    
-                    hot_assets = levels.get('hot', [])
-                    warm_assets = levels.get('warm', [])
-                    cold_assets = levels.get('cold', [])
-                    
-                    # Nivel 1: HOT - escanear SIEMPRE (incluye Riesgo BTC)
-                    if hot_assets:
-                        try:
-                            logger.debug(f"🔥 Escaneando Nivel 1 (HOT): {len(hot_assets)} activos")
-                            loop.run_until_complete(
-                                asyncio.wait_for(
-                                    engine._scan_whitelist_multi_bases(['USDT','BTC','ETH'], hot_assets),
-                                    timeout=15.0
-                                )
-                            )
-                        except asyncio.TimeoutError:
-                            logger.debug("⚠️ Timeout en escaneo HOT (>15s)")
-                        except Exception as e:
-                            logger.debug(f"⚠️ Error en escaneo HOT: {e}")
-                    
-                    # Nivel 2: WARM - escanear cada 3 ticks
-                    if warm_assets and (tick_count % 3 == 0):
-                        try:
-                            logger.debug(f"🌡️  Escaneando Nivel 2 (WARM): {len(warm_assets)} activos")
-                            loop.run_until_complete(
-                                asyncio.wait_for(
-                                    engine._scan_whitelist_multi_bases(['USDT','BTC','ETH'], warm_assets),
-                                    timeout=12.0
-                                )
-                            )
-                        except asyncio.TimeoutError:
-                            logger.debug("⚠️ Timeout en escaneo WARM (>12s)")
-                        except Exception as e:
-                            logger.debug(f"⚠️ Error en escaneo WARM: {e}")
-                    
-                    # Nivel 3: COLD - escanear cada 10 ticks
-                    if cold_assets and (tick_count % 10 == 0):
-                        try:
-                            logger.debug(f"❄️  Escaneando Nivel 3 (COLD): {len(cold_assets)} activos")
-                            loop.run_until_complete(
-                                asyncio.wait_for(
-                                    engine._scan_whitelist_multi_bases(['USDT','BTC','ETH'], cold_assets),
-                                    timeout=20.0
-                                )
-                            )
-                        except asyncio.TimeoutError:
-                            logger.debug("⚠️ Timeout en escaneo COLD (>20s)")
-                        except Exception as e:
-                            logger.debug(f"⚠️ Error en escaneo COLD: {e}")
-                    
-                    logger.debug(f"✅ Escaneo cascada completado (Tick #{tick_count})")
-                    
-                except Exception as cascade_error:
-                    logger.warning(f"⚠️ Error en escaneo cascada: {cascade_error}")
-                
-                elapsed_time = time.time() - start_time
-                
-                if update_shared_state:
-                    scan_type = "Vigilancia + Escaneo" if do_full_scan else "Vigilancia rápida"
-                    logger.info(f"✅ Tick #{tick_count} completado ({scan_type}, tiempo: {elapsed_time:.2f}s)")
-                else:
-                    logger.debug(f"Tick #{tick_count} completado (tiempo: {elapsed_time:.2f}s)")
-                
-                # Guardar snapshot del portfolio cada N segundos (configurable)
-                current_time = time.time()
-                if current_time - last_snapshot_time >= snapshot_interval:
-                    try:
-                        total_value = engine.vault.calculate_total_portfolio_value()
-                        
-                        # Calcular efectivo libre (EUR + USDC) EXCLUYENDO el treasury
-                        balances = engine.exchange.fetch_balance()
-                        free_cash_eur = 0.0
-                        for fiat in ['EUR', 'USDC']:
-                            free_balance = balances.get(fiat, {}).get('free', 0)
-                            if fiat == 'EUR':
-                                free_cash_eur += free_balance
-                            else:
-                                free_cash_eur += engine.vault.get_asset_value('USDC', free_balance, 'EUR')
-                        
-                        # Excluir el treasury del free_cash disponible
-                        treasury_total = engine.db.get_total_treasury()
-                        treasury_eur = treasury_total.get('total_eur', 0.0)
-                        free_cash_eur = max(0.0, free_cash_eur - treasury_eur)
-                        
-                        # Guardar snapshot
-                        engine.db.save_portfolio_snapshot(total_value, free_cash_eur)
-                        logger.info(
-                            f"Snapshot del portfolio guardado: "
-                            f"Total: {total_value:.2f} EUR, "
-                            f"Efectivo libre: {free_cash_eur:.2f} EUR"
-                        )
-                        last_snapshot_time = current_time
-                    except Exception as e:
-                        logger.error(f"Error al guardar snapshot del portfolio: {e}")
-                
-                # Log de acción al final de cada ciclo
-                print(f"Tick completado: {datetime.now()}")
-                
-                # Calcular tiempo de espera restante para mantener intervalo
-                remaining_time = max(0, scan_interval - elapsed_time)
-                if remaining_time > 0:
-                    time.sleep(remaining_time)
-                
-            except KeyboardInterrupt:
-                logger.info("\nDeteniendo bot...")
-                engine.running = False
-                break
-            except Exception as e:
-                logger.error(f"Error en bucle principal: {e}", exc_info=True)
-                # Continuar el bucle incluso si hay errores
-                print(f"Tick completado (con error): {datetime.now()}")
-                time.sleep(scan_interval)
-        
-        # Detener radar dinámico si no se detuvo antes
-        try:
-            if engine.running:
-                engine.running = False
-                loop.run_until_complete(engine.stop_radar_dynamic_updates())
-        except:
-            pass
-        
-        # Cerrar loop
-        loop.close()
+        asyncio.run(run_engine(engine))
         logger.info("Bot detenido correctamente.")
         
     except KeyboardInterrupt:
         logger.info("\nDeteniendo bot...")
         if 'engine' in locals():
             engine.running = False
-            # Detener radar dinámico
-            try:
-                loop = asyncio.get_event_loop()
-                loop.run_until_complete(engine.stop_radar_dynamic_updates())
-            except:
-                pass
         logger.info("Bot detenido correctamente.")
     except Exception as e:
         logger.error(f"Error fatal en el bot: {e}", exc_info=True)
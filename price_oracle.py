@@ -0,0 +1,159 @@
+"""
+Oráculo de precios basado en un grafo de conversión.
+Construye, a partir de un único snapshot de tickers del router, el grafo de todos
+los pares spot y calcula con un BFS (mínimo número de saltos) el precio de cada
+activo en la moneda objetivo (EUR, BTC, USDT...). Los precios se reutilizan
+mientras no cambie la versión del snapshot.
+"""
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+
+from router import get_ticker_snapshot, get_spot_pairs
+
+logger = logging.getLogger(__name__)
+
+# Moneda en la que se comparan los volúmenes de pares con distinta quote
+VOLUME_REFERENCE = 'USDT'
+
+
+def _ticker_price(ticker: Dict[str, Any]) -> Optional[float]:
+    """Precio de un ticker: último precio o, si falta, punto medio bid/ask."""
+    price = ticker.get('last')
+    if price:
+        return float(price)
+    bid, ask = ticker.get('bid'), ticker.get('ask')
+    if bid and ask:
+        return (float(bid) + float(ask)) / 2
+    return None
+
+
+class PriceOracle:
+    """Precios de todos los activos en una moneda objetivo desde un snapshot de tickers."""
+
+    def __init__(self):
+        # Grafo: activo -> lista de (vecino, tasa) donde 1 activo = tasa vecino
+        self._graph: Dict[str, List[Tuple[str, float]]] = {}
+        self._graph_version: Optional[int] = None
+        # Moneda objetivo -> {activo: precio}
+        self._prices: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _build_graph(self, tickers: Dict[str, Dict[str, Any]]) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        Construye el grafo de conversión con los pares spot que tienen precio.
+        Los vecinos se ordenan por volumen 24h convertido a VOLUME_REFERENCE (el
+        quoteVolume de cada par está en su propia moneda quote) para que, a igual
+        número de saltos, gane el par más líquido.
+        """
+        edges: List[Tuple[str, str, float, float]] = []
+        graph: Dict[str, List[Tuple[str, float]]] = {}
+        for pair, (base, quote) in get_spot_pairs().items():
+            ticker = tickers.get(pair)
+            if not ticker:
+                continue
+            price = _ticker_price(ticker)
+            if not price or price <= 0:
+                continue
+            edges.append((base, quote, price, float(ticker.get('quoteVolume') or 0)))
+            graph.setdefault(base, []).append((quote, price))
+            graph.setdefault(quote, []).append((base, 1.0 / price))
+
+        # Precio de cada moneda quote en la referencia (sin ruta: volumen 0)
+        reference = self._bfs(graph, VOLUME_REFERENCE) if VOLUME_REFERENCE in graph else {}
+        weighted: Dict[str, List[Tuple[float, str, float]]] = {}
+        for base, quote, price, quote_volume in edges:
+            volume = quote_volume * reference.get(quote, 0.0) if reference else quote_volume
+            weighted.setdefault(base, []).append((volume, quote, price))
+            weighted.setdefault(quote, []).append((volume, base, 1.0 / price))
+        return {
+            asset: [(neighbor, rate) for _, neighbor, rate in sorted(neighbors, key=lambda e: -e[0])]
+            for asset, neighbors in weighted.items()
+        }
+
+    @staticmethod
+    def _bfs(graph: Dict[str, List[Tuple[str, float]]], target: str) -> Dict[str, float]:
+        """Precio en `target` de cada activo alcanzable (mínimo número de saltos)."""
+        prices = {target: 1.0}
+        queue = deque([target])
+        while queue:
+            asset = queue.popleft()
+            for neighbor, rate in graph.get(asset, ()):
+                if neighbor in prices:
+                    continue
+                # 1 asset = rate neighbor  =>  1 neighbor = price(asset) / rate
+                prices[neighbor] = prices[asset] / rate
+                queue.append(neighbor)
+        return prices
+
+    def _refresh(self):
+        """Reconstruye el grafo si el snapshot de tickers cambió."""
+        version, tickers = get_ticker_snapshot()
+        if version == self._graph_version and self._graph:
+            return
+        self._graph = self._build_graph(tickers)
+        self._graph_version = version
+        self._prices = {}
+
+    def _prices_in(self, target: str) -> Dict[str, float]:
+        """BFS desde la moneda objetivo: precio de cada activo alcanzable."""
+        prices = self._prices.get(target)
+        if prices is not None:
+            return prices
+        prices = self._bfs(self._graph, target)
+        self._prices[target] = prices
+        return prices
+
+    def get_prices(self, target: str = 'EUR') -> Dict[str, float]:
+        """
+        Precio de todos los activos alcanzables en la moneda objetivo.
+
+        Args:
+            target: Moneda objetivo (ej: 'EUR', 'BTC', 'USDT')
+
+        Returns:
+            Dict {activo: precio en target}
+        """
+        with self._lock:
+            try:
+                self._refresh()
+            except Exception as e:
+                logger.debug(f"Error refrescando grafo de precios: {e}")
+            return self._prices_in(target)
+
+    def get_price(self, asset: str, target: str = 'EUR') -> Optional[float]:
+        """Precio de un activo en la moneda objetivo (None si no hay ruta)."""
+        if asset == target:
+            return 1.0
+        return self.get_prices(target).get(asset)
+
+    def get_asset_values(self, amounts: Dict[str, float], target: str = 'EUR') -> Dict[str, Optional[float]]:
+        """
+        Valora una cartera completa con un solo recorrido del grafo.
+
+        Args:
+            amounts: Dict {activo: cantidad}
+            target: Moneda objetivo
+
+        Returns:
+            Dict {activo: valor en target}, None para activos sin ruta de precio
+        """
+        prices = self.get_prices(target)
+        values = {}
+        for asset, amount in amounts.items():
+            price = 1.0 if asset == target else prices.get(asset)
+            values[asset] = amount * price if price is not None else None
+        return values
+
+
+# Instancia compartida por Vault y el motor
+_default_oracle: Optional[PriceOracle] = None
+
+
+def get_price_oracle() -> PriceOracle:
+    """Devuelve el oráculo de precios compartido (lo crea en el primer uso)."""
+    global _default_oracle
+    if _default_oracle is None:
+        _default_oracle = PriceOracle()
+    return _default_oracle
@@ -2,107 +2,490 @@
 Router optimizado para encontrar rutas de trading entre monedas.
 Prioriza pares directos y minimiza comisiones.
 """
+import asyncio
 import logging
+import math
+import threading
+import time
 from typing import Optional, List, Tuple, Dict, Any
 
+from engine.rate_limit import RequestShed
+
 logger = logging.getLogger(__name__)
 
-# Cache de pares disponibles (se actualiza dinámicamente)
+# Cache de pares disponibles (se actualiza dinámicamente). Sus claves son el
+# conjunto de símbolos conocidos: un par que no está ahí no existe en el exchange.
 _pair_cache = {}
 _exchange_instance = None
 
+# Cliente ccxt compartido (solo lectura) para cuando no hay exchange del motor:
+# se construye una vez y reutiliza su sesión HTTP (pool de conexiones keep-alive)
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+# Cache negativa: par -> instante hasta el que se considera inexistente
+DEFAULT_NEGATIVE_TTL = 300.0
+# Errores de red/API (no de símbolo): no reintentar el mismo par durante unos segundos
+NEGATIVE_ERROR_TTL = 10.0
+_negative_pairs: Dict[str, float] = {}
+_pair_lookup_stats = {'unknown': 0, 'negative_hits': 0, 'negative_added': 0, 'client_fetches': 0}
+
+# Snapshot de mercado: todos los tickers spot obtenidos con un único fetch_tickers.
+# Todas las consultas de get_pair_info se sirven desde memoria mientras el snapshot
+# no supere su TTL. Un hilo en segundo plano lo refresca cada TTL; en el hilo del
+# event loop nunca se refresca ni se piden tickers sueltos (solo memoria).
+DEFAULT_SNAPSHOT_TTL = 3.0
+MIN_SNAPSHOT_REFRESH_INTERVAL = 0.5
+_ticker_snapshot: Dict[str, Dict[str, Any]] = {}
+_snapshot_ts = 0.0
+_snapshot_last_attempt = 0.0
+_snapshot_version = 0
+_snapshot_ttl = DEFAULT_SNAPSHOT_TTL
+_snapshot_lock = threading.Lock()
+_snapshot_refresh_thread = None
+
+# Índice de adyacencia activo -> pares (se construye una vez en init_router y se
+# refresca en segundo plano con un diff incremental de los mercados listados).
+# Los valores son dicts usados como conjuntos ordenados para mantener un orden estable.
+DEFAULT_MARKETS_REFRESH_INTERVAL = 3600
+_asset_pairs: Dict[str, Dict[str, None]] = {}
+_pair_base: Dict[str, str] = {}
+_pair_quote: Dict[str, str] = {}
+_markets_version = 0
+_index_lock = threading.Lock()
+_markets_refresh_thread = None
+
+# Planes de ruta: caminos candidatos de 1 y 2 saltos entre dos activos, como
+# tuplas de (par, lado). Solo dependen de los mercados listados, así que se
+# cachean por (origen, destino, intermedias) y se invalidan cuando cambia la
+# versión de mercados; en cada consulta solo se valoran con el snapshot vigente.
+# Cada salto pesa -log(precio × (1 - comisión)).
+DEFAULT_TAKER_FEE = 0.001
+MAX_ROUTE_PLANS = 5000
+RoutePlan = Tuple[Tuple[str, str], ...]
+_route_plans: Dict[Tuple[str, str, Optional[frozenset]], List[RoutePlan]] = {}
+_route_plans_version: Optional[int] = None
+_route_plans_lock = threading.Lock()
+_route_plan_stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
 
-def init_router(exchange):
-    """Inicializa el router con una instancia de exchange."""
+def init_router(exchange, snapshot_ttl: Optional[float] = None,
+                markets_refresh_interval: Optional[float] = None):
+    """
+    Inicializa el router con una instancia de exchange.
+    
+    Args:
+        exchange: Instancia de exchange (ccxt)
+        snapshot_ttl: Segundos de validez del snapshot de tickers (None = por defecto)
+        markets_refresh_interval: Segundos entre refrescos del índice de pares
+            (None = por defecto, 0 = sin refresco en segundo plano)
+    """
     global _exchange_instance
     _exchange_instance = exchange
+    if snapshot_ttl is not None:
+        set_snapshot_ttl(snapshot_ttl)
     _update_pair_cache()
+    _start_snapshot_refresh_thread()
+    if markets_refresh_interval is None:
+        markets_refresh_interval = DEFAULT_MARKETS_REFRESH_INTERVAL
+    if markets_refresh_interval > 0:
+        _start_markets_refresh_thread(markets_refresh_interval)
+
+
+def _start_markets_refresh_thread(interval: float):
+    """Lanza (una sola vez) el hilo que refresca el índice de pares cada `interval` segundos."""
+    global _markets_refresh_thread
+    if _markets_refresh_thread and _markets_refresh_thread.is_alive():
+        return
+    
+    def _refresh_loop():
+        while True:
+            time.sleep(interval)
+            try:
+                _update_pair_cache(reload=True)
+            except Exception as e:
+                logger.debug(f"Error en refresco periódico de mercados: {e}")
+    
+    t = threading.Thread(target=_refresh_loop, daemon=True, name='markets-refresh-thread')
+    t.start()
+    _markets_refresh_thread = t
+
+
+def _start_snapshot_refresh_thread():
+    """Lanza (una sola vez) el hilo que refresca el snapshot de tickers cada TTL."""
+    global _snapshot_refresh_thread
+    if _snapshot_refresh_thread and _snapshot_refresh_thread.is_alive():
+        return
+    
+    def _refresh_loop():
+        while True:
+            try:
+                refresh_market_snapshot()
+            except Exception as e:
+                logger.debug(f"Error en refresco periódico del snapshot de tickers: {e}")
+            time.sleep(max(_snapshot_ttl, MIN_SNAPSHOT_REFRESH_INTERVAL))
+    
+    t = threading.Thread(target=_refresh_loop, daemon=True, name='ticker-snapshot-thread')
+    t.start()
+    _snapshot_refresh_thread = t
+
 
+def _on_event_loop() -> bool:
+    """True si el hilo actual está ejecutando un event loop de asyncio."""
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+def _refresh_snapshot_off_loop():
+    """Refresca el snapshot vencido salvo en el hilo del event loop (allí se sirve de memoria)."""
+    if not _on_event_loop():
+        refresh_market_snapshot()
+
+
+def set_snapshot_ttl(ttl: float):
+    """Configura el TTL (segundos) del snapshot de tickers."""
+    global _snapshot_ttl
+    try:
+        _snapshot_ttl = max(0.0, float(ttl))
+    except (TypeError, ValueError):
+        logger.debug(f"TTL de snapshot inválido: {ttl}")
 
-def _update_pair_cache():
-    """Actualiza el cache de pares disponibles."""
-    global _pair_cache
+
+def refresh_market_snapshot(force: bool = False) -> bool:
+    """
+    Refresca el snapshot de tickers con una sola llamada bulk a fetch_tickers.
+    
+    Si el snapshot sigue vigente (edad < TTL) no hace nada salvo que force=True.
+    Si la llamada falla se conserva el snapshot anterior y no se reintenta
+    hasta que vuelva a vencer el TTL (evita martillear la API).
+    
+    Returns:
+        True si el snapshot quedó actualizado en esta llamada
+    """
+    global _ticker_snapshot, _snapshot_ts, _snapshot_last_attempt, _snapshot_version
+    if not _exchange_instance:
+        return False
+    
+    now = time.time()
+    if not force and now - _snapshot_last_attempt < _snapshot_ttl:
+        return False
+    
+    with _snapshot_lock:
+        # Otro hilo pudo refrescar mientras esperábamos el lock
+        now = time.time()
+        if not force and now - _snapshot_last_attempt < _snapshot_ttl:
+            return False
+        _snapshot_last_attempt = now
+        try:
+            tickers = _exchange_instance.fetch_tickers()
+            if not tickers:
+                return False
+            _ticker_snapshot = tickers
+            _snapshot_ts = time.time()
+            _snapshot_version += 1
+            logger.debug(
+                f"Snapshot de mercado v{_snapshot_version}: {len(tickers)} tickers "
+                f"({_snapshot_ts - now:.2f}s)"
+            )
+            return True
+        except Exception as e:
+            logger.debug(f"Error refrescando snapshot de tickers: {e}")
+            return False
+
+
+def get_snapshot_info() -> Dict[str, Any]:
+    """
+    Devuelve metadatos del snapshot de tickers para que los consumidores
+    sepan qué tan frescos son los datos.
+    
+    Returns:
+        Dict con version, age (segundos, None si nunca se cargó), size y ttl
+    """
+    return {
+        'version': _snapshot_version,
+        'age': (time.time() - _snapshot_ts) if _snapshot_ts else None,
+        'size': len(_ticker_snapshot),
+        'ttl': _snapshot_ttl
+    }
+
+
+def get_ticker_snapshot() -> Tuple[int, Dict[str, Dict[str, Any]]]:
+    """
+    Devuelve el snapshot de tickers junto a su versión. Fuera del event loop lo
+    refresca si venció; en el hilo del loop devuelve el que haya en memoria.
+    El dict no debe modificarse: se reemplaza entero en cada refresco.
+    
+    Returns:
+        Tupla (version, {símbolo: ticker})
+    """
+    _refresh_snapshot_off_loop()
+    return (_snapshot_version, _ticker_snapshot)
+
+
+def get_spot_pairs() -> Dict[str, Tuple[str, str]]:
+    """
+    Devuelve una copia de los pares spot indexados.
+    
+    Returns:
+        Dict {par: (base, quote)}
+    """
+    with _index_lock:
+        return {pair: (base, _pair_quote[pair]) for pair, base in _pair_base.items()}
+
+
+def _get_ticker(pair: str) -> Optional[Dict[str, Any]]:
+    """
+    Obtiene el ticker de un par desde el snapshot.
+    
+    En el hilo del event loop solo se sirve de memoria (el snapshot lo refresca
+    el hilo de fondo); fuera del loop se refresca si venció y un par activo
+    ausente del snapshot se pide suelto.
+    """
+    if _on_event_loop():
+        return _ticker_snapshot.get(pair)
+    refresh_market_snapshot()
+    ticker = _ticker_snapshot.get(pair)
+    if ticker is None and pair in _pair_cache:
+        # Par activo ausente del snapshot (listado reciente o snapshot fallido)
+        ticker = _exchange_instance.fetch_ticker(pair)
+    return ticker
+
+
+def _build_pair_info(pair: str, market: Dict[str, Any], ticker: Dict[str, Any]) -> Dict[str, Any]:
+    """Construye el dict de información de un par a partir de mercado y ticker."""
+    # Capturar price_change_percent de Binance (puede venir como 'percentage' o 'change')
+    price_change_pct = ticker.get('percentage') or ticker.get('change')
+    
+    # Fallback: calcular desde lastPrice y previousClosePrice/open
+    if price_change_pct is None:
+        last_price = ticker.get('last')
+        open_price = ticker.get('open') or ticker.get('previousClose')
+        if last_price and open_price and open_price > 0:
+            price_change_pct = ((last_price - open_price) / open_price) * 100
+        else:
+            price_change_pct = 0.0
+    
+    return {
+        'symbol': pair,
+        'active': market.get('active', True),
+        'last_price': ticker.get('last'),
+        'bid': ticker.get('bid'),
+        'ask': ticker.get('ask'),
+        'volume': ticker.get('quoteVolume', 0),
+        'baseVolume': ticker.get('baseVolume', 0),
+        'previousVolume': ticker.get('previousClose', 0),  # Placeholder para volumen previo
+        'price_change_percent': price_change_pct,
+        'maker': market.get('maker', 0.001),
+        'taker': market.get('taker', 0.001),
+        'snapshot_version': _snapshot_version,
+        'snapshot_age': (time.time() - _snapshot_ts) if _snapshot_ts else None
+    }
+
+
+def _update_pair_cache(reload: bool = False):
+    """
+    Actualiza el cache de pares disponibles y el índice de adyacencia.
+    
+    Aplica un diff incremental: solo se indexan los pares listados y se retiran
+    los deslistados desde la última carga. Incrementa la versión de mercados si
+    el conjunto de pares cambió.
+    
+    Args:
+        reload: Si True, fuerza a ccxt a descargar de nuevo los mercados
+    """
+    global _pair_cache, _markets_version
     if not _exchange_instance:
         return
     
     try:
-        markets = _exchange_instance.load_markets()
-        _pair_cache = {}
+        markets = _exchange_instance.load_markets(reload) if reload else _exchange_instance.load_markets()
+        new_cache = {}
         for symbol in markets:
             if markets[symbol]['active']:
-                _pair_cache[symbol] = markets[symbol]
+                new_cache[symbol] = markets[symbol]
+        
+        with _index_lock:
+            added = [symbol for symbol in new_cache if symbol not in _pair_cache]
+            removed = [symbol for symbol in _pair_cache if symbol not in new_cache]
+            
+            for symbol in removed:
+                base = _pair_base.pop(symbol, None)
+                quote = _pair_quote.pop(symbol, None)
+                for asset in (base, quote):
+                    if asset in _asset_pairs:
+                        _asset_pairs[asset].pop(symbol, None)
+                        if not _asset_pairs[asset]:
+                            del _asset_pairs[asset]
+            
+            for symbol in added:
+                market = new_cache[symbol]
+                # Solo pares spot en el índice (los derivados no son operables por el bot)
+                if not market.get('spot', True) or '/' not in symbol:
+                    continue
+                base = market.get('base') or symbol.split('/')[0]
+                quote = market.get('quote') or symbol.split('/')[1]
+                _pair_base[symbol] = base
+                _pair_quote[symbol] = quote
+                _asset_pairs.setdefault(base, {})[symbol] = None
+                _asset_pairs.setdefault(quote, {})[symbol] = None
+            
+            _pair_cache = new_cache
+            # Un listado nuevo deja de ser inexistente
+            for symbol in added:
+                _negative_pairs.pop(symbol, None)
+            if added or removed:
+                _markets_version += 1
+                logger.debug(
+                    f"Índice de pares v{_markets_version}: +{len(added)} / -{len(removed)} "
+                    f"({len(_pair_base)} pares spot)"
+                )
     except Exception as e:
         logger.debug(f"Error actualizando cache de pares: {e}")
 
 
+def get_markets_version() -> int:
+    """Versión del conjunto de mercados (cambia solo con listados/deslistados)."""
+    return _markets_version
+
+
+def get_pair_assets(pair: str) -> Optional[Tuple[str, str]]:
+    """
+    Devuelve (base, quote) de un par indexado.
+    
+    Returns:
+        Tupla (base, quote) o None si el par no está en el índice
+    """
+    base = _pair_base.get(pair)
+    if base is None:
+        return None
+    return (base, _pair_quote[pair])
+
+
+def get_taker_fee(pair: str) -> float:
+    """Comisión taker del par según el mercado cargado (por defecto 0.1%)."""
+    return (_pair_cache.get(pair) or {}).get('taker') or DEFAULT_TAKER_FEE
+
+
+def get_exchange_client():
+    """
+    Cliente de exchange compartido por todas las rutas de código del router.
+    
+    Usa el exchange del motor (init_router); si no hay, crea una sola vez un
+    cliente ccxt de solo lectura y lo reutiliza (conexiones HTTP persistentes).
+    
+    Returns:
+        Instancia de exchange o None si no se pudo crear
+    """
+    global _shared_client
+    if _exchange_instance:
+        return _exchange_instance
+    if _shared_client is not None:
+        return _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            try:
+                import ccxt
+                from bot_config import BINANCE_API_KEY, BINANCE_SECRET_KEY, BINANCE_TESTNET
+                
+                exchange_config = {
+                    'apiKey': BINANCE_API_KEY if BINANCE_API_KEY else '',
+                    'secret': BINANCE_SECRET_KEY if BINANCE_SECRET_KEY else '',
+                    'enableRateLimit': True,
+                    'options': {'defaultType': 'spot'}
+                }
+                
+                if BINANCE_TESTNET:
+                    exchange_config['urls'] = {
+                        'api': {
+                            'public': 'https://testnet.binance.vision/api',
+                            'private': 'https://testnet.binance.vision/api',
+                        }
+                    }
+                
+                _shared_client = ccxt.binance(exchange_config)
+            except Exception as e:
+                logger.debug(f"No se pudo crear el cliente de exchange compartido: {e}")
+        return _shared_client
+
+
+def is_known_pair(pair: str) -> Optional[bool]:
+    """
+    Consulta en memoria si un par existe.
+    
+    Returns:
+        True/False según el conjunto de símbolos conocidos y la cache negativa,
+        None si aún no hay mercados cargados ni entrada negativa
+    """
+    if _pair_cache:
+        return pair in _pair_cache
+    expires = _negative_pairs.get(pair)
+    if expires is not None:
+        if time.time() < expires:
+            return False
+        _negative_pairs.pop(pair, None)
+    return None
+
+
+def _mark_missing(pair: str, ttl: float = DEFAULT_NEGATIVE_TTL):
+    """Añade un par a la cache negativa."""
+    if len(_negative_pairs) > 10000:
+        now = time.time()
+        for symbol in [p for p, expires in _negative_pairs.items() if expires <= now]:
+            _negative_pairs.pop(symbol, None)
+    _negative_pairs[pair] = time.time() + ttl
+    _pair_lookup_stats['negative_added'] += 1
+
+
+def get_pair_lookup_stats() -> Dict[str, Any]:
+    """Contadores de consultas de pares resueltas en memoria."""
+    return {**_pair_lookup_stats, 'known': len(_pair_cache), 'negative': len(_negative_pairs)}
+
+
 def get_pair_info(pair: str) -> Optional[Dict[str, Any]]:
     """
     Obtiene información de un par de trading.
     
+    Los pares inexistentes se resuelven en memoria: con los mercados cargados,
+    un símbolo fuera del conjunto conocido devuelve None sin tocar la red; sin
+    mercados, los fallos se recuerdan en una cache negativa.
+    
     Args:
         pair: Par de trading (ej: "BTC/EUR")
     
     Returns:
         Dict con información del par o None si no existe
+    
+    Raises:
+        RequestShed: si hacía falta pedir el ticker y el planificador de peso
+            descartó la petición (reintentable: el par puede existir)
     """
-    # Si hay exchange_instance, usarlo
-    if _exchange_instance:
+    known = is_known_pair(pair)
+    if known is False:
+        _pair_lookup_stats['unknown' if _pair_cache else 'negative_hits'] += 1
+        return None
+    
+    if known:
         try:
-            # Intentar obtener del cache primero
-            if pair in _pair_cache:
-                market = _pair_cache[pair]
-                ticker = _exchange_instance.fetch_ticker(pair)
-                
-                # Capturar price_change_percent de Binance (puede venir como 'percentage' o 'change')
-                price_change_pct = ticker.get('percentage') or ticker.get('change')
-                
-                # Fallback: calcular desde lastPrice y previousClosePrice/open
-                if price_change_pct is None:
-                    last_price = ticker.get('last')
-                    open_price = ticker.get('open') or ticker.get('previousClose')
-                    if last_price and open_price and open_price > 0:
-                        price_change_pct = ((last_price - open_price) / open_price) * 100
-                    else:
-                        price_change_pct = 0.0
-                
-                return {
-                    'symbol': pair,
-                    'active': market.get('active', True),
-                    'last_price': ticker.get('last'),
-                    'bid': ticker.get('bid'),
-                    'ask': ticker.get('ask'),
-                    'volume': ticker.get('quoteVolume', 0),
-                    'baseVolume': ticker.get('baseVolume', 0),
-                    'previousVolume': ticker.get('previousClose', 0),  # Placeholder para volumen previo
-                    'price_change_percent': price_change_pct,
-                    'maker': market.get('maker', 0.001),
-                    'taker': market.get('taker', 0.001)
-                }
+            # Ticker servido desde el snapshot
+            ticker = _get_ticker(pair)
+            if ticker:
+                return _build_pair_info(pair, _pair_cache[pair], ticker)
+        except RequestShed:
+            raise
         except Exception as e:
             logger.debug(f"Error obteniendo info del par {pair} con exchange: {e}")
+        return None
     
-    # Si no hay exchange_instance, crear uno temporal (solo lectura)
+    # Sin mercados cargados: consultar con el cliente compartido
+    client = get_exchange_client()
+    if client is None:
+        return None
     try:
-        import ccxt
-        from bot_config import BINANCE_API_KEY, BINANCE_SECRET_KEY, BINANCE_TESTNET
-        
-        exchange_config = {
-            'apiKey': BINANCE_API_KEY if BINANCE_API_KEY else '',
-            'secret': BINANCE_SECRET_KEY if BINANCE_SECRET_KEY else '',
-            'enableRateLimit': True,
-            'options': {'defaultType': 'spot'}
-        }
-        
-        if BINANCE_TESTNET:
-            exchange_config['urls'] = {
-                'api': {
-                    'public': 'https://testnet.binance.vision/api',
-                    'private': 'https://testnet.binance.vision/api',
-                }
-            }
-        
-        temp_exchange = ccxt.binance(exchange_config)
-        ticker = temp_exchange.fetch_ticker(pair)
+        _pair_lookup_stats['client_fetches'] += 1
+        ticker = client.fetch_ticker(pair)
         
         return {
             'symbol': pair,
@@ -114,8 +497,13 @@ def get_pair_info(pair: str) -> Optional[Dict[str, Any]]:
             'maker': 0.001,
             'taker': 0.001
         }
+    except RequestShed:
+        # Sin presupuesto de peso: no dice nada de la existencia del par
+        raise
     except Exception as e:
-        logger.debug(f"Error obteniendo info del par {pair} sin exchange: {e}")
+        logger.debug(f"Error obteniendo info del par {pair} sin mercados cargados: {e}")
+        bad_symbol = type(e).__name__ == 'BadSymbol'
+        _mark_missing(pair, DEFAULT_NEGATIVE_TTL if bad_symbol else NEGATIVE_ERROR_TTL)
         return None
 
 
@@ -123,6 +511,8 @@ def get_available_pairs(base: str) -> List[str]:
     """
     Obtiene todos los pares disponibles para una moneda base.
     
+    Consulta O(1) sobre el índice de adyacencia construido en init_router.
+    
     Args:
         base: Moneda base (ej: "EUR", "BTC")
     
@@ -133,17 +523,151 @@ def get_available_pairs(base: str) -> List[str]:
         return []
     
     try:
-        _update_pair_cache()
-        pairs = []
-        for symbol in _pair_cache:
-            if symbol.startswith(f"{base}/") or symbol.endswith(f"/{base}"):
-                pairs.append(symbol)
-        return pairs
+        with _index_lock:
+            return list(_asset_pairs.get(base, ()))
     except Exception as e:
         logger.debug(f"Error obteniendo pares para {base}: {e}")
         return []
 
 
+def _leg_side(pair: str, from_asset: str) -> str:
+    """'sell' si se entrega la base del par, 'buy' si se entrega la quote."""
+    return 'sell' if _pair_base.get(pair) == from_asset else 'buy'
+
+
+def _pair_other(pair: str, asset: str) -> Optional[str]:
+    """Activo del par que no es `asset`."""
+    base = _pair_base.get(pair)
+    return _pair_quote.get(pair) if base == asset else base
+
+
+def _build_route_plans(from_asset: str, to_asset: str, allowed: Optional[frozenset]) -> List[RoutePlan]:
+    """Caminos estructurales (1 y 2 saltos) entre dos activos según el índice de pares."""
+    plans: List[RoutePlan] = []
+    with _index_lock:
+        to_legs: Dict[str, List[str]] = {}
+        for pair in _asset_pairs.get(to_asset, ()):
+            to_legs.setdefault(_pair_other(pair, to_asset), []).append(pair)
+        for pair in _asset_pairs.get(from_asset, ()):
+            middle = _pair_other(pair, from_asset)
+            first = (pair, _leg_side(pair, from_asset))
+            if middle == to_asset:
+                plans.append((first,))
+            elif middle in to_legs and (allowed is None or middle in allowed):
+                for second in to_legs[middle]:
+                    plans.append((first, (second, _leg_side(second, middle))))
+    return plans
+
+
+def get_route_plans(from_asset: str, to_asset: str, intermediates: Optional[List[str]] = None) -> List[RoutePlan]:
+    """
+    Caminos candidatos entre dos activos (de cache mientras no cambien los mercados).
+    
+    Args:
+        from_asset: Moneda de origen
+        to_asset: Moneda de destino
+        intermediates: Monedas permitidas como intermedias (None = cualquiera)
+    
+    Returns:
+        Lista de caminos, cada uno una tupla de (par, lado)
+    """
+    global _route_plans_version
+    allowed = frozenset(intermediates) if intermediates is not None else None
+    key = (from_asset, to_asset, allowed)
+    with _route_plans_lock:
+        if _route_plans_version != _markets_version or len(_route_plans) > MAX_ROUTE_PLANS:
+            if _route_plans:
+                _route_plan_stats['invalidations'] += 1
+            _route_plans.clear()
+            _route_plans_version = _markets_version
+        plans = _route_plans.get(key)
+        if plans is not None:
+            _route_plan_stats['hits'] += 1
+            return plans
+    plans = _build_route_plans(from_asset, to_asset, allowed)
+    with _route_plans_lock:
+        _route_plan_stats['misses'] += 1
+        if _route_plans_version == _markets_version:
+            _route_plans[key] = plans
+    return plans
+
+
+def get_route_plan_stats() -> Dict[str, Any]:
+    """Contadores de la cache de planes de ruta."""
+    with _route_plans_lock:
+        return {**_route_plan_stats, 'cached': len(_route_plans), 'markets_version': _route_plans_version}
+
+
+def _leg_rate(pair: str, side: str, tickers: Dict[str, Dict[str, Any]]) -> float:
+    """Destino recibido por unidad entregada en un salto (mejor precio, comisión incluida)."""
+    ticker = tickers.get(pair)
+    if not ticker:
+        return 0.0
+    fee = get_taker_fee(pair)
+    if side == 'sell':
+        bid = ticker.get('bid')
+        return bid * (1 - fee) if bid else 0.0
+    ask = ticker.get('ask')
+    return (1 - fee) / ask if ask else 0.0
+
+
+def find_best_routes(
+    from_asset: str,
+    to_asset: str,
+    amount: float = 1.0,
+    intermediates: Optional[List[str]] = None,
+    limit: int = 5
+) -> List[Dict[str, Any]]:
+    """
+    Mejores rutas de 1 y 2 saltos entre dos activos: valora con el snapshot de
+    tickers los caminos del plan cacheado (sin llamadas de red salvo el refresco
+    del snapshot), ordenadas por cantidad recibida.
+    
+    Args:
+        from_asset: Moneda de origen
+        to_asset: Moneda de destino
+        amount: Cantidad de origen
+        intermediates: Monedas permitidas como intermedias (None = cualquiera)
+        limit: Rutas máximas devueltas
+    
+    Returns:
+        Lista de dicts con path (activos), pairs, sides ('sell'/'buy'), rate
+        (destino por unidad de origen, comisiones incluidas) y expected_output
+    """
+    if from_asset == to_asset:
+        return []
+    _, tickers = get_ticker_snapshot()
+    if not tickers:
+        return []
+    
+    candidates = []
+    for plan in get_route_plans(from_asset, to_asset, intermediates):
+        cost = 0.0
+        for pair, side in plan:
+            rate = _leg_rate(pair, side, tickers)
+            if rate <= 0:
+                break
+            cost -= math.log(rate)
+        else:
+            candidates.append((cost, plan))
+    
+    candidates.sort(key=lambda c: c[0])
+    routes = []
+    for cost, plan in candidates[:limit]:
+        rate = math.exp(-cost)
+        path = [from_asset] + [_pair_other(pair, from_asset) for pair, _ in plan[:1]]
+        if len(plan) == 2:
+            path.append(to_asset)
+        routes.append({
+            'path': path,
+            'pairs': [pair for pair, _ in plan],
+            'sides': [side for _, side in plan],
+            'rate': rate,
+            'expected_output': amount * rate
+        })
+    return routes
+
+
 def find_swap_route(
     from_asset: str,
     to_asset: str,
@@ -154,7 +678,11 @@ def find_swap_route(
     """
     Encuentra la mejor ruta para hacer un swap entre dos monedas.
     
-    Prioridad:
+    Con snapshot de tickers devuelve la ruta de 1 o 2 saltos (intermedias de la
+    whitelist) con mejor tipo neto de comisiones entre los caminos del plan
+    cacheado (ver find_best_routes). Sin snapshot, o si la búsqueda en el grafo
+    no encuentra ruta (p. ej. un salto sin bid/ask o un par ausente del
+    snapshot), recorre los candidatos por prioridad:
     1. Par directo (ej: SOL/BTC, ETH/BTC)
     2. Par a través de whitelist (evitando fiat si es posible)
     3. Par a través de fiat como último recurso
@@ -174,6 +702,18 @@ def find_swap_route(
     if fiat_assets is None:
         fiat_assets = ['EUR', 'USDC']
     
+    if get_ticker_snapshot()[1]:
+        routes = find_best_routes(from_asset, to_asset, intermediates=whitelist, limit=1)
+        if routes:
+            route = routes[0]
+            intermediate = route['path'][1] if len(route['path']) == 3 else None
+            logger.debug(
+                f"✅ Ruta encontrada: {' -> '.join(route['pairs'])} "
+                f"(tipo neto: {route['rate']:.8g} {to_asset}/{from_asset})"
+            )
+            return (route['pairs'][0], intermediate)
+        logger.debug(f"Sin ruta en el snapshot {from_asset} -> {to_asset}; recorriendo candidatos")
+    
     # PRIORIDAD 1: Buscar par directo
     direct_pairs = [
         f"{from_asset}/{to_asset}",
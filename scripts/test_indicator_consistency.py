@@ -0,0 +1,106 @@
+"""
+Comprueba que los indicadores por lotes (get_technical_indicators_batch) y los
+incrementales par a par (get_technical_indicators) devuelven lo mismo.
+
+Un par sembrado en la pasada vectorizada y otro sembrado vela a vela con las
+mismas velas deben dar los mismos valores, al sembrar y tras incorporar velas
+nuevas.
+"""
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import signals
+from candle_store import CandleStore
+
+TF_MS = 3600 * 1000
+HISTORY = 400
+TOLERANCE = 1e-9
+
+
+def make_candles(count, seed=7):
+    rng = random.Random(seed)
+    now_ms = int(time.time() * 1000)
+    start = (now_ms // TF_MS - count + 1) * TF_MS
+    candles, price = [], 100.0
+    for i in range(count):
+        open_ = price
+        price = max(1.0, price * (1 + rng.uniform(-0.03, 0.03)))
+        candles.append([start + i * TF_MS, open_, max(open_, price), min(open_, price), price, rng.uniform(10, 1000)])
+    return candles
+
+
+class FakeExchange:
+    """fetch_ohlcv sobre una serie fija (la última vela es la vela en curso)."""
+
+    def __init__(self, candles):
+        self.candles = candles
+
+    def parse_timeframe(self, timeframe):
+        return 3600
+
+    def fetch_ohlcv(self, pair, timeframe, since=None, limit=None):
+        data = [c for c in self.candles if since is None or c[0] >= since]
+        return [list(c) for c in (data[-limit:] if limit else data)]
+
+
+def assert_close(name, a, b):
+    if a is None or b is None:
+        assert a is None and b is None, f"{name}: {a} != {b}"
+    elif isinstance(a, str):
+        assert a == b, f"{name}: {a} != {b}"
+    else:
+        assert math.isclose(a, b, rel_tol=TOLERANCE, abs_tol=TOLERANCE), f"{name}: {a} != {b}"
+
+
+def compare(label, batch, streaming):
+    assert batch and streaming, f"{label}: sin indicadores ({batch}, {streaming})"
+    for key in streaming:
+        assert_close(f"{label}.{key}", batch[key], streaming[key])
+    print(f"OK {label}: rsi={streaming['rsi']:.6f} ema200_distance={streaming['ema200_distance']:.6f}")
+
+
+def main():
+    if not signals.HAS_NUMPY:
+        print("numpy no disponible: el cálculo por lotes ya es el par a par")
+        return
+
+    signals.HAS_INDICATOR_STORAGE = False
+    store = CandleStore(persist=False)
+    signals.get_candle_store = lambda: store
+    exchange = FakeExchange(make_candles(HISTORY))
+
+    # Sembrado: vectorizado (BATCH/EUR) frente a vela a vela (STREAM/EUR)
+    batch = signals.get_technical_indicators_batch(['BATCH/EUR'], exchange)['BATCH/EUR']
+    streaming = signals.get_technical_indicators('STREAM/EUR', exchange)
+    compare('sembrado', batch, streaming)
+
+    # Tras incorporar velas nuevas ambos estados siguen suavizando igual
+    extra = make_candles(HISTORY + 50, seed=11)[-50:]
+    batch_state = signals.get_indicator_state('BATCH/EUR')
+    stream_state = signals.get_indicator_state('STREAM/EUR')
+    base_ts = batch_state.last_ts
+    for i, candle in enumerate(extra):
+        candle = [base_ts + (i + 1) * TF_MS] + candle[1:]
+        batch_state.update(candle)
+        stream_state.update(candle)
+    compare('tras 50 velas',
+            signals._format_indicators(batch_state.snapshot()),
+            signals._format_indicators(stream_state.snapshot()))
+
+    # Con estado existente, el lote devuelve exactamente lo mismo que par a par
+    signals._indicator_states.clear()
+    signals.get_technical_indicators('STREAM/EUR', exchange)
+    batch = signals.get_technical_indicators_batch(['STREAM/EUR'], exchange)['STREAM/EUR']
+    streaming = signals.get_technical_indicators('STREAM/EUR', exchange)
+    compare('estado existente', batch, streaming)
+
+
+if __name__ == '__main__':
+    main()
@@ -13,10 +13,17 @@ class FakeBinance:
     def __init__(self, *a, **k):
         pass
 fake_ccxt.binance = FakeBinance
+class FakeExchange:
+    @staticmethod
+    def parse_timeframe(timeframe):
+        units = {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+        return int(timeframe[:-1]) * units[timeframe[-1]]
+fake_ccxt.Exchange = FakeExchange
 sys.modules['ccxt'] = fake_ccxt
 sys.modules['dotenv'] = types.SimpleNamespace(load_dotenv=lambda *a, **k: None)
 import engine.trading_logic as tl
 from engine.trading_logic import TradingEngine
+from engine.balance import BalanceCachingExchange
 
 # Price map: 1 unit -> EUR
 PRICE_MAP = {
@@ -67,17 +74,19 @@ async def main():
                 price = PRICE_MAP.get(currency, 0)
                 return amount * price
             return None
+        def get_asset_values(self, amounts, to_currency='EUR'):
+            return {currency: self.get_asset_value(currency, amount, to_currency) or 0.0
+                    for currency, amount in amounts.items()}
     engine.vault = FakeVault()
 
     # Patch exchange.fetch_balance to indicate 172 XRP (=> 86 EUR)
     class FakeExchange:
         def fetch_balance(self):
             return {'total': {'XRP': 172}}
-    engine.exchange = FakeExchange()
+    engine.exchange = BalanceCachingExchange(FakeExchange())
 
-    # Ensure radar cache empty
+    # Ensure radar cache empty (la tabla guarda también el instante de actualización)
     engine.radar_data_cache.clear()
-    engine.radar_last_update.clear()
 
     # Run scan
     await engine._scan_whitelist_against_base('XRP')
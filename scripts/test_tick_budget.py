@@ -0,0 +1,51 @@
+"""
+Comprueba que los descartes y etapas pedidos desde otras tareas (radar, estado
+compartido) se anotan en el registro del tick de vigilancia abierto.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from engine.tick_budget import TickBudget
+
+
+async def main():
+    budget = TickBudget(interval=1.0)
+    budget.degraded = True
+    tick_open = asyncio.Event()
+    scan_done = asyncio.Event()
+
+    async def radar_scan():
+        # Otra tarea: descarta el escaneo de fondo y mide una etapa
+        await tick_open.wait()
+        assert not budget.should_run('scan_background')
+        with budget.stage('scan_wide'):
+            await asyncio.sleep(0.01)
+        scan_done.set()
+
+    async def monitor():
+        budget.begin_tick()
+        tick_open.set()
+        await scan_done.wait()
+        return budget.end_tick()
+
+    scan_task = asyncio.create_task(radar_scan())
+    record = await monitor()
+    await scan_task
+
+    assert record['shed'] == ['scan_background'], record
+    assert record['stages'].get('scan_wide', 0) > 0, record
+    assert budget.recent_ticks(1)[-1] is record
+
+    # Sin tick abierto solo se actualizan los contadores
+    assert not budget.should_run('scan_background')
+    assert budget.get_stats()['shed'] == 2
+    print(f"OK: descartes y etapas de otra tarea en el tick #{record['tick']}: {record['shed']}, {record['stages']}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -3,15 +3,297 @@ Módulo de señales técnicas para el bot.
 Proporciona indicadores técnicos como RSI, EMA200, volumen, etc.
 """
 import logging
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from candle_store import get_candle_store
 
 logger = logging.getLogger(__name__)
 
+# NumPy opcional: cálculo vectorizado de indicadores para muchos pares a la vez
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+    logger.debug("numpy no disponible. Los indicadores se calcularán par a par.")
+
+# Persistencia opcional del estado de indicadores en SQLite (bot_data.db)
+try:
+    from engine.storage import save_indicator_state, load_indicator_state
+    HAS_INDICATOR_STORAGE = True
+except Exception as e:
+    HAS_INDICATOR_STORAGE = False
+    logger.debug(f"Persistencia de estado de indicadores no disponible: {e}")
+
+INDICATOR_TIMEFRAME = '1h'
+INDICATOR_HISTORY = 200
+
+
+class StreamingIndicators:
+    """
+    Estado incremental de EMA200, RSI(14) de Wilder y SMA(20) de volumen para un par.
+    
+    - update(candle): incorpora una vela cerrada en O(1).
+    - snapshot(live_candle): calcula los indicadores con la vela en curso sin
+      modificar el estado (O(1)), para seguir el precio en vivo.
+    - to_dict()/from_dict(): serialización para sobrevivir reinicios.
+    """
+    
+    def __init__(self, ema_period: int = 200, rsi_period: int = 14, volume_period: int = 20):
+        self.ema_period = ema_period
+        self.rsi_period = rsi_period
+        self.volume_period = volume_period
+        self.last_ts: Optional[int] = None
+        self.last_close: Optional[float] = None
+        self.count = 0  # Velas cerradas incorporadas
+        # EMA: se siembra con la SMA de las primeras `ema_period` velas
+        self.ema: Optional[float] = None
+        self.ema_seed_sum = 0.0
+        # RSI de Wilder: se siembra con la media simple de los primeros `rsi_period` deltas
+        self.avg_gain: Optional[float] = None
+        self.avg_loss: Optional[float] = None
+        self.rsi_seed_gain = 0.0
+        self.rsi_seed_loss = 0.0
+        self.deltas = 0
+        # Ventana de volumen de velas cerradas
+        self.volumes: List[float] = []
+        self.volume_sum = 0.0
+    
+    @property
+    def ready(self) -> bool:
+        """True cuando hay historia suficiente para todos los indicadores."""
+        return self.ema is not None and self.avg_gain is not None
+    
+    def _ema_with(self, close: float) -> Optional[float]:
+        """EMA resultante de añadir `close` al estado actual."""
+        if self.ema is not None:
+            k = 2 / (self.ema_period + 1)
+            return close * k + self.ema * (1 - k)
+        if self.count + 1 == self.ema_period:
+            return (self.ema_seed_sum + close) / self.ema_period
+        return None
+    
+    def _wilder_with(self, close: float) -> Tuple[Optional[float], Optional[float]]:
+        """(avg_gain, avg_loss) resultantes de añadir `close` al estado actual."""
+        if self.last_close is None:
+            return (None, None)
+        delta = close - self.last_close
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        n = self.rsi_period
+        if self.avg_gain is not None:
+            return ((self.avg_gain * (n - 1) + gain) / n, (self.avg_loss * (n - 1) + loss) / n)
+        if self.deltas + 1 == n:
+            return ((self.rsi_seed_gain + gain) / n, (self.rsi_seed_loss + loss) / n)
+        return (None, None)
+    
+    def update(self, candle: List[float]):
+        """Incorpora una vela cerrada [ts, o, h, l, c, v]."""
+        ts, close, volume = int(candle[0]), float(candle[4]), float(candle[5] or 0.0)
+        if self.last_ts is not None and ts <= self.last_ts:
+            return
+        
+        ema = self._ema_with(close)
+        if self.ema is None:
+            self.ema_seed_sum += close
+        self.ema = ema
+        
+        if self.last_close is not None:
+            avg_gain, avg_loss = self._wilder_with(close)
+            if self.avg_gain is None:
+                delta = close - self.last_close
+                self.rsi_seed_gain += delta if delta > 0 else 0.0
+                self.rsi_seed_loss += -delta if delta < 0 else 0.0
+            self.avg_gain, self.avg_loss = avg_gain, avg_loss
+            self.deltas += 1
+        
+        self.volumes.append(volume)
+        self.volume_sum += volume
+        if len(self.volumes) > self.volume_period:
+            self.volume_sum -= self.volumes.pop(0)
+        
+        self.last_ts = ts
+        self.last_close = close
+        self.count += 1
+    
+    def snapshot(self, live_candle: Optional[List[float]] = None) -> Dict[str, Any]:
+        """
+        Indicadores actuales. Si se pasa la vela en curso se incluye como última
+        vela (igual que el cálculo sobre fetch_ohlcv), sin modificar el estado.
+        
+        Returns:
+            Dict con rsi, ema200, ema200_distance, volume_sma, current_volume y current_price
+        """
+        if live_candle is not None:
+            close, volume = float(live_candle[4]), float(live_candle[5] or 0.0)
+            ema = self._ema_with(close)
+            avg_gain, avg_loss = self._wilder_with(close)
+            window = self.volumes[-(self.volume_period - 1):] if self.volume_period > 1 else []
+            volume_sma = (sum(window) + volume) / self.volume_period if len(window) == self.volume_period - 1 else None
+        else:
+            close = self.last_close
+            volume = self.volumes[-1] if self.volumes else 0.0
+            ema = self.ema
+            avg_gain, avg_loss = self.avg_gain, self.avg_loss
+            volume_sma = self.volume_sum / self.volume_period if len(self.volumes) == self.volume_period else None
+        
+        rsi = None
+        if avg_gain is not None:
+            rsi = 100.0 if avg_loss == 0 else 100 - (100 / (1 + avg_gain / avg_loss))
+        
+        ema200_distance = None
+        if ema and close is not None:
+            ema200_distance = (close - ema) / ema * 100
+        
+        return {
+            'rsi': rsi,
+            'ema200': ema,
+            'ema200_distance': ema200_distance,
+            'volume_sma': volume_sma,
+            'current_volume': volume,
+            'current_price': close
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializa el estado a un dict JSON-compatible."""
+        return dict(self.__dict__)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'StreamingIndicators':
+        """Reconstruye el estado desde to_dict()."""
+        state = cls(
+            ema_period=data.get('ema_period', 200),
+            rsi_period=data.get('rsi_period', 14),
+            volume_period=data.get('volume_period', 20)
+        )
+        for key, value in data.items():
+            if key in state.__dict__:
+                setattr(state, key, value)
+        state.volumes = list(state.volumes or [])
+        return state
+    
+    @classmethod
+    def from_seed(cls, candles: List[List[float]], ema: Optional[float], avg_gain: Optional[float],
+                  avg_loss: Optional[float], **periods) -> 'StreamingIndicators':
+        """
+        Estado equivalente a llamar update() con `candles` (velas cerradas en orden),
+        a partir de la EMA y las medias de Wilder ya calculadas sobre esas mismas
+        velas con compute_indicators. Permite sembrar muchos pares en una pasada.
+        
+        Args:
+            candles: Velas cerradas [ts, o, h, l, c, v] en orden cronológico
+            ema: EMA tras la última vela (None si no hay historia suficiente)
+            avg_gain: Media de ganancias de Wilder tras la última vela
+            avg_loss: Media de pérdidas de Wilder tras la última vela
+        """
+        state = cls(**periods)
+        if not candles:
+            return state
+        closes = [float(c[4]) for c in candles]
+        state.count = len(closes)
+        state.last_ts = int(candles[-1][0])
+        state.last_close = closes[-1]
+        
+        if state.count >= state.ema_period:
+            state.ema = ema
+            state.ema_seed_sum = sum(closes[:state.ema_period - 1])
+        else:
+            state.ema_seed_sum = sum(closes)
+        
+        deltas = [b - a for a, b in zip(closes, closes[1:])]
+        state.deltas = len(deltas)
+        seed = deltas[:state.rsi_period - 1] if len(deltas) >= state.rsi_period else deltas
+        state.rsi_seed_gain = sum(d for d in seed if d > 0)
+        state.rsi_seed_loss = sum(-d for d in seed if d < 0)
+        if len(deltas) >= state.rsi_period:
+            state.avg_gain, state.avg_loss = avg_gain, avg_loss
+        
+        state.volumes = [float(c[5] or 0.0) for c in candles[-state.volume_period:]]
+        state.volume_sum = sum(state.volumes)
+        return state
+
+
+# Estado incremental por par (timeframe de indicadores)
+_indicator_states: Dict[str, StreamingIndicators] = {}
+
+
+def get_indicator_state(pair: str) -> Optional[StreamingIndicators]:
+    """Devuelve el estado incremental de un par, cargándolo de SQLite si existe."""
+    state = _indicator_states.get(pair)
+    if state is None and HAS_INDICATOR_STORAGE:
+        try:
+            data = load_indicator_state(pair, INDICATOR_TIMEFRAME)
+            if data:
+                state = StreamingIndicators.from_dict(data)
+                _indicator_states[pair] = state
+        except Exception as e:
+            logger.debug(f"No se pudo cargar estado de indicadores de {pair}: {e}")
+    return state
+
+
+def _sync_indicator_state(pair: str, exchange) -> Tuple[Optional[StreamingIndicators], Optional[List[float]]]:
+    """
+    Sincroniza el estado incremental de un par con el almacén de velas.
+    
+    Solo pide al almacén las velas posteriores al último cierre incorporado;
+    si el estado no existe o quedó demasiado atrás, se re-siembra con la historia.
+    
+    Returns:
+        (estado, vela en curso o None)
+    """
+    store = get_candle_store()
+    state = get_indicator_state(pair)
+    tf_ms = store.timeframe_ms(exchange, INDICATOR_TIMEFRAME)
+    
+    pending = 0
+    if state is not None:
+        if state.last_ts is None:
+            state = None
+        else:
+            pending = int((time.time() * 1000 - state.last_ts) // tf_ms) + 1
+            if pending >= store.max_candles:
+                state = None
+    
+    if state is None:
+        ohlcv = store.get_ohlcv(exchange, pair, INDICATOR_TIMEFRAME, limit=INDICATOR_HISTORY)
+        state = StreamingIndicators()
+    else:
+        ohlcv = store.get_ohlcv(exchange, pair, INDICATOR_TIMEFRAME, limit=pending + 1)
+    
+    if not ohlcv:
+        return (None, None)
+    
+    # La última vela puede ser la vela en curso
+    live = store.get_live(pair, INDICATOR_TIMEFRAME)
+    if live is None or ohlcv[-1][0] != live[0]:
+        live = None
+    closed = ohlcv[:-1] if live is not None else ohlcv
+    
+    updated = False
+    for candle in closed:
+        if state.last_ts is None or candle[0] > state.last_ts:
+            state.update(candle)
+            updated = True
+    
+    _indicator_states[pair] = state
+    if updated and HAS_INDICATOR_STORAGE:
+        try:
+            save_indicator_state(pair, INDICATOR_TIMEFRAME, state.to_dict())
+        except Exception as e:
+            logger.debug(f"No se pudo persistir estado de indicadores de {pair}: {e}")
+    return (state, live)
+
 
 def get_technical_indicators(pair: str, exchange) -> Dict[str, Any]:
     """
     Obtiene indicadores técnicos para un par de trading.
     
+    Usa el estado incremental del par (EMA200, RSI de Wilder, SMA de volumen):
+    solo las velas cerradas nuevas actualizan el estado y la vela en curso se
+    aplica como vista previa en O(1).
+    
     Args:
         pair: Par de trading (ej: "BTC/EUR")
         exchange: Instancia de exchange (ccxt)
@@ -20,46 +302,297 @@ def get_technical_indicators(pair: str, exchange) -> Dict[str, Any]:
         Dict con indicadores: rsi, ema200_distance, volume_status, profit_potential
     """
     try:
-        # Obtener datos OHLCV
-        ohlcv = exchange.fetch_ohlcv(pair, '1h', limit=200)
-        
-        if len(ohlcv) < 200:
+        state, live = _sync_indicator_state(pair, exchange)
+        if state is None:
             return {}
         
-        # Calcular RSI (simplificado)
-        closes = [c[4] for c in ohlcv]
-        rsi = _calculate_rsi(closes, period=14)
-        
-        # Calcular EMA200
-        ema200 = _calculate_ema(closes, period=200)
-        current_price = closes[-1]
-        ema200_distance = ((current_price - ema200) / ema200 * 100) if ema200 > 0 else 0
-        
-        # Calcular volumen promedio
-        volumes = [c[5] for c in ohlcv]
-        avg_volume = sum(volumes[-20:]) / 20
-        current_volume = volumes[-1]
-        # RELAJADO MÁXIMO: volume_status es 'high' si volumen actual > 0 (cualquier volumen es válido)
-        # Antes: 1.5x = 150%, después: 0.7x = 70%, ahora: > 0
-        # Esto permite que TODO activo con datos OHLCV aparezca en el radar
-        volume_status = 'high' if current_volume > 0 else 'normal'
-        
-        # Potencial de ganancia (simplificado)
-        profit_potential = abs(ema200_distance) if ema200_distance < 0 else 0
-        
-        return {
-            'rsi': rsi,
-            'ema200_distance': ema200_distance,
-            'volume_status': volume_status,
-            'profit_potential': profit_potential
-        }
+        return _format_indicators(state.snapshot(live))
     except Exception as e:
         logger.debug(f"Error obteniendo indicadores para {pair}: {e}")
         return {}
 
 
+def _format_indicators(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Convierte un snapshot de StreamingIndicators en el dict de indicadores del bot."""
+    rsi = values['rsi']
+    ema200_distance = values['ema200_distance']
+    if rsi is None or ema200_distance is None:
+        return {}
+    
+    current_volume = values['current_volume']
+    # RELAJADO MÁXIMO: volume_status es 'high' si volumen actual > 0 (cualquier volumen es válido)
+    # Antes: 1.5x = 150%, después: 0.7x = 70%, ahora: > 0
+    # Esto permite que TODO activo con datos OHLCV aparezca en el radar
+    volume_status = 'high' if current_volume > 0 else 'normal'
+    
+    # Potencial de ganancia (simplificado)
+    profit_potential = abs(ema200_distance) if ema200_distance < 0 else 0
+    
+    return {
+        'rsi': rsi,
+        'ema200_distance': ema200_distance,
+        'volume_status': volume_status,
+        'profit_potential': profit_potential
+    }
+
+
+def get_live_indicators(pair: str, price: float) -> Dict[str, Any]:
+    """
+    Vía rápida solo-precio: aplica el último precio a la vela en curso y devuelve
+    los indicadores sin tocar la red (sin velas ni ticker).
+    
+    Si el estado falta o la vela en curso se cerró devuelve {} y hay que pasar
+    por get_technical_indicators, que incorpora la vela cerrada real (una
+    descarga incremental por vela). El volumen de la vela en curso no se conoce
+    por esta vía: `volume_status` refleja la última vela descargada.
+    
+    Args:
+        pair: Par de trading (ej: "BTC/EUR")
+        price: Último precio del par
+    
+    Returns:
+        Dict con indicadores (mismo formato que get_technical_indicators) o {}
+    """
+    try:
+        state = get_indicator_state(pair)
+        if state is None or state.last_ts is None or not price:
+            return {}
+        store = get_candle_store()
+        tf_ms = store.timeframe_ms(None, INDICATOR_TIMEFRAME)
+        candle_ts = int(time.time() * 1000) // tf_ms * tf_ms
+        # Estado atrasado: hace falta la vela cerrada real
+        if state.last_ts < candle_ts - tf_ms:
+            return {}
+        
+        live = store.apply_live_price(pair, INDICATOR_TIMEFRAME, price)
+        # Sin vela en curso o ya cerrada: hace falta la vela cerrada real
+        if live is None:
+            return {}
+        return _format_indicators(state.snapshot(live))
+    except Exception as e:
+        logger.debug(f"Error en indicadores en vivo para {pair}: {e}")
+        return {}
+
+
+def _seeded_smoothing(values, start, period: int, alpha: float):
+    """
+    Media exponencial sembrada con la SMA de los primeros `period` valores válidos
+    de cada fila, evaluada en la última columna (sin bucles por vela).
+    
+    Equivale a: seed = mean(x[start:start+period]); luego x*alpha + prev*(1-alpha).
+    
+    Args:
+        values: Matriz (N, T) con NaN a la izquierda donde no hay datos
+        start: Vector (N,) con el índice del primer valor válido de cada fila
+        period: Tamaño de la semilla
+        alpha: Factor de suavizado
+    
+    Returns:
+        Vector (N,) con el valor final (NaN si la fila no tiene historia suficiente)
+    """
+    n_rows, n_cols = values.shape
+    rows = np.arange(n_rows)
+    filled = np.nan_to_num(values, nan=0.0)
+    cumsum = np.cumsum(filled, axis=1)
+    
+    valid = (n_cols - start) >= period
+    seed_end = np.minimum(start + period - 1, n_cols - 1)
+    before = np.where(start > 0, cumsum[rows, np.maximum(start - 1, 0)], 0.0)
+    seed = (cumsum[rows, seed_end] - before) / period
+    
+    cols = np.arange(n_cols)
+    decay = (1 - alpha) ** (n_cols - 1 - cols)
+    weights = np.where(cols[None, :] > seed_end[:, None], alpha * decay[None, :], 0.0)
+    result = seed * (1 - alpha) ** (n_cols - 1 - seed_end) + (weights * filled).sum(axis=1)
+    return np.where(valid, result, np.nan)
+
+
+def compute_indicators(closes_matrix, volumes_matrix, rsi_period: int = 14,
+                       ema_period: int = 200, volume_period: int = 20) -> Dict[str, Any]:
+    """
+    Calcula RSI (Wilder), distancia a EMA200, ratio de volumen y profit_potential
+    para N pares en una sola pasada vectorizada.
+    
+    Las filas con menos historia se rellenan con NaN a la izquierda (alineadas a
+    la última vela). Las filas sin historia suficiente devuelven NaN.
+    
+    Args:
+        closes_matrix: Matriz (N, T) de cierres, última columna = vela más reciente
+        volumes_matrix: Matriz (N, T) de volúmenes alineada con closes_matrix
+        rsi_period: Periodo del RSI
+        ema_period: Periodo de la EMA
+        volume_period: Ventana de la media de volumen
+    
+    Returns:
+        Dict de vectores (N,): rsi, avg_gain, avg_loss (medias de Wilder), ema200,
+        ema200_distance, volume_sma, volume_ratio, current_volume, current_price,
+        profit_potential
+    """
+    closes = np.asarray(closes_matrix, dtype=float)
+    volumes = np.asarray(volumes_matrix, dtype=float)
+    if closes.ndim == 1:
+        closes = closes[None, :]
+        volumes = volumes[None, :]
+    n_rows, n_cols = closes.shape
+    
+    valid_mask = ~np.isnan(closes)
+    start = np.where(valid_mask.any(axis=1), valid_mask.argmax(axis=1), n_cols)
+    current_price = closes[:, -1]
+    
+    # EMA sembrada con SMA (igual que _calculate_ema)
+    ema = _seeded_smoothing(closes, start, ema_period, 2 / (ema_period + 1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ema200_distance = (current_price - ema) / ema * 100
+    
+    # RSI de Wilder (igual que _calculate_rsi)
+    if n_cols > 1:
+        deltas = np.diff(closes, axis=1)
+        gains = np.where(deltas > 0, deltas, np.where(np.isnan(deltas), np.nan, 0.0))
+        losses = np.where(deltas < 0, -deltas, np.where(np.isnan(deltas), np.nan, 0.0))
+        avg_gain = _seeded_smoothing(gains, start, rsi_period, 1 / rsi_period)
+        avg_loss = _seeded_smoothing(losses, start, rsi_period, 1 / rsi_period)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(avg_loss == 0, 100.0, 100 - (100 / (1 + avg_gain / avg_loss)))
+        rsi = np.where(np.isnan(avg_gain) | np.isnan(avg_loss), np.nan, rsi)
+    else:
+        avg_gain = avg_loss = rsi = np.full(n_rows, np.nan)
+    
+    # Volumen: media de las últimas `volume_period` velas (incluida la actual)
+    window = volumes[:, -volume_period:]
+    window_count = (~np.isnan(window)).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volume_sma = np.where(window_count > 0, np.nansum(window, axis=1) / np.maximum(window_count, 1), np.nan)
+        volume_ratio = np.where(volume_sma > 0, volumes[:, -1] / volume_sma, np.nan)
+    
+    profit_potential = np.where(ema200_distance < 0, -ema200_distance, 0.0)
+    
+    return {
+        'rsi': rsi,
+        'avg_gain': avg_gain,
+        'avg_loss': avg_loss,
+        'ema200': ema,
+        'ema200_distance': ema200_distance,
+        'volume_sma': volume_sma,
+        'volume_ratio': volume_ratio,
+        'current_volume': volumes[:, -1],
+        'current_price': current_price,
+        'profit_potential': profit_potential
+    }
+
+
+def _seed_indicator_states(pairs: List[str], exchange, limit: int = INDICATOR_HISTORY) -> Dict[str, Optional[List[float]]]:
+    """
+    Siembra el estado incremental de varios pares en una pasada vectorizada.
+    
+    Usa las mismas velas cerradas que _sync_indicator_state al sembrar un par
+    (las últimas `limit` del almacén) y compute_indicators sobre ellas, así que el
+    estado resultante es el mismo que con update() vela a vela.
+    
+    Returns:
+        Dict {par: vela en curso o None} de los pares sembrados
+    """
+    store = get_candle_store()
+    series = []
+    for pair in pairs:
+        try:
+            ohlcv = store.get_ohlcv(exchange, pair, INDICATOR_TIMEFRAME, limit=limit)
+        except Exception as e:
+            logger.debug(f"Error obteniendo velas para {pair}: {e}")
+            continue
+        if not ohlcv:
+            continue
+        live = store.get_live(pair, INDICATOR_TIMEFRAME)
+        if live is None or ohlcv[-1][0] != live[0]:
+            live = None
+        closed = ohlcv[:-1] if live is not None else ohlcv
+        if closed:
+            series.append((pair, closed, live))
+    
+    if not series:
+        return {}
+    
+    width = max(len(closed) for _, closed, _ in series)
+    closes = np.full((len(series), width), np.nan)
+    volumes = np.full((len(series), width), np.nan)
+    for row, (_, closed, _) in enumerate(series):
+        data = np.asarray(closed, dtype=float)
+        closes[row, -len(data):] = data[:, 4]
+        volumes[row, -len(data):] = data[:, 5]
+    
+    values = compute_indicators(closes, volumes)
+    
+    def _value(name: str, row: int) -> Optional[float]:
+        value = values[name][row]
+        return None if np.isnan(value) else float(value)
+    
+    seeded = {}
+    for row, (pair, closed, live) in enumerate(series):
+        state = StreamingIndicators.from_seed(
+            closed, _value('ema200', row), _value('avg_gain', row), _value('avg_loss', row)
+        )
+        _indicator_states[pair] = state
+        seeded[pair] = live
+        if HAS_INDICATOR_STORAGE:
+            try:
+                save_indicator_state(pair, INDICATOR_TIMEFRAME, state.to_dict())
+            except Exception as e:
+                logger.debug(f"No se pudo persistir estado de indicadores de {pair}: {e}")
+    return seeded
+
+
+def get_technical_indicators_batch(pairs: List[str], exchange, limit: int = INDICATOR_HISTORY) -> Dict[str, Dict[str, Any]]:
+    """
+    Obtiene indicadores técnicos para varios pares.
+    
+    Devuelve los mismos valores que get_technical_indicators: los pares con estado
+    incremental se sincronizan (solo velas nuevas) y los que no lo tienen se
+    siembran juntos en una pasada vectorizada (compute_indicators) con la misma
+    historia y semilla que el cálculo par a par. Sin numpy, cae al cálculo par a par.
+    
+    Args:
+        pairs: Lista de pares (ej: ["BTC/EUR", "ETH/EUR"])
+        exchange: Instancia de exchange (ccxt)
+        limit: Velas de historia con las que se siembra un par sin estado
+    
+    Returns:
+        Dict {par: indicadores} con las mismas claves que get_technical_indicators
+        (más volume_ratio). Los pares sin datos suficientes no aparecen.
+    """
+    pairs = list(dict.fromkeys(pairs))
+    if not HAS_NUMPY:
+        results = {}
+        for pair in pairs:
+            indicators = get_technical_indicators(pair, exchange)
+            if indicators:
+                results[pair] = indicators
+        return results
+    
+    missing = [pair for pair in pairs if get_indicator_state(pair) is None]
+    seeded = _seed_indicator_states(missing, exchange, limit) if missing else {}
+    
+    results = {}
+    for pair in pairs:
+        try:
+            if pair in seeded:
+                state, live = _indicator_states[pair], seeded[pair]
+            else:
+                state, live = _sync_indicator_state(pair, exchange)
+            if state is None:
+                continue
+            values = state.snapshot(live)
+            indicators = _format_indicators(values)
+            if not indicators:
+                continue
+            volume_sma = values['volume_sma']
+            indicators['volume_ratio'] = values['current_volume'] / volume_sma if volume_sma else None
+            results[pair] = indicators
+        except Exception as e:
+            logger.debug(f"Error obteniendo indicadores para {pair}: {e}")
+    return results
+
+
 def _calculate_rsi(prices: list, period: int = 14) -> Optional[float]:
-    """Calcula el RSI (Relative Strength Index)."""
+    """Calcula el RSI (Relative Strength Index) con suavizado de Wilder."""
     if len(prices) < period + 1:
         return None
     
@@ -68,8 +601,12 @@ def _calculate_rsi(prices: list, period: int = 14) -> Optional[float]:
         gains = [d if d > 0 else 0 for d in deltas]
         losses = [-d if d < 0 else 0 for d in deltas]
         
-        avg_gain = sum(gains[-period:]) / period
-        avg_loss = sum(losses[-period:]) / period
+        # Suavizado de Wilder (coincide con StreamingIndicators)
+        avg_gain = sum(gains[:period]) / period
+        avg_loss = sum(losses[:period]) / period
+        for gain, loss in zip(gains[period:], losses[period:]):
+            avg_gain = (avg_gain * (period - 1) + gain) / period
+            avg_loss = (avg_loss * (period - 1) + loss) / period
         
         if avg_loss == 0:
             return 100.0
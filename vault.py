@@ -4,6 +4,7 @@ Módulo Vault para gestionar balances y conversiones de monedas.
 import logging
 from typing import Dict, Any, Optional
 from router import get_pair_info
+from price_oracle import get_price_oracle
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +45,50 @@ class Vault:
         if asset == target_currency:
             return amount
         
+        # Oráculo: precio desde el grafo de conversión del snapshot de tickers
+        try:
+            price = get_price_oracle().get_price(asset, target_currency)
+            if price is not None:
+                return amount * price
+        except Exception as e:
+            logger.debug(f"Oráculo de precios no disponible para {asset}/{target_currency}: {e}")
+        
+        return self._probe_asset_value(asset, amount, target_currency)
+    
+    def get_asset_values(self, amounts: Dict[str, float], target_currency: str = 'EUR') -> Dict[str, float]:
+        """
+        Valora varios activos a la vez con un solo recorrido del grafo de precios.
+        
+        Args:
+            amounts: Dict {activo: cantidad}
+            target_currency: Moneda objetivo (default: 'EUR')
+        
+        Returns:
+            Dict {activo: valor en la moneda objetivo} (0.0 si no hay precio)
+        """
+        positive = {asset: amount for asset, amount in amounts.items() if amount > 0}
+        try:
+            values = get_price_oracle().get_asset_values(positive, target_currency)
+        except Exception as e:
+            logger.debug(f"Oráculo de precios no disponible: {e}")
+            values = {}
+        
+        result = {}
+        for asset, amount in amounts.items():
+            if amount <= 0:
+                result[asset] = 0.0
+            elif values.get(asset) is not None:
+                result[asset] = values[asset]
+            else:
+                # Sin ruta en el grafo: sondeo par a par
+                result[asset] = self._probe_asset_value(asset, amount, target_currency)
+        return result
+    
+    def _probe_asset_value(self, asset: str, amount: float, target_currency: str = 'EUR') -> float:
+        """
+        Conversión de respaldo probando pares candidatos (directo, inverso, vía USDT,
+        USDC o BTC) cuando el oráculo no encuentra ruta.
+        """
         # Conversión directa 1:1 para stablecoins a EUR
         if target_currency == 'EUR' and asset in ['USDC', 'USDT']:
             return amount
@@ -126,13 +171,20 @@ class Vault:
             balances = self.exchange.fetch_balance()
             total_value = 0.0
             
-            for asset, balance_data in balances.get('total', {}).items():
-                if balance_data > 0.00000001:  # Filtro muy bajo para incluir BTC, BNB
-                    asset_value = self.get_asset_value(asset, balance_data, 'EUR')
-                    total_value += asset_value
-                    # Audit log para verificación
-                    if asset_value > 0.01:  # Solo loguear activos con valor > 1 céntimo
-                        logger.debug(f"💰 Portfolio: {asset} {balance_data:.8f} = {asset_value:.2f}€")
+            # Filtro muy bajo para incluir BTC, BNB
+            holdings = {
+                asset: balance_data
+                for asset, balance_data in balances.get('total', {}).items()
+                if balance_data > 0.00000001
+            }
+            values = self.get_asset_values(holdings, 'EUR')
+            
+            for asset, balance_data in holdings.items():
+                asset_value = values.get(asset, 0.0)
+                total_value += asset_value
+                # Audit log para verificación
+                if asset_value > 0.01:  # Solo loguear activos con valor > 1 céntimo
+                    logger.debug(f"💰 Portfolio: {asset} {balance_data:.8f} = {asset_value:.2f}€")
             
             return total_value
         except Exception as e: